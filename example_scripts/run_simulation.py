@@ -63,6 +63,7 @@ from june.policy import Policies
 from june.event import Events
 from june import paths
 from june.records import Record
+from june.utils import RandomStreams
 from june.domains import Domain, DomainSplitter
 
 from june.tracker.tracker import Tracker
@@ -113,6 +114,7 @@ def set_random_seed(seed=999):
     np.random.seed(seed)
     set_seed_numba(seed)
     random.seed(seed)
+    RandomStreams.set_seed(seed)
     return
 
 set_random_seed(0)
@@ -284,6 +286,12 @@ def generate_simulator():
                     json.dump(super_area_ids_to_domain_dict, f)
                 with open("super_area_names_to_domain.json", "w") as f:
                     json.dump(super_area_names_to_domain_dict, f)
+                domain_adjacency = DomainSplitter.generate_domain_adjacency(
+                    super_areas_per_domain=super_areas_per_domain,
+                    world_path=args.world_path,
+                )
+                with open("domain_adjacency.json", "w") as f:
+                    json.dump(domain_adjacency, f)
                     
             print(f"mpi_rank {mpi_rank} waiting")
             if mpi_available:
@@ -292,6 +300,8 @@ def generate_simulator():
             if mpi_rank > 0:
                 with open("super_area_ids_to_domain.json", "r") as f:
                     super_area_ids_to_domain_dict = json.load(f, object_hook=keys_to_int)
+                with open("domain_adjacency.json", "r") as f:
+                    domain_adjacency = json.load(f, object_hook=keys_to_int)
             print(f"mpi_rank {mpi_rank} loading domain")
             
             domain = Domain.from_hdf5(
@@ -300,6 +310,7 @@ def generate_simulator():
                 hdf5_file_path=args.world_path,
                 interaction_config=args.parameters,
             )
+            domain.neighbour_domains = domain_adjacency[mpi_rank]
         else:
             # Non-MPI mode or single MPI process - load entire world
             logger.info("Loading entire world in a single domain")
@@ -1 +1,2 @@
+from .activity_planner import ActivityPlanner
 from .activity_manager import ActivityManager, activity_hierarchy
@@ -1,5 +1,6 @@
 import logging
 import yaml
+import numpy as np
 from datetime import datetime
 from itertools import chain
 from typing import List, Optional
@@ -9,11 +10,21 @@ from time import time as wall_clock
 from june.demography import Person
 from june.exc import SimulatorError
 from june.global_context import GlobalContext
-from june.groups import Subgroup
+from june.groups import Subgroup, Placements
 from june.groups.leisure import Leisure
 from june.groups.travel import Travel
-from june.mpi_wrapper import MPI, mpi_comm, mpi_size, mpi_rank, MovablePeople
+from june.mpi_wrapper import (
+    MPI,
+    mpi_comm,
+    mpi_size,
+    mpi_rank,
+    MovablePeople,
+    CrossDomainRoutes,
+    DomainGraph,
+    foreign_group_dtype,
+)
 from june.records import Record
+from june.activity.activity_planner import ActivityPlanner
 
 logger = logging.getLogger("activity_manager")
 mpi_logger = logging.getLogger("mpi")
@@ -33,6 +44,56 @@ activity_hierarchy = [
 ]
 
 
+class PeopleExchange:
+    """
+    People exchange between domains that has been posted but may not have
+    completed yet, see ``ActivityManager.post_people_exchange``. Every rank first
+    sends the groups its people go to, and then the people themselves, so that the
+    receiver can find out which of its groups get people from abroad, and interact
+    the rest, while the people are still in flight.
+    """
+
+    def __init__(self, movable_people: MovablePeople):
+        self.movable_people = movable_people
+        self.n_people_going_abroad = 0
+        # sizes received from every rank in recv_ranks, the neighbours of this domain
+        self.recv_ranks = []
+        self.recv_sizes = None
+        self.recv_groups = None
+        self.recv_buffer = None
+        self.recv_counts = None
+        self.recv_displs = None
+        # the send buffers must be kept alive until the requests complete
+        self.send_buffers = []
+        self.groups_request = None
+        self.people_request = None
+        self._foreign_groups = None
+        # time spent posting and waiting for the exchange, not overlapped with work
+        self.comms_time = 0.0
+        self.comms_wall_time = 0.0
+
+    def foreign_groups(self) -> dict:
+        """
+        Waits for the groups of this domain that receive people from other domains.
+
+        Returns
+        -------
+        dictionary group spec -> set of group ids
+        """
+        if self._foreign_groups is None:
+            self._foreign_groups = {}
+            if self.groups_request is not None:
+                tick, tickw = perf_counter(), wall_clock()
+                self.groups_request.Wait()
+                self.comms_time += perf_counter() - tick
+                self.comms_wall_time += wall_clock() - tickw
+                for group_spec, group_id in self.recv_groups.tolist():
+                    self._foreign_groups.setdefault(group_spec.decode(), set()).add(
+                        group_id
+                    )
+        return self._foreign_groups
+
+
 class ActivityManager:
     def __init__(
         self,
@@ -53,6 +114,16 @@ class ActivityManager:
         self.leisure = leisure
         self.travel = travel
         self.all_activities = all_activities
+        # when enabled, people are moved with the columnar ActivityPlanner, which
+        # is built the first time it is needed
+        self.use_activity_planner = False
+        self.activity_planner = None
+        # the timer cycles through a fixed schedule, so the ordered activities and
+        # the active supergroups are computed once per time slot, see get_time_slot
+        self._time_slots = {}
+        # work and commute placements in other domains repeat every step, so they
+        # are exchanged through persistent routing tables
+        self.cross_domain_routes = CrossDomainRoutes()
 
         self.activity_to_super_group_dict = {
             "medical_facility": activity_to_super_groups.get("medical_facility", []),
@@ -145,7 +216,55 @@ class ActivityManager:
 
     @property
     def active_super_groups(self):
-        return self.activities_to_super_groups(self.timer.activities)
+        return self.get_time_slot()["super_groups"]
+
+    @property
+    def active_super_group_instances(self):
+        """
+        Supergroup instances of the world that are active in the current time
+        step and have at least one group, in the order they are interacted.
+        """
+        return self.get_time_slot()["super_group_instances"]
+
+    def get_time_slot(self) -> dict:
+        """
+        Returns the ordered activities, the active supergroup names and the active
+        supergroup instances of the current time slot. They only depend on the day
+        type and the shift, so they are computed the first time a slot is seen.
+        """
+        activities = self.timer.activities
+        key = (self.timer.day_type, self.timer.shift, tuple(activities))
+        time_slot = self._time_slots.get(key)
+        if time_slot is None:
+            ordered_activities = self.apply_activity_hierarchy(activities)
+            super_groups = self.activities_to_super_groups(ordered_activities)
+            time_slot = {
+                "activities": ordered_activities,
+                "super_groups": super_groups,
+                "super_group_instances": self._get_super_group_instances(
+                    super_groups
+                ),
+            }
+            self._time_slots[key] = time_slot
+            logger.info(
+                f"Time slot {key[0]} {key[1]}: activities {ordered_activities}, "
+                f"supergroups {super_groups}"
+            )
+        return time_slot
+
+    def _get_super_group_instances(self, super_group_names: List[str]) -> list:
+        super_group_instances = []
+        for super_group_name in super_group_names:
+            if "visits" in super_group_name:
+                continue
+            try:
+                super_group_instance = getattr(self.world, super_group_name, None)
+                if super_group_instance is not None and len(super_group_instance) > 0:
+                    super_group_instances.append(super_group_instance)
+            except (AttributeError, TypeError) as e:
+                logger.warning(f"Could not access supergroup {super_group_name}: {e}")
+                continue
+        return super_group_instances
 
     @staticmethod
     def apply_activity_hierarchy(activities: List[str]) -> List[str]:
@@ -161,13 +280,8 @@ class ActivityManager:
         -------
         Ordered list of activities according to hierarchy
         """
-        print(f"Original Activities: {activities}")
-
         # Sort activities according to the activity hierarchy
-        activities.sort(key=lambda x: activity_hierarchy.index(x))
-        
-        print(f"Ordered Activities: {activities}")
-        return activities
+        return sorted(activities, key=lambda x: activity_hierarchy.index(x))
 
     def activities_to_super_groups(self, activities: List[str]) -> List[str]:
         """
@@ -191,11 +305,29 @@ class ActivityManager:
         return getattr(person, activity)
 
     def do_timestep(self, record=None):
+        to_send_abroad = self.move_people(record=record)
+        (
+            people_from_abroad,
+            n_people_from_abroad,
+            n_people_going_abroad,
+        ) = self.send_and_receive_people_from_abroad(to_send_abroad)
+        return (
+            people_from_abroad,
+            n_people_from_abroad,
+            n_people_going_abroad,
+            to_send_abroad,
+        )
+
+    def move_people(self, record=None) -> MovablePeople:
+        """
+        Moves people to the subgroups of the current time step, including the friend
+        invitations to leisure, and returns the people that go to other domains.
+        """
         # get time data
         tick_interaction_timestep = perf_counter()
         date = self.timer.date
         day_type = self.timer.day_type
-        activities = self.apply_activity_hierarchy(self.timer.activities)
+        activities = self.get_time_slot()["activities"]
         delta_time = self.timer.duration
         # apply leisure policies
         if self.leisure is not None:
@@ -234,23 +366,7 @@ class ActivityManager:
         rank_logger.info(
             f"Rank {mpi_rank} -- move_people -- {tock_interaction_timestep-tick_interaction_timestep}"
         )
-        tick_waiting = perf_counter()
-        mpi_comm.Barrier()
-        tock_waiting = perf_counter()
-        rank_logger.info(
-            f"Rank {mpi_rank} -- move_people_waiting -- {tock_waiting-tick_waiting}"
-        )
-        (
-            people_from_abroad,
-            n_people_from_abroad,
-            n_people_going_abroad,
-        ) = self.send_and_receive_people_from_abroad(to_send_abroad)
-        return (
-            people_from_abroad,
-            n_people_from_abroad,
-            n_people_going_abroad,
-            to_send_abroad,
-        )
+        return to_send_abroad
 
     def move_people_to_active_subgroups(
         self,
@@ -273,6 +389,17 @@ class ActivityManager:
         )
         to_send_abroad = MovablePeople()
         potential_leisure_inviters = []  # Track people who got assigned to leisure
+        if self.use_activity_planner:
+            self.move_people_with_planner(
+                activities=activities,
+                active_individual_policies=active_individual_policies,
+                days_from_start=days_from_start,
+                to_send_abroad=to_send_abroad,
+                potential_leisure_inviters=potential_leisure_inviters,
+            )
+            tock = perf_counter()
+            mpi_logger.info(f"{self.timer.date},{mpi_rank},activity,{tock-tick}")
+            return to_send_abroad, potential_leisure_inviters
         counter = 0
         for person in self.world.people:
             counter += 1
@@ -294,6 +421,92 @@ class ActivityManager:
         mpi_logger.info(f"{self.timer.date},{mpi_rank},activity,{tock-tick}")
         return to_send_abroad, potential_leisure_inviters
     
+    def move_people_with_planner(
+        self,
+        activities: List[str],
+        active_individual_policies,
+        days_from_start: float,
+        to_send_abroad: MovablePeople,
+        potential_leisure_inviters: list,
+    ):
+        """
+        Columnar version of the loop in ``move_people_to_active_subgroups``.
+        Individual policies are applied first, then the activity hierarchy is
+        resolved for everyone who is alive, not busy and not affected by a policy
+        with the arrays of the ActivityPlanner, and those people are placed in
+        their subgroups in bulk. The people affected by policies and the people
+        that reach leisure or commute are then moved one by one, in population
+        order, with ``move_to_active_subgroup``.
+        """
+        if self.activity_planner is None:
+            self.activity_planner = ActivityPlanner(
+                self.world.people, has_travel=self.travel is not None
+            )
+        planner = self.activity_planner
+        planner.update()
+        people = planner.people
+        available = ~planner.dead & ~planner.get_busy()
+        policy_activities = {}
+        if active_individual_policies.policies:
+            for index in np.flatnonzero(available):
+                person = people[index]
+                # guardians may have been sent home by a previous person
+                if person.busy:
+                    continue
+                allowed_activities = self.policies.individual_policies.apply(
+                    active_policies=active_individual_policies,
+                    person=person,
+                    activities=activities,
+                    days_from_start=days_from_start,
+                )
+                if allowed_activities is not activities:
+                    policy_activities[index] = allowed_activities
+            available = ~planner.dead & ~planner.get_busy()
+            if policy_activities:
+                available[list(policy_activities)] = False
+        handles, first_python_activity, unresolved = planner.resolve(
+            activities, available
+        )
+        if unresolved.any():
+            raise SimulatorError(
+                "Attention! Some people do not have an activity in this timestep."
+            )
+        # place people resolved from the columns, grouped by subgroup
+        resolved = np.flatnonzero(handles >= 0)
+        resolved = resolved[np.argsort(handles[resolved], kind="stable")]
+        boundaries = np.flatnonzero(np.diff(handles[resolved])) + 1
+        for indices in np.split(resolved, boundaries):
+            if not len(indices):
+                continue
+            handle = handles[indices[0]]
+            subgroup = planner.subgroups[handle]
+            if planner.external[handle]:
+                for index in indices:
+                    person = people[index]
+                    person.busy = True
+                    Placements.add_person(person)
+                    to_send_abroad.add_person(person, subgroup)
+            else:
+                subgroup.extend([people[index] for index in indices])
+        # people that need Python, in population order
+        for activity_index in np.unique(first_python_activity[first_python_activity >= 0]):
+            policy_activities.update(
+                (index, activities[activity_index:])
+                for index in np.flatnonzero(first_python_activity == activity_index)
+            )
+        for index in sorted(policy_activities):
+            person = people[index]
+            if person.busy:
+                continue
+            external_subgroup = self.move_to_active_subgroup(
+                policy_activities[index],
+                person,
+                to_send_abroad,
+                potential_leisure_inviters,
+            )
+            if external_subgroup is not None:
+                to_send_abroad.add_person(person, external_subgroup)
+
     def collect_friend_transfers(self):
         """
         Collect people who accepted friend invitations and need to be transferred to other ranks.
@@ -312,6 +525,7 @@ class ActivityManager:
                 not person.busy):  # Not already flagged in normal assignment
                 
                 person.busy = True
+                Placements.add_person(person)
                 additional_transfers.add_person(person, person.subgroups.leisure)
                 transfer_count += 1
                 
@@ -328,36 +542,8 @@ class ActivityManager:
         additional : MovablePeople
             The additional container to merge from
         """        
-        merged_domains = 0
-        merged_people = 0
-        
-        # Merge skinny_out dictionaries
-        for domain_id, domain_data in additional.skinny_out.items():
-            
-            if domain_id not in primary.skinny_out:
-                primary.skinny_out[domain_id] = {}
-            
-            for group_spec, spec_data in domain_data.items():
-                if group_spec not in primary.skinny_out[domain_id]:
-                    primary.skinny_out[domain_id][group_spec] = {}
-                
-                for group_id, group_data in spec_data.items():
-                    if group_id not in primary.skinny_out[domain_id][group_spec]:
-                        primary.skinny_out[domain_id][group_spec][group_id] = {}
-                    
-                    for subgroup_type, subgroup_data in group_data.items():
-                        if subgroup_type not in primary.skinny_out[domain_id][group_spec][group_id]:
-                            primary.skinny_out[domain_id][group_spec][group_id][subgroup_type] = {}
-                        
-                        # Merge person data
-                        before_count = len(primary.skinny_out[domain_id][group_spec][group_id][subgroup_type])
-                        primary.skinny_out[domain_id][group_spec][group_id][subgroup_type].update(subgroup_data)
-                        after_count = len(primary.skinny_out[domain_id][group_spec][group_id][subgroup_type])
-                        people_added = after_count - before_count
-                        merged_people += people_added
-            
-            merged_domains += 1
-        
+        primary.merge(additional)
+
     def move_to_active_subgroup(
         self, activities: List[str], person: Person, to_send_abroad=None, potential_leisure_inviters=None
     ) -> Optional["Subgroup"]:
@@ -392,6 +578,7 @@ class ActivityManager:
             if subgroup is not None:
                 if subgroup.external:
                     person.busy = True
+                    Placements.add_person(person)
                     # this person goes to another MPI domain
                     return subgroup
 
@@ -405,43 +592,104 @@ class ActivityManager:
         """
         Deal with the MPI comms.
         """
-        n_people_going_abroad = 0
-        n_people_from_abroad = 0
-        tick, tickw = perf_counter(), wall_clock()
-        reqs = []
-
-        for rank in range(mpi_size):
+        return self.complete_people_exchange(self.post_people_exchange(movable_people))
 
-            if mpi_rank == rank:
+    def post_people_exchange(self, movable_people: MovablePeople) -> PeopleExchange:
+        """
+        Starts sending the people going abroad and receiving the people from abroad,
+        without waiting for the people to arrive.
+
+        Every rank sends two byte buffers to the domains its people go to: the groups
+        its people go to and the packed people (see CrossDomainRoutes). The sizes of
+        the buffer sections are exchanged first so that each rank can size its
+        receive buffers, then both buffers are posted with non-blocking all-to-alls
+        over the neighbours in the DomainGraph.
+        """
+        tick, tickw = perf_counter(), wall_clock()
+        exchange = PeopleExchange(movable_people)
+        if mpi_size == 1:
+            return exchange
+        # number of groups, records, immunity entries, routed records and presence
+        # bytes sent to every rank
+        send_sizes = {}
+        send_groups = {}
+        send_buffers = {}
+        for rank, n_people in movable_people.count_people_by_domain().items():
+            if rank == mpi_rank or not n_people:
                 continue
-            keys, data, n_this_rank = movable_people.serialise(rank)
-            if n_this_rank:
-                reqs.append(mpi_comm.isend(keys, dest=rank, tag=100))
-                reqs.append(mpi_comm.isend(data, dest=rank, tag=200))
-                n_people_going_abroad += n_this_rank
-            else:
-                reqs.append(mpi_comm.isend(None, dest=rank, tag=100))
-                reqs.append(mpi_comm.isend(None, dest=rank, tag=200))
-
-        # now it has all been sent, we can start the receiving.
+            rows = movable_people.rows_for_domain(rank)
+            groups = movable_people.destination_groups(rows)
+            buffer, sizes = self.cross_domain_routes.pack(movable_people, rank, rows)
+            send_sizes[rank] = (len(groups),) + tuple(sizes)
+            send_groups[rank] = groups.view(np.uint8)
+            send_buffers[rank] = buffer
+            exchange.n_people_going_abroad += len(rows)
+        exchange.recv_sizes = DomainGraph.alltoall_sizes(send_sizes, 5)
+        exchange.recv_ranks = list(DomainGraph.neighbours)
 
-        for rank in range(mpi_size):
+        (
+            exchange.groups_request,
+            send_groups,
+            recv_groups,
+            _,
+        ) = DomainGraph.ialltoallv(
+            send_groups,
+            exchange.recv_sizes[:, 0] * foreign_group_dtype.itemsize,
+            dtype=np.uint8,
+        )
+        exchange.recv_groups = recv_groups.view(foreign_group_dtype)
 
-            if rank == mpi_rank:
-                continue
-            keys = mpi_comm.recv(source=rank, tag=100)
-            data = mpi_comm.recv(source=rank, tag=200)
+        exchange.recv_counts = CrossDomainRoutes.n_bytes(exchange.recv_sizes[:, 1:])
+        (
+            exchange.people_request,
+            send_buffer,
+            exchange.recv_buffer,
+            exchange.recv_displs,
+        ) = DomainGraph.ialltoallv(
+            send_buffers, exchange.recv_counts, dtype=np.uint8
+        )
+        exchange.send_buffers = [send_groups, send_buffer]
+        exchange.comms_time += perf_counter() - tick
+        exchange.comms_wall_time += wall_clock() - tickw
+        return exchange
 
-            if keys is not None:
-                movable_people.update(rank, keys, data)
-                n_people_from_abroad += data.shape[0]
+    def complete_people_exchange(self, exchange: PeopleExchange):
+        """
+        Waits for the people from abroad and registers them in the skinny_in of the
+        exchanged MovablePeople.
 
-        for r in reqs:
-            r.wait()
+        Returns
+        -------
+        people_from_abroad, n_people_from_abroad, n_people_going_abroad
+        """
+        tick, tickw = perf_counter(), wall_clock()
+        movable_people = exchange.movable_people
+        n_people_from_abroad = 0
+        if exchange.people_request is not None:
+            exchange.foreign_groups()
+            exchange.people_request.Wait()
+            for i, rank in enumerate(exchange.recv_ranks):
+                if not exchange.recv_counts[i]:
+                    continue
+                start = exchange.recv_displs[i]
+                n_people_from_abroad += self.cross_domain_routes.unpack(
+                    movable_people,
+                    rank,
+                    exchange.recv_buffer[start : start + exchange.recv_counts[i]],
+                    exchange.recv_sizes[i, 1:],
+                )
+            exchange.send_buffers = []
 
-        tock, tockw = perf_counter(), wall_clock()
+        exchange.comms_time += perf_counter() - tick
+        exchange.comms_wall_time += wall_clock() - tickw
         logger.info(
-            f"CMS: People COMS for rank {mpi_rank}/{mpi_size} - {tock - tick},{tockw - tickw} - {self.timer.date}"
+            f"CMS: People COMS for rank {mpi_rank}/{mpi_size} - {exchange.comms_time},{exchange.comms_wall_time} - {self.timer.date}"
+        )
+        mpi_logger.info(
+            f"{self.timer.date},{mpi_rank},people_comms,{exchange.comms_time}"
+        )
+        return (
+            movable_people.skinny_in,
+            n_people_from_abroad,
+            exchange.n_people_going_abroad,
         )
-        mpi_logger.info(f"{self.timer.date},{mpi_rank},people_comms,{tock-tick}")
-        return movable_people.skinny_in, n_people_from_abroad, n_people_going_abroad
@@ -0,0 +1,140 @@
+import numpy as np
+
+from typing import List
+
+from june.groups import ActivityChanges
+
+# activities resolved by looking up the subgroup the person has assigned for them,
+# these are stored as columns of subgroup handles
+column_activities = (
+    "medical_facility",
+    "international_travel",
+    "primary_activity",
+    "residence",
+)
+
+
+class ActivityPlanner:
+    """
+    Columnar representation of where people go, used by the ActivityManager to
+    resolve the activity hierarchy for the whole population at once. For every
+    activity in ``column_activities`` we keep an integer array with the handle of
+    the subgroup each person has assigned (-1 if they have none), where handles
+    index ``self.subgroups``. Masks of dead people and of people that may use
+    public transport are kept as well.
+
+    The arrays are built from the people once, and then updated only for the
+    people recorded in ``ActivityChanges``. Leisure and commute are drawn every
+    time step, so people that reach them in the hierarchy are resolved in Python.
+
+    Parameters
+    ----------
+    people
+        the people of the world
+    has_travel
+        whether commuting is modelled; if not, nobody can be resolved through the
+        commute activity from the columns
+    """
+
+    def __init__(self, people, has_travel: bool = True):
+        self.people = list(people)
+        self.has_travel = has_travel
+        self.person_index = {person.id: i for i, person in enumerate(self.people)}
+        self.subgroups = []
+        self._subgroup_handles = {}
+        self._external = []
+        self.external = np.zeros(0, dtype=bool)
+        n_people = len(self.people)
+        self.columns = {
+            activity: np.full(n_people, -1, dtype=np.int64)
+            for activity in column_activities
+        }
+        self.dead = np.zeros(n_people, dtype=bool)
+        self.commuters = np.zeros(n_people, dtype=bool)
+        ActivityChanges.clear()
+        ActivityChanges.activities = frozenset(column_activities)
+        ActivityChanges.tracking = True
+        for index, person in enumerate(self.people):
+            self._read_person(index, person)
+            self.commuters[index] = not has_travel or person.work_city is not None
+        self.external = np.array(self._external, dtype=bool)
+
+    def _get_handle(self, subgroup) -> int:
+        if subgroup is None:
+            return -1
+        handle = self._subgroup_handles.get(id(subgroup))
+        if handle is None:
+            handle = len(self.subgroups)
+            self._subgroup_handles[id(subgroup)] = handle
+            self.subgroups.append(subgroup)
+            self._external.append(bool(subgroup.external))
+        return handle
+
+    def _read_person(self, index: int, person):
+        subgroups = person.subgroups
+        for activity, column in self.columns.items():
+            column[index] = self._get_handle(getattr(subgroups, activity))
+        self.dead[index] = person.dead
+
+    def update(self):
+        """
+        Updates the arrays of the people whose subgroups changed or who died
+        since the last call.
+        """
+        n_subgroups = len(self.subgroups)
+        for person in ActivityChanges.pop():
+            index = self.person_index.get(person.id)
+            if index is not None:
+                self._read_person(index, person)
+        if len(self.subgroups) != n_subgroups:
+            self.external = np.array(self._external, dtype=bool)
+
+    def get_busy(self) -> np.ndarray:
+        return np.fromiter(
+            (person.busy for person in self.people),
+            dtype=bool,
+            count=len(self.people),
+        )
+
+    def resolve(self, activities: List[str], available: np.ndarray):
+        """
+        Resolves the activity hierarchy for the people in ``available``. Walking
+        down the hierarchy, people that have a subgroup for an activity column are
+        sent there, and people that reach leisure, commute (if they may commute) or
+        any other activity are left to be resolved in Python from that activity on.
+
+        Parameters
+        ----------
+        activities
+            activities of the time step, ordered by the hierarchy
+        available
+            boolean mask of the people to resolve
+
+        Returns
+        -------
+        handles
+            subgroup handle of every person, -1 if they were not resolved
+        first_python_activity
+            for every person, index in ``activities`` of the first activity that
+            has to be resolved in Python, -1 if none
+        unresolved
+            mask of the people that have no activity at all
+        """
+        n_people = len(self.people)
+        unresolved = available.copy()
+        handles = np.full(n_people, -1, dtype=np.int64)
+        first_python_activity = np.full(n_people, -1, dtype=np.int64)
+        for activity_index, activity in enumerate(activities):
+            column = self.columns.get(activity)
+            if column is not None:
+                found = unresolved & (column >= 0)
+                handles[found] = column[found]
+                unresolved &= ~found
+                continue
+            if activity == "commute":
+                to_python = unresolved & self.commuters
+            else:
+                to_python = unresolved
+            first_python_activity[to_python] = activity_index
+            unresolved &= ~to_python
+        return handles, first_python_activity, unresolved
@@ -460,7 +460,10 @@ class Person:
 
         # Set temporary activity if provided
         if replacement_activity is not None:
+            from june.groups import ActivityChanges
+
             setattr(self.subgroups, activity, replacement_activity)
+            ActivityChanges.add_activity(self, activity)
 
     def clear_activity_override(self, activity: str) -> None:
         """
@@ -474,11 +477,14 @@ class Person:
         if activity in self._activity_overrides:
             # Restore original activity if it exists
             if activity in self._original_activities:
+                from june.groups import ActivityChanges
+
                 setattr(
                     self.subgroups, 
                     activity, 
                     self._original_activities[activity]
                 )
+                ActivityChanges.add_activity(self, activity)
                 del self._original_activities[activity]
             
             # Remove override
@@ -28,6 +28,8 @@ class Domain:
         else:
             self.id = id
         self.movable_people = MovablePeople()  # Initialize MovablePeople for either mode
+        # domains with super areas adjacent to this one, see DomainSplitter
+        self.neighbour_domains = []
 
     def __iter__(self):
         return iter(self.super_areas)
@@ -104,6 +104,69 @@ class DomainSplitter:
         )
         return ds.generate_domain_split(maxiter=maxiter)
 
+    @classmethod
+    def generate_domain_adjacency(
+        cls,
+        super_areas_per_domain: dict,
+        world_path: str,
+        super_area_centroids_path: str = default_super_area_centroids_path,
+        super_area_adjacency_graph_path: str = default_super_area_adjaceny_graph_path,
+    ) -> dict:
+        """
+        Computes which domains of a world split are neighbours, see
+        ``get_domain_adjacency``.
+        """
+        number_of_domains = len(super_areas_per_domain)
+        if not mpi_available or number_of_domains <= 1:
+            return {domain: [] for domain in super_areas_per_domain}
+        ds = cls(
+            number_of_domains=number_of_domains,
+            super_area_data=load_data_for_domain_decomposition(world_path),
+            super_area_centroids_path=super_area_centroids_path,
+            super_area_adjacency_graph_path=super_area_adjacency_graph_path,
+        )
+        return ds.get_domain_adjacency(super_areas_per_domain)
+
+    def get_domain_adjacency(self, super_areas_per_domain: dict) -> dict:
+        """
+        Computes which domains are neighbours, i.e. have adjacent super areas. This
+        is the starting point of the graph of domains that exchange people, see
+        ``june.mpi_wrapper.DomainGraph``.
+
+        Parameters
+        ----------
+        super_areas_per_domain
+            dictionary domain -> names of its super areas, as given by
+            ``generate_domain_split``
+
+        Returns
+        -------
+        dictionary domain -> sorted list of neighbouring domains
+        """
+        domain_adjacency = {domain: set() for domain in super_areas_per_domain}
+        if self.simple_split:
+            return {domain: [] for domain in super_areas_per_domain}
+        super_area_to_domain = {
+            super_area: domain
+            for domain, super_areas in super_areas_per_domain.items()
+            for super_area in super_areas
+        }
+        # adjacency indices refer to the order of the super areas, as when
+        # building the points in generate_domain_split
+        super_area_names = list(self.super_area_df.index)
+        for super_area in super_area_names:
+            domain = super_area_to_domain[super_area]
+            for i in np.where(self.adjacency_graph[super_area])[0]:
+                if i >= len(super_area_names):
+                    continue
+                neighbour_domain = super_area_to_domain[super_area_names[i]]
+                if neighbour_domain != domain:
+                    domain_adjacency[domain].add(neighbour_domain)
+                    domain_adjacency[neighbour_domain].add(domain)
+        return {
+            domain: sorted(neighbours) for domain, neighbours in domain_adjacency.items()
+        }
+
     def get_score(self, super_area, weights=default_weights):
         data = self.super_area_data[super_area]
         return (
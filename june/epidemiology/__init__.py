@@ -1,4 +1,12 @@
 from .test_and_trace import TestAndTrace
+from .active_infections import ActiveInfections, TestAndTraceActive
 from .vaccines import Vaccine, Vaccines, VaccinationCampaigns
 
-__all__ = ["TestAndTrace", "Vaccine", "Vaccines", "VaccinationCampaigns"]
+__all__ = [
+    "TestAndTrace",
+    "ActiveInfections",
+    "TestAndTraceActive",
+    "Vaccine",
+    "Vaccines",
+    "VaccinationCampaigns",
+]
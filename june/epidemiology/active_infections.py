@@ -0,0 +1,77 @@
+class ActiveInfections:
+    """
+    Registry of the people with an active infection, so that the health status
+    update of a time step only visits the infected instead of the whole population.
+    People are added when they get an infection (see
+    ``InfectionSelector.infect_person_at_time``) and removed when they recover or
+    die. Since the infection of a person can also be dropped elsewhere (e.g. by
+    events), the registry may hold people that are no longer infected, which
+    ``people`` skips and forgets.
+    """
+
+    _people = {}  # maps person id -> person
+
+    @classmethod
+    def add(cls, person):
+        cls._people[person.id] = person
+
+    @classmethod
+    def remove(cls, person):
+        cls._people.pop(person.id, None)
+
+    @classmethod
+    def people(cls) -> list:
+        """
+        The people that are infected, sorted by id.
+        """
+        for person_id in [
+            person_id
+            for person_id, person in cls._people.items()
+            if not person.infected
+        ]:
+            del cls._people[person_id]
+        return sorted(cls._people.values(), key=lambda person: person.id)
+
+    @classmethod
+    def n_people(cls) -> int:
+        return len(cls._people)
+
+    @classmethod
+    def clear(cls):
+        cls._people.clear()
+
+
+class TestAndTraceActive:
+    """
+    Registry of the people that carry a test and trace record (they were tested,
+    notified as contacts or are isolating), who have to go through the medical care
+    policies every time step even if they are not infected. People are added when
+    their ``TestAndTrace`` is created, and dropped once it is removed.
+    """
+
+    _people = {}  # maps person id -> person
+
+    @classmethod
+    def add(cls, person):
+        cls._people[person.id] = person
+
+    @classmethod
+    def remove(cls, person):
+        cls._people.pop(person.id, None)
+
+    @classmethod
+    def people(cls) -> list:
+        """
+        The people with a test and trace record, sorted by id.
+        """
+        for person_id in [
+            person_id
+            for person_id, person in cls._people.items()
+            if person.test_and_trace is None
+        ]:
+            del cls._people[person_id]
+        return sorted(cls._people.values(), key=lambda person: person.id)
+
+    @classmethod
+    def clear(cls):
+        cls._people.clear()
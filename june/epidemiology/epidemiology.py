@@ -5,14 +5,21 @@ from time import time as wall_clock
 import logging
 
 from june.global_context import GlobalContext
-
-from .infection import InfectionSelectors, ImmunitySetter
+from june.utils import RandomStreams
+
+from .infection import (
+    InfectionSelectors,
+    ImmunitySetter,
+    SymptomsScheduler,
+    TransmissionProbabilities,
+)
 from .test_and_trace import TestAndTrace
+from .active_infections import ActiveInfections, TestAndTraceActive
 from june.demography import Activities
 from june.policy import MedicalCarePolicies
 from june.epidemiology.vaccines import VaccinationCampaigns
 from june.mpi_wrapper import MPI, mpi_comm, mpi_size, mpi_rank, move_info
-from june.groups import MedicalFacilities
+from june.groups import MedicalFacilities, ActivityChanges
 from june.records import Record
 from june.world import World
 from june.time import Timer
@@ -76,6 +83,8 @@ class Epidemiology:
         self.medical_facilities = medical_facilities
         self.vaccination_campaigns = vaccination_campaigns
         self.current_date = None
+        # next symptom transition of every infected person
+        self.symptoms_scheduler = SymptomsScheduler()
 
     def set_immunity(self, world):
         if self.immunity_setter:
@@ -118,7 +127,8 @@ class Epidemiology:
         record: Record = None,
         infected_ids: list = None,
         infection_ids: list = None,
-        people_from_abroad_dict: dict = None
+        people_from_abroad_dict: dict = None,
+        foreign_home_domains: dict = None,
     ):
         print(f"\n=== Starting Do_Timestep EPIDEMIOLOGY===")
         print(f"Current Simulation Date: {timer.date}")
@@ -145,6 +155,7 @@ class Epidemiology:
                 infected_ids=infected_ids,
                 infection_ids=infection_ids,
                 people_from_abroad_dict=people_from_abroad_dict,
+                foreign_home_domains=foreign_home_domains,
             )
             self.tell_domains_to_infect(
                 world=world, timer=timer, infect_in_domains=infect_in_domains
@@ -184,7 +195,11 @@ class Epidemiology:
                 dead_person_id=person.id,
             )
         person.dead = True
+        TransmissionProbabilities.discard(person)
         person.infection = None
+        ActiveInfections.remove(person)
+        TestAndTraceActive.remove(person)
+        ActivityChanges.add(person)
         cemetery = world.cemeteries.get_nearest(person)
         cemetery.add(person)
         if person.residence.group.spec == "household":
@@ -212,7 +227,9 @@ class Epidemiology:
                 recovered_person_id=person.id,
                 infection_id=person.infection.infection_id(),
             ) 
+        TransmissionProbabilities.discard(person)
         person.infection = None
+        ActiveInfections.remove(person)
 
     def update_health_status(
         self,
@@ -227,7 +244,9 @@ class Epidemiology:
         """
         Update symptoms and health status of infected people.
         Send them to hospital if necessary, or bury them if they
-        have died.
+        have died. Only the people in the ActiveInfections and TestAndTraceActive
+        registries are visited, except on vaccination days, when every person is
+        a candidate for the vaccination campaigns.
 
         Parameters
         ----------
@@ -236,15 +255,38 @@ class Epidemiology:
         duration:
             duration of time step
         """
-
-        for person in world.people:
+        people_ids = world.people.people_ids
+        active_people = {
+            person.id: person
+            for person in ActiveInfections.people() + TestAndTraceActive.people()
+        }
+        # skinny copies of people from other domains are updated at home
+        active_ids = [
+            person_id for person_id in sorted(active_people) if person_id in people_ids
+        ]
+        # the infection probabilities of all the infected are updated in one batch,
+        # and only the people with a symptom transition in this time step need
+        # their symptoms updated
+        TransmissionProbabilities.update(time + duration)
+        for person_id in active_ids:
+            if active_people[person_id].infected:
+                self.symptoms_scheduler.schedule(active_people[person_id])
+        due_ids = self.symptoms_scheduler.pop_due(time + duration)
+
+        for person_id in active_ids:
+            person = active_people[person_id]
 
             if person.infected:
                 # Log person's previous infection state
                 previous_tag = person.infection.tag
 
                 # Update health status
-                new_status = person.infection.update_health_status(time, duration)
+                if person_id in due_ids:
+                    new_status = person.infection.update_health_status(time, duration)
+                else:
+                    new_status = "infected"
+                if new_status == "infected":
+                    self.symptoms_scheduler.schedule(person)
 
                 if new_status == "recovered":
                     if hasattr(person, "test_and_trace") and person.test_and_trace is not None:
@@ -288,12 +330,12 @@ class Epidemiology:
                 elif new_status == "dead":
                     self.bury_the_dead(world, person, record=record)
 
-            # Skip dead persons
-            if person.dead:
-                continue
-            
-            # Vaccination Campaign
-            if vaccinate:
+        # Vaccination Campaign
+        if vaccinate:
+            for person in world.people:
+                # Skip dead persons
+                if person.dead:
+                    continue
                 self.vaccination_campaigns.apply(
                     person=person, date=date, record=record
                 )
@@ -302,85 +344,97 @@ class Epidemiology:
                         person=person, date=date, record=record
                     )
 
-            
+    @staticmethod
+    def _home_domains_from_abroad_dict(people_from_abroad_dict: dict) -> dict:
+        """
+        Maps the id of every person from abroad to their home domain.
+        """
+        return {
+            person_id: int(person_data["dom"])
+            for groups in people_from_abroad_dict.values()
+            for subgroups in groups.values()
+            for people in subgroups.values()
+            for person_id, person_data in people.items()
+        }
 
     def infect_people(
-        self, world, time, infected_ids, infection_ids, people_from_abroad_dict
+        self,
+        world,
+        time,
+        infected_ids,
+        infection_ids,
+        people_from_abroad_dict,
+        foreign_home_domains: dict = None,
     ):
         """
         Given a list of infected ids, it initialises an infection object for them
         and sets it to person.infection. For the people who do not live in this domain
         a dictionary with their ids and domains is prepared to be sent through MPI.
+
+        Parameters
+        ----------
+        foreign_home_domains
+            maps the ids of the people from abroad to their home domain, as recorded
+            by MovablePeople during the people exchange. If not given, it is built
+            from people_from_abroad_dict.
         """
         foreign_ids = []
         foreign_infection_ids = []
         for person_id, infection_id in zip(infected_ids, infection_ids):
             if person_id in world.people.people_ids:
                 person = world.people.get_from_id(person_id)
-                self.infection_selectors.infect_person_at_time(
-                    person=person, time=time, infection_id=infection_id
-                )
+                # the infection is drawn from the person's own stream, so it does
+                # not depend on the order in which people get infected
+                with RandomStreams.seeded("infection", person_id):
+                    self.infection_selectors.infect_person_at_time(
+                        person=person, time=time, infection_id=infection_id
+                    )
             else:
                 foreign_ids.append(person_id)
                 foreign_infection_ids.append(infection_id)
 
         infect_in_domains = {}
         if foreign_ids:
-            people_ids = []
-            people_domains = []
-            for spec in people_from_abroad_dict:
-                for group in people_from_abroad_dict[spec]:
-                    for subgroup in people_from_abroad_dict[spec][group]:
-                        p_ids = list(
-                            people_from_abroad_dict[spec][group][subgroup].keys()
-                        )
-                        people_ids += p_ids
-                        for id in p_ids:
-                            people_domains.append(
-                                people_from_abroad_dict[spec][group][subgroup][id][
-                                    "dom"
-                                ]
-                            )
-            infection_counter = 0
-            for id, domain in zip(people_ids, people_domains):
-                if id in foreign_ids:
-                    if domain not in infect_in_domains:
-                        infect_in_domains[domain] = {}
-                        infect_in_domains[domain]["id"] = []
-                        infect_in_domains[domain]["inf_id"] = []
-                    infect_in_domains[domain]["id"].append(id)
-                    infect_in_domains[domain]["inf_id"].append(
-                        foreign_infection_ids[infection_counter]
+            if foreign_home_domains is None:
+                foreign_home_domains = self._home_domains_from_abroad_dict(
+                    people_from_abroad_dict or {}
+                )
+            for person_id, infection_id in zip(foreign_ids, foreign_infection_ids):
+                domain = foreign_home_domains.get(person_id)
+                if domain is None:
+                    logger.warning(
+                        f"Rank {mpi_rank}: person {person_id} got infected but their "
+                        f"home domain is unknown"
                     )
-                    infection_counter += 1
+                    continue
+                if domain not in infect_in_domains:
+                    infect_in_domains[domain] = {"id": [], "inf_id": []}
+                infect_in_domains[domain]["id"].append(person_id)
+                infect_in_domains[domain]["inf_id"].append(infection_id)
         return infect_in_domains
 
-    
     def tell_domains_to_infect(self, world, timer, infect_in_domains):
         """
         Sends information about the people who got infected in this domain to the other domains.
         """
-        mpi_comm.Barrier()
         tick, tickw = perf_counter(), wall_clock()
 
-        invalid_id = 4294967295  # largest possible uint32
-        empty = np.array([invalid_id], dtype=np.uint32)
-
-        # we want to make sure we transfer something for every domain.
-        # (we have an np.concatenate which doesn't work on empty arrays)
-
-        people_ids = [empty for x in range(mpi_size)]
-        infection_ids = [empty for x in range(mpi_size)]
+        # every infection is sent as a (person id, infection id) pair, and move_info
+        # only sends the non-empty arrays, to the neighbours of this domain
+        empty = np.zeros(0, dtype=np.uint32)
+        infections = [empty for x in range(mpi_size)]
 
         # FIXME: domain id should not be floats! Origin is well upstream!
         for x in infect_in_domains:
-            people_ids[int(x)] = np.array(infect_in_domains[x]["id"], dtype=np.uint32)
-            infection_ids[int(x)] = np.array(
-                infect_in_domains[x]["inf_id"], dtype=np.uint32
-            )
+            infections[int(x)] = np.column_stack(
+                (
+                    np.array(infect_in_domains[x]["id"], dtype=np.uint32),
+                    np.array(infect_in_domains[x]["inf_id"], dtype=np.uint32),
+                )
+            ).ravel()
 
-        people_to_infect, n_sending, n_receiving = move_info(people_ids)
-        infection_to_infect, n_sending, n_receiving = move_info(infection_ids)
+        infections_to_apply, n_sending, n_receiving = move_info(infections)
+        infections_to_apply = infections_to_apply.reshape(-1, 2)
 
         tock, tockw = perf_counter(), wall_clock()
         logger.info(
@@ -389,13 +443,9 @@ class Epidemiology:
         )
         mpi_logger.info(f"{timer.date},{mpi_rank},infection,{tock-tick}")
 
-        for person_id, infection_id in zip(people_to_infect, infection_to_infect):
-            try:
-                person = world.people.get_from_id(person_id)
+        for person_id, infection_id in infections_to_apply.tolist():
+            person = world.people.get_from_id(person_id)
+            with RandomStreams.seeded("infection", person_id):
                 self.infection_selectors.infect_person_at_time(
                     person=person, time=timer.now, infection_id=infection_id
                 )
-            except Exception:
-                if person_id == invalid_id:
-                    continue
-                raise
@@ -1,11 +1,17 @@
 from .infection import Infection, Covid19, B117, B16172, Measles, EVD68V
-from .immunity import Immunity
+from .immunity import Immunity, ImmunityStore, InfectionIdTable
 from .infection_selector import InfectionSelector, InfectionSelectors
 from .trajectory_maker import TrajectoryMakers
 from .health_index.health_index import HealthIndexGenerator
 from .health_index.data_to_rates import Data2Rates
 from .symptom_tag import SymptomTag
 from .symptoms import Symptoms
-from .transmission import Transmission, TransmissionConstant, TransmissionGamma
+from .symptoms_scheduler import SymptomsScheduler
+from .transmission import (
+    Transmission,
+    TransmissionConstant,
+    TransmissionGamma,
+    TransmissionProbabilities,
+)
 from .transmission_xnexp import TransmissionXNExp
 from .immunity_setter import ImmunitySetter
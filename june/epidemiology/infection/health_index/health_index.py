@@ -1,3 +1,4 @@
+import functools
 import numpy as np
 import pandas as pd
 
@@ -9,6 +10,10 @@ if TYPE_CHECKING:
     from june.demography.person import Person
 
 _sex_short_to_long = {"m": "male", "f": "female"}
+# order of the populations and sexes in the axes of the cumulative table
+_populations = ("ch", "gp")
+_sexes = ("m", "f")
+_sex_index = {sex: index for index, sex in enumerate(_sexes)}
 
 
 def _parse_interval(interval):
@@ -19,6 +24,12 @@ def _parse_interval(interval):
 
 
 class HealthIndexGenerator:
+    # number of decimals the effective multipliers are rounded to before looking
+    # up the cache of adjusted rows
+    multiplier_decimals = 6
+    # number of multiplier adjusted rows kept in the cache
+    multiplier_cache_size = 4096
+
     def __init__(
         self,
         disease_config: DiseaseConfig,
@@ -69,8 +80,29 @@ class HealthIndexGenerator:
         self.use_physiological_age = not (
             self.m_exp_baseline == self.m_exp and self.f_exp_baseline == self.f_exp
         )
-
-        
+        self.max_age = max_age
+        # cumulative probabilities indexed by (population, sex, physiological age),
+        # and the physiological age of every (sex, age)
+        self.cumulative_table = np.cumsum(
+            np.array(
+                [
+                    [self.probabilities[population][sex] for sex in _sexes]
+                    for population in _populations
+                ]
+            ),
+            axis=-1,
+        )
+        self.cumulative_table.flags.writeable = False
+        self._physiological_ages = np.array(
+            [
+                [self._get_age_index(age, sex) for age in range(max_age + 1)]
+                for sex in _sexes
+            ],
+            dtype=np.int64,
+        )
+        self._adjusted_cumulative_probabilities = functools.lru_cache(
+            maxsize=self.multiplier_cache_size
+        )(self._get_adjusted_cumulative_probabilities)
 
     @classmethod
     def from_disease_config(
@@ -148,37 +180,106 @@ class HealthIndexGenerator:
 
         return final_age
 
-    def __call__(self, person: "Person", infection_id: int):
+    def _get_age_index(self, age: int, sex: str) -> int:
+        if self.use_physiological_age:
+            return self.physiological_age(age, sex)
+        return age
+
+    def _get_indices(self, person: "Person"):
         """
-        Computes the probability of having all 8 posible outcomes for all ages between 0 and 100,
-             self.max_mild_symptom_tag = [
-                tag.value for tag in SymptomTag if tag.name == "severe"
-            ][0]       for male and female
-        Given the person and the id of the infection responsible for the symptoms
+        Indices of the row of the cumulative table that applies to a person.
         """
         if (
             person.residence is not None
             and person.residence.group.spec == "care_home"
             and person.age >= self.care_home_min_age
         ):
-            population = "ch"
+            population_index = 0
         else:
-            population = "gp"
-        if self.use_physiological_age:
-            physiological_age = self.physiological_age(int(person.age), person.sex)
+            population_index = 1
+        sex_index = _sex_index[person.sex]
+        age = int(person.age)
+        if age <= self.max_age:
+            age_index = int(self._physiological_ages[sex_index, age])
         else:
-            physiological_age = int(person.age)
-        probabilities = self.probabilities[population][person.sex][physiological_age]
-        if infection_id is not None:
-            effective_multiplier = person.immunity.get_effective_multiplier(
-                infection_id
+            age_index = self._get_age_index(age, person.sex)
+        return population_index, sex_index, age_index
+
+    def _get_adjusted_cumulative_probabilities(
+        self,
+        population_index: int,
+        sex_index: int,
+        age_index: int,
+        effective_multiplier: float,
+    ) -> np.ndarray:
+        probabilities = self.probabilities[_populations[population_index]][
+            _sexes[sex_index]
+        ][age_index]
+        cum_probabilities = np.cumsum(
+            self.apply_effective_multiplier(probabilities, effective_multiplier)
+        )
+        cum_probabilities.flags.writeable = False
+        return cum_probabilities
+
+    def _get_cumulative_probabilities(self, indices, effective_multiplier: float):
+        if effective_multiplier != 1.0:
+            return self._adjusted_cumulative_probabilities(
+                *indices, round(float(effective_multiplier), self.multiplier_decimals)
+            )
+        return self.cumulative_table[indices]
+
+    def __call__(self, person: "Person", infection_id: int):
+        """
+        Computes the cumulative probabilities of the possible outcomes of an
+        infection, given the person and the id of the infection responsible for
+        the symptoms. Rows are looked up in a table precomputed for every
+        population, sex and age, and rows adjusted by an effective multiplier are
+        cached. The returned array is read-only.
+        """
+        indices = self._get_indices(person)
+        if infection_id is None:
+            return self.cumulative_table[indices]
+        return self._get_cumulative_probabilities(
+            indices, person.immunity.get_effective_multiplier(infection_id)
+        )
+
+    def cumulative_probabilities(self, people, infection_id: int = None) -> np.ndarray:
+        """
+        Computes the cumulative probabilities of the possible outcomes of an
+        infection for many people at once.
+
+        Parameters
+        ----------
+        people
+            people to compute the probabilities for
+        infection_id
+            id of the infection responsible for the symptoms, if None effective
+            multipliers are not applied
+
+        Returns
+        -------
+        array of shape (len(people), number of outcomes), row i being the health
+        index of people[i]
+        """
+        indices = np.array(
+            [self._get_indices(person) for person in people], dtype=np.int64
+        ).reshape(-1, 3)
+        cum_probabilities = self.cumulative_table[
+            indices[:, 0], indices[:, 1], indices[:, 2]
+        ]
+        if infection_id is None:
+            return cum_probabilities
+        effective_multipliers = np.array(
+            [
+                person.immunity.get_effective_multiplier(infection_id)
+                for person in people
+            ],
+            dtype=np.float64,
+        )
+        for i in np.flatnonzero(effective_multipliers != 1.0):
+            cum_probabilities[i] = self._get_cumulative_probabilities(
+                tuple(indices[i].tolist()), effective_multipliers[i]
             )
-            if effective_multiplier != 1.0:
-                probabilities = self.apply_effective_multiplier(
-                    probabilities, effective_multiplier
-                )
-        
-        cum_probabilities = np.cumsum(probabilities)
         return cum_probabilities
 
     def apply_effective_multiplier(self, probabilities, effective_multiplier):
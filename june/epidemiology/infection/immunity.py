@@ -1,35 +1,255 @@
+import numpy as np
+from collections.abc import MutableMapping
+
+
+class InfectionIdTable:
+    """
+    Dense table mapping infection ids (which are hashes of the infection class names)
+    to consecutive column indices, so that per infection quantities can be stored
+    in arrays. Columns are assigned the first time an infection id is seen.
+    """
+
+    _index = {}  # maps infection id -> column
+    _ids = []  # maps column -> infection id
+
+    @classmethod
+    def index(cls, infection_id: int) -> int:
+        column = cls._index.get(infection_id)
+        if column is None:
+            column = len(cls._ids)
+            cls._index[infection_id] = column
+            cls._ids.append(infection_id)
+        return column
+
+    @classmethod
+    def infection_id(cls, column: int) -> int:
+        return cls._ids[column]
+
+    @classmethod
+    def n_infections(cls) -> int:
+        return len(cls._ids)
+
+    @classmethod
+    def infection_ids(cls) -> list:
+        return list(cls._ids)
+
+
+class ImmunityStore:
+    """
+    Population level storage of the susceptibilities and effective multipliers of
+    every person, as dense float64 ``[n_people, n_infection_types]`` arrays whose
+    columns are given by ``InfectionIdTable``. Each ``Immunity`` owns one row, which
+    is returned to a free list by ``Immunity.release`` when the immunity is replaced
+    (e.g. loading a checkpoint), so that rebuilding the population reuses the rows.
+    ``reset`` drops every row at once.
+    Values default to 1.0 (fully susceptible, no reduction of the symptoms), and
+    boolean masks of the same shape record which entries were set, so that rows
+    behave as the dictionaries they replace. Values are kept in double precision
+    rather than float32 so that they round trip exactly through checkpoints and the
+    MPI exchange, at 2 x 9 bytes per person and infection type.
+    """
+
+    names = ("susceptibilities", "effective_multipliers")
+    susceptibilities = np.ones((0, 1), dtype=np.float64)
+    effective_multipliers = np.ones((0, 1), dtype=np.float64)
+    present = {name: np.zeros((0, 1), dtype=bool) for name in names}
+    n_rows = 0
+    free_rows = []
+
+    @classmethod
+    def allocate_row(cls) -> int:
+        """
+        Returns the index of a free row, growing the arrays if needed.
+        """
+        if cls.free_rows:
+            return cls.free_rows.pop()
+        if cls.n_rows == len(cls.susceptibilities):
+            cls._resize(max(1024, 2 * cls.n_rows), cls.susceptibilities.shape[1])
+        row = cls.n_rows
+        cls.n_rows += 1
+        return row
+
+    @classmethod
+    def free_row(cls, row: int):
+        """
+        Resets the given row to the defaults and makes it available again.
+        """
+        for name in cls.names:
+            getattr(cls, name)[row] = 1.0
+            cls.present[name][row] = False
+        cls.free_rows.append(row)
+
+    @classmethod
+    def ensure_column(cls, column: int):
+        if column >= cls.susceptibilities.shape[1]:
+            cls._resize(len(cls.susceptibilities), column + 1)
+
+    @classmethod
+    def _resize(cls, n_rows: int, n_columns: int):
+        for name in cls.names:
+            old = getattr(cls, name)
+            new = np.ones((n_rows, n_columns), dtype=np.float64)
+            new[: old.shape[0], : old.shape[1]] = old
+            setattr(cls, name, new)
+            old_present = cls.present[name]
+            new_present = np.zeros((n_rows, n_columns), dtype=bool)
+            new_present[: old_present.shape[0], : old_present.shape[1]] = old_present
+            cls.present[name] = new_present
+
+    @classmethod
+    def _column(cls, name: str, infection_id: int):
+        column = InfectionIdTable._index.get(infection_id)
+        if column is None or column >= getattr(cls, name).shape[1]:
+            return None
+        return column
+
+    @classmethod
+    def get(cls, name: str, row: int, infection_id: int, default: float = 1.0):
+        column = cls._column(name, infection_id)
+        if column is None or not cls.present[name][row, column]:
+            return default
+        return float(getattr(cls, name)[row, column])
+
+    @classmethod
+    def contains(cls, name: str, row: int, infection_id: int) -> bool:
+        column = cls._column(name, infection_id)
+        return column is not None and bool(cls.present[name][row, column])
+
+    @classmethod
+    def set(cls, name: str, row: int, infection_id: int, value: float):
+        column = InfectionIdTable.index(infection_id)
+        cls.ensure_column(column)
+        getattr(cls, name)[row, column] = value
+        cls.present[name][row, column] = True
+
+    @classmethod
+    def delete(cls, name: str, row: int, infection_id: int):
+        column = cls._column(name, infection_id)
+        if column is None or not cls.present[name][row, column]:
+            raise KeyError(infection_id)
+        getattr(cls, name)[row, column] = 1.0
+        cls.present[name][row, column] = False
+
+    @classmethod
+    def columns(cls, name: str, row: int) -> np.ndarray:
+        """
+        Columns of the entries set in the given row.
+        """
+        return np.flatnonzero(cls.present[name][row])
+
+    @classmethod
+    def reset(cls):
+        cls.susceptibilities = np.ones((0, 1), dtype=np.float64)
+        cls.effective_multipliers = np.ones((0, 1), dtype=np.float64)
+        cls.present = {name: np.zeros((0, 1), dtype=bool) for name in cls.names}
+        cls.n_rows = 0
+        cls.free_rows = []
+
+
+class ImmunityRowView(MutableMapping):
+    """
+    Dictionary-like view (infection id -> value) of one row of the
+    ``ImmunityStore``, kept so that code written against the old
+    ``susceptibility_dict`` and ``effective_multiplier_dict`` keeps working.
+    """
+
+    __slots__ = "name", "row"
+
+    def __init__(self, name: str, row: int):
+        self.name = name
+        self.row = row
+
+    def __getitem__(self, infection_id):
+        if not ImmunityStore.contains(self.name, self.row, infection_id):
+            raise KeyError(infection_id)
+        return ImmunityStore.get(self.name, self.row, infection_id)
+
+    def get(self, infection_id, default=None):
+        return ImmunityStore.get(self.name, self.row, infection_id, default)
+
+    def __setitem__(self, infection_id, value):
+        ImmunityStore.set(self.name, self.row, infection_id, value)
+
+    def __delitem__(self, infection_id):
+        ImmunityStore.delete(self.name, self.row, infection_id)
+
+    def __iter__(self):
+        for column in ImmunityStore.columns(self.name, self.row):
+            yield InfectionIdTable.infection_id(column)
+
+    def __len__(self):
+        return len(ImmunityStore.columns(self.name, self.row))
+
+    def __contains__(self, infection_id):
+        return ImmunityStore.contains(self.name, self.row, infection_id)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
 class Immunity:
     """
     This class stores the "medical record" of the person,
     indicating which infections the person has recovered from.
+    The values live in a row of the population level ``ImmunityStore``.
     """
 
-    __slots__ = "susceptibility_dict", "effective_multiplier_dict"
+    __slots__ = ("row",)
 
     def __init__(
         self, susceptibility_dict: dict = None, effective_multiplier_dict: dict = None
     ):
+        self.row = ImmunityStore.allocate_row()
         if susceptibility_dict:
-            self.susceptibility_dict = susceptibility_dict
-        else:
-            self.susceptibility_dict = {}
+            for infection_id, susceptibility in susceptibility_dict.items():
+                ImmunityStore.set("susceptibilities", self.row, infection_id, susceptibility)
         if effective_multiplier_dict:
-            self.effective_multiplier_dict = effective_multiplier_dict
-        else:
-            self.effective_multiplier_dict = {}
+            for infection_id, multiplier in effective_multiplier_dict.items():
+                ImmunityStore.set("effective_multipliers", self.row, infection_id, multiplier)
+
+    def release(self):
+        """
+        Returns the row to the ``ImmunityStore``. Must be called when the immunity
+        is discarded, and the immunity must not be used afterwards.
+        """
+        if self.row >= 0:
+            ImmunityStore.free_row(self.row)
+            self.row = -1
+
+    def __reduce__(self):
+        # copies and pickles get rows of their own
+        return (
+            Immunity,
+            (dict(self.susceptibility_dict), dict(self.effective_multiplier_dict)),
+        )
+
+    @property
+    def susceptibility_dict(self):
+        return ImmunityRowView("susceptibilities", self.row)
+
+    @property
+    def effective_multiplier_dict(self):
+        return ImmunityRowView("effective_multipliers", self.row)
+
+    @property
+    def susceptibilities(self):
+        """
+        Susceptibility row, indexed by the columns of ``InfectionIdTable``.
+        """
+        return ImmunityStore.susceptibilities[self.row]
 
     def add_immunity(self, infection_ids):
         for infection_id in infection_ids:
-            self.susceptibility_dict[infection_id] = 0.0
+            ImmunityStore.set("susceptibilities", self.row, infection_id, 0.0)
 
     def add_multiplier(self, infection_id, multiplier):
-        self.effective_multiplier_dict[infection_id] = multiplier
+        ImmunityStore.set("effective_multipliers", self.row, infection_id, multiplier)
 
     def get_susceptibility(self, infection_id):
-        return self.susceptibility_dict.get(infection_id, 1.0)
+        return ImmunityStore.get("susceptibilities", self.row, infection_id)
 
     def get_effective_multiplier(self, infection_id):
-        multiplier = self.effective_multiplier_dict.get(infection_id, 1.0)
+        multiplier = ImmunityStore.get("effective_multipliers", self.row, infection_id)
         # Print statement for visualization
         '''print(
             f"Input: infection_id={infection_id} | "
@@ -40,10 +260,15 @@ class Immunity:
     
 
     def serialize(self):
+        """
+        Returns the infection ids and values of the susceptibilities that were set,
+        for MPI communication.
+        """
+        columns = ImmunityStore.columns("susceptibilities", self.row)
         return (
-            list(self.susceptibility_dict.keys()),
-            list(self.susceptibility_dict.values()),
+            [InfectionIdTable.infection_id(column) for column in columns],
+            self.susceptibilities[columns].tolist(),
         )
 
     def is_immune(self, infection_id):
-        return self.susceptibility_dict.get(infection_id, 1.0) == 0.0
+        return self.get_susceptibility(infection_id) == 0.0
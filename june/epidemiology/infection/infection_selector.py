@@ -7,7 +7,12 @@ from .infection import Measles
 from .infection import EVD68V
 from .symptoms import Symptoms
 from .trajectory_maker import TrajectoryMakers
-from .transmission import TransmissionConstant, TransmissionGamma
+from .transmission import (
+    TransmissionConstant,
+    TransmissionGamma,
+    TransmissionProbabilities,
+)
+from june.epidemiology.active_infections import ActiveInfections
 from .transmission_xnexp import TransmissionXNExp
 from .trajectory_maker import CompletionTime
 from .disease_config import DiseaseConfig
@@ -155,7 +160,10 @@ class InfectionSelector:
             The time at which the infection occurs.
         """
         # Create and assign infection
+        TransmissionProbabilities.discard(person)
         person.infection = self._make_infection(person, time)
+        ActiveInfections.add(person)
+        TransmissionProbabilities.register(person)
 
         # Update immunity
         immunity_ids = person.infection.immunity_ids()
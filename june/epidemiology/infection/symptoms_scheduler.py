@@ -0,0 +1,69 @@
+import heapq
+
+
+class SymptomsScheduler:
+    """
+    Calendar of the next symptom transitions of the infected people. The symptoms
+    trajectory of an infection is drawn when the person gets infected, so the time
+    at which they reach their next stage is known in advance. The scheduler keeps a
+    priority queue keyed on that time, so that every time step only the people
+    whose symptoms change have their trajectory stage updated.
+
+    Entries are not removed when an infection ends or is replaced (e.g. recovery,
+    death or a mutation). Popping a stale entry is harmless, since
+    ``Symptoms.update_trajectory_stage`` checks the time of the transition itself
+    and the person is then scheduled again from their current infection.
+    """
+
+    # transitions closer than this to the end of the time step are popped too, the
+    # stage update checks the exact condition
+    time_tolerance = 1e-9
+
+    def __init__(self):
+        self._queue = []  # heap of (transition time, person id, stage)
+        self._scheduled = {}  # maps person id -> (infection, stage) of its entry
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def schedule(self, person):
+        """
+        Queues the next symptom transition of an infected person, unless it is
+        already queued.
+        """
+        infection = person.infection
+        symptoms = infection.symptoms
+        stage = symptoms.stage
+        scheduled = self._scheduled.get(person.id)
+        if scheduled is not None and scheduled[0] is infection and scheduled[1] == stage:
+            return
+        if stage + 1 >= len(symptoms.trajectory):
+            # last stage of the trajectory, there is nothing to schedule
+            self._scheduled.pop(person.id, None)
+            return
+        transition_time = infection.start_time + symptoms.trajectory[stage + 1][0]
+        heapq.heappush(self._queue, (transition_time, person.id, stage))
+        self._scheduled[person.id] = (infection, stage)
+
+    def pop_due(self, time: float) -> set:
+        """
+        Removes from the queue the people whose next transition happens before
+        ``time``.
+
+        Returns
+        -------
+        set with the ids of those people
+        """
+        due = set()
+        queue = self._queue
+        while queue and queue[0][0] < time + self.time_tolerance:
+            _, person_id, stage = heapq.heappop(queue)
+            scheduled = self._scheduled.get(person_id)
+            if scheduled is not None and scheduled[1] == stage:
+                del self._scheduled[person_id]
+                due.add(person_id)
+        return due
+
+    def clear(self):
+        self._queue.clear()
+        self._scheduled.clear()
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
+from math import log
 from typing import List, Tuple
 
+import numpy as np
 import yaml
 from scipy.stats import beta, lognorm, norm, expon, exponweib
 
@@ -69,12 +71,74 @@ class ConstantCompletionTime(CompletionTime):
 
 
 class DistributionCompletionTime(CompletionTime, ABC):
+    # quantile tables span logit(u) in [-table_max_logit, table_max_logit]
+    table_max_logit = 12.0
+
     def __init__(self, distribution, *args, **kwargs):
         self._distribution = distribution
         self.args = args
         self.kwargs = kwargs
+        self.table_size = 0
+        self._quantiles = None
+
+    def use_quantile_table(self, table_size: int):
+        """
+        Makes the completion times be drawn by inverse transform sampling from a
+        table of ``table_size`` quantiles of the distribution, evaluated at once
+        the first time a completion time is drawn. Every completion time then
+        costs one uniform from ``np.random`` and a linear interpolation in the
+        table, instead of a call to the distribution. The quantiles are tabulated
+        on an evenly spaced grid of logit(u), so that the steep ends of the
+        quantile function are finely sampled. Uniforms beyond the grid, with a
+        probability of 2 / (1 + exp(table_max_logit)) (about 1 in 80000 draws),
+        are mapped with the exact quantile function, so the tails are kept. A
+        table size of 0 draws every completion time from the distribution.
+
+        Each completion time consumes exactly one uniform from the global
+        generator at the moment it is drawn, so when that generator is seeded
+        from the stream of the person being infected (see
+        ``RandomStreams.seeded``) the trajectory only depends on the person, as
+        with direct draws. Samples drawn ahead of time and shared between
+        infections would make it depend on the infections created before instead.
+
+        Parameters
+        ----------
+        table_size
+            number of quantiles in the table
+        """
+        self.table_size = table_size
+        self._quantiles = None
+
+    def _get_quantiles(self) -> list:
+        if self._quantiles is None:
+            logits = np.linspace(
+                -self.table_max_logit, self.table_max_logit, self.table_size
+            )
+            self._quantiles = self._distribution.ppf(
+                1.0 / (1.0 + np.exp(-logits)), *self.args, **self.kwargs
+            ).tolist()
+        return self._quantiles
+
+    def from_uniform(self, uniform: float) -> float:
+        """
+        Completion time at the given quantile of the distribution.
+        """
+        if self.table_size and 0.0 < uniform < 1.0:
+            position = (log(uniform / (1.0 - uniform)) + self.table_max_logit) * (
+                (self.table_size - 1) / (2 * self.table_max_logit)
+            )
+        else:
+            position = -1.0
+        if position < 0 or position >= self.table_size - 1:
+            return float(self._distribution.ppf(uniform, *self.args, **self.kwargs))
+        index = int(position)
+        fraction = position - index
+        quantiles = self._get_quantiles()
+        return quantiles[index] + (quantiles[index + 1] - quantiles[index]) * fraction
 
     def __call__(self):
+        if self.table_size:
+            return self.from_uniform(np.random.random())
         # Note that we are using:
         #     self.distribution.rvs(*args, **kwargs)
         # rather than:
@@ -263,16 +327,34 @@ class TrajectoryMakers:
     __instance = None
     __path = None
 
-    def __init__(self, trajectories: List[TrajectoryMaker]):
+    def __init__(self, trajectories: List[TrajectoryMaker], table_size: int = 0):
         """
         Trajectories and their stages should be parsed from configuration. I've
         removed params for now as they weren't being used but it will be trivial
         to reintroduce them when we are ready for configurable trajectories.
+
+        If ``table_size`` is not 0, the quantiles of the stages that follow a
+        distribution are tabulated, see ``use_quantile_tables``.
         """
         self.trajectories = {
             trajectory.most_severe_symptoms: trajectory for trajectory in trajectories
         }
-    
+        self.use_quantile_tables(table_size)
+
+    def use_quantile_tables(self, table_size: int):
+        """
+        Tabulates the quantiles of the stages that follow a distribution with
+        ``table_size`` points, so that generating a trajectory interpolates in the
+        tables instead of calling the distribution once per stage (see
+        ``DistributionCompletionTime.use_quantile_table``). The completion times
+        then differ from the exact ones by the interpolation error. A table size
+        of 0 draws every completion time from the distribution.
+        """
+        for trajectory in self.trajectories.values():
+            for stage in trajectory.stages:
+                if isinstance(stage.completion_time, DistributionCompletionTime):
+                    stage.completion_time.use_quantile_table(table_size)
+
     @classmethod
     def from_disease_config(cls, disease_config: DiseaseConfig) -> "TrajectoryMakers":
         """
@@ -351,7 +433,7 @@ class TrajectoryMakers:
         A list describing the symptoms experienced by the patient
         at given times.
         """
-        return self.trajectories[tag].ory()
+        return self.trajectories[tag].generate_trajectory()
 
     @classmethod
     def from_list(cls, trajectory_dicts, dynamic_tags=None):
@@ -17,16 +17,64 @@ default_gamma_config_path = (
 
 
 class Transmission:
-    __slots__ = "probability"
+    """
+    Infectiousness profile of an infection. Once the infection is registered in
+    ``TransmissionProbabilities``, its probability lives in the array of that
+    class, which computes the probabilities of all the infected at once.
+    """
+
+    __slots__ = ("_probability", "row")
+    # attributes the profile is computed from, copied to the parameters of
+    # TransmissionProbabilities when the infection is registered. Classes that
+    # define them also implement ``infection_probabilities``
+    parameter_names = ()
 
     def __init__(self):
-        self.probability = 0.0
+        self._probability = 0.0
+        # row in TransmissionProbabilities, None if not registered
+        self.row = None
+
+    @property
+    def probability(self) -> float:
+        if self.row is None:
+            return self._probability
+        return TransmissionProbabilities.probabilities.item(self.row)
+
+    @probability.setter
+    def probability(self, probability: float):
+        if self.row is None:
+            self._probability = probability
+        else:
+            TransmissionProbabilities.probabilities[self.row] = probability
 
     def update_infection_probability(self, time_from_infection):
         raise NotImplementedError()
 
+    @staticmethod
+    def infection_probabilities(
+        times_from_infection: np.ndarray,
+        parameters: np.ndarray,
+        probabilities: np.ndarray,
+    ):
+        """
+        Computes the infection probabilities of many infections of this class at
+        once, for classes with ``parameter_names``.
+
+        Parameters
+        ----------
+        times_from_infection:
+            time elapsed since each infection
+        parameters:
+            array with a row per infection and the ``parameter_names`` as columns
+        probabilities:
+            array where the probabilities are written
+        """
+        raise NotImplementedError()
+
 
 class TransmissionConstant(Transmission):
+    parameter_names = ("probability",)
+
     def __init__(self, probability=0.3):
         super().__init__()
         self.probability = probability
@@ -43,6 +91,10 @@ class TransmissionConstant(Transmission):
     def update_infection_probability(self, time_from_infection):
         pass
 
+    @staticmethod
+    def infection_probabilities(times_from_infection, parameters, probabilities):
+        probabilities[:] = parameters[:, 0]
+
 
 @nb.jit(nopython=True)
 def gamma_pdf(x: float, a: float, loc: float, scale: float) -> float:
@@ -106,6 +158,33 @@ def gamma_pdf_vectorized(x: float, a: float, loc: float, scale: float) -> float:
     )
 
 
+@nb.jit(nopython=True)
+def gamma_probabilities(
+    times_from_infection: np.ndarray,
+    shapes: np.ndarray,
+    shifts: np.ndarray,
+    scales: np.ndarray,
+    norms: np.ndarray,
+    probabilities: np.ndarray,
+):
+    """
+    Evaluates the gamma infectiousness profile of many infections in one call.
+
+    Parameters
+    ----------
+    times_from_infection:
+        time elapsed since each infection
+    shapes, shifts, scales, norms:
+        parameters of the profile of each infection
+    probabilities:
+        array where the infection probabilities are written
+    """
+    for i in range(len(times_from_infection)):
+        probabilities[i] = norms[i] * gamma_pdf(
+            times_from_infection[i], shapes[i], shifts[i], scales[i]
+        )
+
+
 class TransmissionGamma(Transmission):
     """
     Module to simulate the infectiousness profiles found in :
@@ -113,7 +192,8 @@ class TransmissionGamma(Transmission):
         - https://arxiv.org/pdf/2007.06602.pdf
     """
 
-    __slots__ = ("shape", "shift", "scale", "norm", "probability")
+    __slots__ = ("shape", "shift", "scale", "norm")
+    parameter_names = ("shape", "shift", "scale", "norm")
 
     def __init__(
         self,
@@ -144,6 +224,7 @@ class TransmissionGamma(Transmission):
         mild_infectious_factor:
             factor to reduce the infectiousness of mild individuals
         """
+        super().__init__()
         self.shape = shape
         self.shift = shift
         self.scale = 1.0 / rate
@@ -157,7 +238,6 @@ class TransmissionGamma(Transmission):
                 asymptomatic_infectious_factor=asymptomatic_infectious_factor,
                 mild_infectious_factor=mild_infectious_factor,
             )
-        self.probability = 0.0
 
     @classmethod
     def from_file(
@@ -265,6 +345,21 @@ class TransmissionGamma(Transmission):
             x=time_from_infection, a=self.shape, loc=self.shift, scale=self.scale
         )
 
+    @staticmethod
+    def infection_probabilities(times_from_infection, parameters, probabilities):
+        """
+        Evaluates the profile of many infections with ``gamma_probabilities``, see
+        ``Transmission.infection_probabilities``.
+        """
+        gamma_probabilities(
+            times_from_infection,
+            parameters[:, 0],
+            parameters[:, 1],
+            parameters[:, 2],
+            parameters[:, 3],
+            probabilities,
+        )
+
     @property
     def time_at_maximum_infectivity(self) -> float:
         """
@@ -305,3 +400,165 @@ class TransmissionGamma(Transmission):
         elif mild_infectious_factor is not None and max_symptoms == "mild":
             return mild_infectious_factor
         return 1.0
+
+
+class TransmissionProbabilities:
+    """
+    Contiguous arrays with the infections of the domain: their start times, the
+    parameters of their infectiousness profiles and their infection
+    probabilities. An infection gets a row when it is registered (see
+    ``InfectionSelector.infect_person_at_time``), which is filled once from its
+    transmission, and gives it back when it ends. ``update`` then computes the
+    probabilities of all the rows of every transmission class in a single call
+    to the class kernel (see ``Transmission.infection_probabilities``), once per
+    time step, without visiting the transmissions. The ``probability`` of a
+    registered transmission is read from here.
+    """
+
+    probabilities = np.zeros(0, dtype=np.float64)
+    start_times = np.zeros(0, dtype=np.float64)
+    parameters = np.zeros((0, 1), dtype=np.float64)
+    class_indices = np.zeros(0, dtype=np.int64)  # -1 for free rows
+    transmissions = []  # transmission of every row, None for free rows
+    free_rows = []
+    _classes = []  # maps class index -> transmission class
+    _class_indices = {}  # maps transmission class -> class index
+
+    @classmethod
+    def _resize(cls, n_rows: int, n_parameters: int):
+        old_rows, old_parameters = cls.parameters.shape
+        for name, fill in (("probabilities", 0.0), ("start_times", 0.0)):
+            new = np.full(n_rows, fill, dtype=np.float64)
+            new[:old_rows] = getattr(cls, name)
+            setattr(cls, name, new)
+        class_indices = np.full(n_rows, -1, dtype=np.int64)
+        class_indices[:old_rows] = cls.class_indices
+        cls.class_indices = class_indices
+        parameters = np.zeros((n_rows, n_parameters), dtype=np.float64)
+        parameters[:old_rows, :old_parameters] = cls.parameters
+        cls.parameters = parameters
+        cls.free_rows += range(n_rows - 1, old_rows - 1, -1)
+        cls.transmissions += [None] * (n_rows - old_rows)
+
+    @classmethod
+    def _class_index(cls, transmission_class) -> int:
+        class_index = cls._class_indices.get(transmission_class)
+        if class_index is None:
+            class_index = len(cls._classes)
+            cls._class_indices[transmission_class] = class_index
+            cls._classes.append(transmission_class)
+        return class_index
+
+    @classmethod
+    def register(cls, person):
+        """
+        Stores the infection of a person in a free row.
+        """
+        infection = person.infection
+        transmission = infection.transmission
+        cls.release(transmission)
+        n_parameters = len(transmission.parameter_names)
+        if n_parameters > cls.parameters.shape[1]:
+            cls._resize(len(cls.transmissions), n_parameters)
+        if not cls.free_rows:
+            cls._resize(max(1024, 2 * len(cls.transmissions)), cls.parameters.shape[1])
+        row = cls.free_rows.pop()
+        cls.transmissions[row] = transmission
+        cls.class_indices[row] = cls._class_index(type(transmission))
+        cls.start_times[row] = infection.start_time
+        cls.parameters[row, :n_parameters] = [
+            getattr(transmission, name) for name in transmission.parameter_names
+        ]
+        cls.probabilities[row] = transmission._probability
+        transmission.row = row
+
+    @classmethod
+    def release(cls, transmission):
+        """
+        Frees the row of a transmission, which keeps its last probability.
+        """
+        row = transmission.row
+        if row is None:
+            return
+        transmission._probability = cls.probabilities.item(row)
+        transmission.row = None
+        cls.transmissions[row] = None
+        cls.class_indices[row] = -1
+        cls.free_rows.append(row)
+
+    @classmethod
+    def discard(cls, person):
+        """
+        Frees the row of the infection of a person, e.g. because they recovered.
+        """
+        if person.infection is not None:
+            cls.release(person.infection.transmission)
+
+    @classmethod
+    def update(cls, time: float):
+        """
+        Computes the infection probabilities of all the registered infections.
+
+        Parameters
+        ----------
+        time:
+            time (from the start of the simulation) at which the probabilities are
+            evaluated
+        """
+        for class_index, transmission_class in enumerate(cls._classes):
+            rows = np.flatnonzero(cls.class_indices == class_index)
+            if not len(rows):
+                continue
+            times_from_infection = time - cls.start_times[rows]
+            if transmission_class.parameter_names:
+                probabilities = np.empty(len(rows), dtype=np.float64)
+                transmission_class.infection_probabilities(
+                    times_from_infection,
+                    cls.parameters[rows, : len(transmission_class.parameter_names)],
+                    probabilities,
+                )
+                cls.probabilities[rows] = probabilities
+            else:
+                # classes without a kernel update their rows one by one
+                for row, time_from_infection in zip(
+                    rows.tolist(), times_from_infection.tolist()
+                ):
+                    cls.transmissions[row].update_infection_probability(
+                        time_from_infection
+                    )
+
+    @classmethod
+    def get_probabilities(cls, transmissions) -> np.ndarray:
+        """
+        Infection probabilities of the given transmissions, read from the
+        probabilities array with a single index of their rows. Transmissions that
+        are not registered give their own probability.
+        """
+        rows = np.fromiter(
+            (
+                -1 if transmission.row is None else transmission.row
+                for transmission in transmissions
+            ),
+            dtype=np.int64,
+            count=len(transmissions),
+        )
+        registered = rows >= 0
+        if registered.all():
+            return cls.probabilities[rows]
+        probabilities = np.empty(len(rows), dtype=np.float64)
+        probabilities[registered] = cls.probabilities[rows[registered]]
+        for i in np.flatnonzero(~registered):
+            probabilities[i] = transmissions[i]._probability
+        return probabilities
+
+    @classmethod
+    def clear(cls):
+        for transmission in cls.transmissions:
+            if transmission is not None:
+                cls.release(transmission)
+        cls.probabilities = np.zeros(0, dtype=np.float64)
+        cls.start_times = np.zeros(0, dtype=np.float64)
+        cls.parameters = np.zeros((0, 1), dtype=np.float64)
+        cls.class_indices = np.zeros(0, dtype=np.int64)
+        cls.transmissions = []
+        cls.free_rows = []
@@ -71,6 +71,31 @@ def update_probability(
         return 0.0
 
 
+@nb.jit(nopython=True)
+def update_probabilities(
+    times_from_infection: np.ndarray,
+    times_first_infectious: np.ndarray,
+    norms: np.ndarray,
+    norm_times: np.ndarray,
+    alphas: np.ndarray,
+    ns: np.ndarray,
+    probabilities: np.ndarray,
+):
+    """
+    Evaluates ``update_probability`` for many infections in one call, writing the
+    results into ``probabilities``.
+    """
+    for i in range(len(times_from_infection)):
+        probabilities[i] = update_probability(
+            times_from_infection[i],
+            times_first_infectious[i],
+            norms[i],
+            norm_times[i],
+            alphas[i],
+            ns[i],
+        )
+
+
 class TransmissionXNExp(Transmission):
     __slots__ = (
         "time_first_infectious",
@@ -78,8 +103,8 @@ class TransmissionXNExp(Transmission):
         "n",
         "alpha",
         "norm",
-        "probability",
     )
+    parameter_names = ("time_first_infectious", "norm", "norm_time", "alpha", "n")
 
     def __init__(
         self,
@@ -116,6 +141,7 @@ class TransmissionXNExp(Transmission):
             multiplier that lowers the infectiousness of mild cases
 
         """
+        super().__init__()
         self.time_first_infectious = time_first_infectious
         self.norm_time = norm_time
         self.n = n
@@ -128,7 +154,6 @@ class TransmissionXNExp(Transmission):
             asymptomatic_infectious_factor=asymptomatic_infectious_factor,
             mild_infectious_factor=mild_infectious_factor,
         )
-        self.probability = 0.0
 
     @classmethod
     def from_file(
@@ -258,6 +283,22 @@ class TransmissionXNExp(Transmission):
             self.n,
         )
 
+    @staticmethod
+    def infection_probabilities(times_from_infection, parameters, probabilities):
+        """
+        Evaluates the profile of many infections with ``update_probabilities``, see
+        ``Transmission.infection_probabilities``.
+        """
+        update_probabilities(
+            times_from_infection,
+            parameters[:, 0],
+            parameters[:, 1],
+            parameters[:, 2],
+            parameters[:, 3],
+            parameters[:, 4],
+            probabilities,
+        )
+
     def _modify_infectiousness_for_symptoms(
         self, max_symptoms: str, asymptomatic_infectious_factor, mild_infectious_factor
     ):
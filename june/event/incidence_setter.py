@@ -2,6 +2,7 @@ from typing import Union, Dict
 import datetime
 from random import sample, choices
 
+from june.epidemiology.infection import TransmissionProbabilities
 from .event import Event
 
 
@@ -36,6 +37,7 @@ class IncidenceSetter(Event):
                     n_to_remove = int((incidence - target_incidence) * len(people))
                     to_cure = sample(infected_people, n_to_remove)
                     for person in to_cure:
+                        TransmissionProbabilities.discard(person)
                         person.infection = None
                 elif incidence < target_incidence:
                     n_to_add = int((target_incidence - incidence) * len(people))
@@ -2,7 +2,7 @@ import datetime
 from typing import Union, Dict
 from random import random
 
-from june.epidemiology.infection import B117
+from june.epidemiology.infection import B117, TransmissionProbabilities
 from .event import Event
 
 
@@ -59,4 +59,6 @@ class Mutation(Event):
                     new_infection.time_of_testing = person.infection.time_of_testing
                     new_infection.start_time = person.infection.start_time
                     new_infection.symptoms = person.infection.symptoms
+                    TransmissionProbabilities.discard(person)
                     person.infection = new_infection
+                    TransmissionProbabilities.register(person)
@@ -164,13 +164,15 @@ class Airport(Group):
         """Check if airport is at max concurrent occupancy"""
         return self.size >= self.max_concurrent_occupancy
 
-    def get_interactive_group(self, people_from_abroad=None):
+    def get_interactive_group(self, people_from_abroad=None, arrays=None):
         """
         Create interactive group with infection model:
         P_transmission = β_airport * t_overlap * c_interaction
         P_airport_infection = 1 - ∏(1 - P_transmission,i)
         """
-        interactive_group = InteractiveGroup(self, people_from_abroad=people_from_abroad)
+        interactive_group = InteractiveGroup(
+            self, people_from_abroad=people_from_abroad, arrays=arrays
+        )
         
         # Get β_airport from config
         beta_airport = self.config["contact_matrices"]["travelers"]["travelers"]
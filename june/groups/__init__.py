@@ -1,5 +1,15 @@
 from .group.group import Group
-from .group import AbstractGroup, Subgroup, Supergroup, ExternalSubgroup, ExternalGroup
+from .group import (
+    AbstractGroup,
+    Subgroup,
+    Supergroup,
+    ExternalSubgroup,
+    ExternalGroup,
+    InfectiousVenues,
+    Placements,
+    ActivityChanges,
+    InteractiveGroupArrays,
+)
 from .boundary import Boundary
 from .care_home import CareHome, CareHomes
 from .cemetery import Cemetery, Cemeteries
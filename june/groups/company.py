@@ -127,8 +127,8 @@ class Company(Group):
     def area(self):
         return self.super_area.areas[0]
 
-    def get_interactive_group(self, people_from_abroad=None):
-        return InteractiveCompany(self, people_from_abroad=people_from_abroad)
+    def get_interactive_group(self, people_from_abroad=None, arrays=None):
+        return InteractiveCompany(self, people_from_abroad=people_from_abroad, arrays=arrays)
 
 
 class Companies(Supergroup):
@@ -301,11 +301,16 @@ def _read_sector_betas():
 class InteractiveCompany(InteractiveGroup):
     sector_betas = _read_sector_betas()
 
-    def __init__(self, group: "Group", people_from_abroad=None):
-        super().__init__(group=group, people_from_abroad=people_from_abroad)
+    def __init__(self, group: "Group", people_from_abroad=None, arrays=None):
+        super().__init__(
+            group=group, people_from_abroad=people_from_abroad, arrays=arrays
+        )
         self.sector = group.sector
        
 
+    def get_processed_beta_key(self, current_time=None):
+        return (self.spec, self.sector, self.region_name, self.lockdown_tier)
+
     def get_processed_beta(self, betas, beta_reductions):
         beta_processed = super().get_processed_beta(
             betas=betas, beta_reductions=beta_reductions
@@ -5,7 +5,8 @@ import time
 import numpy as np
 from june.demography.person import Person
 from june.epidemiology.test_and_trace import TestAndTrace
-from june.mpi_wrapper import mpi_rank, mpi_available, mpi_comm, MPI, mpi_size
+from june.epidemiology.active_infections import TestAndTraceActive
+from june.mpi_wrapper import mpi_rank, mpi_available, mpi_comm, MPI, mpi_size, DomainGraph
 from june.records.event_recording import emit_trace_event
 
 logger = logging.getLogger("contact_manager")
@@ -202,8 +203,6 @@ class ContactManager:
 
     def _handle_mpi_communication(self, round1_notifications):
         """Handle MPI communication for cross-rank notifications."""
-        mpi_comm.Barrier()
-        
         # Check if any rank has notifications for round 1
         local_has_notifications = 1 if any(len(notifications) > 0 for notifications in round1_notifications) else 0
         notification_counts = mpi_comm.allgather(local_has_notifications)
@@ -219,10 +218,6 @@ class ContactManager:
             if global_need_round2:
                 self._exchange_notifications_non_blocking(self.round2_notifications, round_id=1)
                 self.round2_notifications = [[] for _ in range(mpi_size)]
-        else:
-            mpi_comm.Barrier()
-        
-        mpi_comm.Barrier()
 
     def _collect_housemates(self, test_info):
         # Build cache if not already built
@@ -429,8 +424,16 @@ class ContactManager:
             else:
                 send_sizes.append([0, 0])
         
-        # Exchange sizes using alltoall collective operation
-        recv_sizes = mpi_comm.alltoall(send_sizes)
+        # Exchange sizes with the neighbours of this domain, only the ranks that get
+        # notifications are sent their sizes
+        received_sizes = DomainGraph.alltoall(
+            {
+                target_rank: sizes
+                for target_rank, sizes in enumerate(send_sizes)
+                if sizes[0] > 0
+            }
+        )
+        recv_sizes = [received_sizes.get(rank) or [0, 0] for rank in range(mpi_size)]
         
         # PHASE 2: DATA EXCHANGE WITH CHUNKING
         # Set up a custom buffer for MPI communication
@@ -516,9 +519,8 @@ class ContactManager:
         
         # Detach buffer
         MPI.Detach_buffer()
-        
-        # Synchronize all ranks to ensure we're all ready for the next round
-        mpi_comm.Barrier()
+        # all the receives posted for this round have completed, and the next round
+        # starts with a collective, so no barrier is needed here
 
     def _process_received_notification(self, notification, current_time=None):
         """
@@ -570,6 +572,7 @@ class ContactManager:
             return
         
         person.test_and_trace = TestAndTrace()
+        TestAndTraceActive.add(person)
         person.test_and_trace.notification_time = current_time
         person.test_and_trace.scheduled_test_time = current_time
         
@@ -1,4 +1,7 @@
 from .abstract import AbstractGroup
 from .subgroup import Subgroup
+from .infectious_venues import InfectiousVenues
+from .placements import Placements, ActivityChanges
+from .interactive_arrays import InteractiveGroupArrays
 from .supergroup import Supergroup
 from .external import ExternalSubgroup, ExternalGroup
\ No newline at end of file
@@ -11,6 +11,7 @@ from june.demography.person import Person
 from .interactive import InteractiveGroup
 from . import AbstractGroup
 from . import Subgroup
+from .placements import ActivityChanges
 
 from june.groups.group.make_subgroups import SubgroupParams
 
@@ -125,6 +126,7 @@ class Group(AbstractGroup):
         self[subgroup_type].append(person)
         if activity is not None:
             setattr(person.subgroups, activity, self[subgroup_type])
+            ActivityChanges.add_activity(person, activity)
 
     @property
     def people(self) -> Tuple[Person]:
@@ -207,8 +209,10 @@ class Group(AbstractGroup):
         for subgroup in self.subgroups:
             subgroup.clear()
 
-    def get_interactive_group(self, people_from_abroad=None):
-        return InteractiveGroup(self, people_from_abroad=people_from_abroad)
+    def get_interactive_group(self, people_from_abroad=None, arrays=None):
+        return InteractiveGroup(
+            self, people_from_abroad=people_from_abroad, arrays=arrays
+        )
 
     def get_leisure_subgroup(self, person, subgroup_type=None, to_send_abroad=None):
         
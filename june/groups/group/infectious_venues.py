@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+
+class InfectiousVenues:
+    """
+    Index of the groups that contain at least one infector in the current time step.
+    It is filled incrementally as people are placed in subgroups (see ``Subgroup.append``)
+    and with the infected people coming from other domains, and it is emptied when the
+    world is cleared at the end of the time step. The interaction only needs to visit
+    the groups in this index, since groups without infectors cannot produce infections.
+    """
+
+    _group_ids = defaultdict(dict)  # maps group spec -> group id -> None (ordered set)
+
+    @classmethod
+    def add(cls, group):
+        """
+        Registers a group as containing at least one infector.
+        """
+        cls._group_ids[group.spec][group.id] = None
+
+    @classmethod
+    def add_people_from_abroad(cls, people_from_abroad_dict: dict):
+        """
+        Registers the groups that receive infected people from other domains.
+
+        Parameters
+        ----------
+        people_from_abroad_dict
+            dictionary spec -> group id -> subgroup type -> person id -> person data
+        """
+        for spec, groups in people_from_abroad_dict.items():
+            for group_id, subgroups in groups.items():
+                if any(
+                    person_data["inf_id"] != 0
+                    for people in subgroups.values()
+                    for person_data in people.values()
+                ):
+                    cls._group_ids[spec][group_id] = None
+
+    @classmethod
+    def contains(cls, group) -> bool:
+        return group.id in cls._group_ids.get(group.spec, ())
+
+    @classmethod
+    def groups_for_supergroup(cls, super_group) -> list:
+        """
+        Returns the groups of the given supergroup that contain infectors,
+        sorted by id so that the iteration order does not depend on the
+        order in which people were placed.
+        """
+        if not len(super_group):
+            return []
+        group_ids = cls._group_ids.get(super_group.group_spec)
+        if not group_ids:
+            return []
+        members_by_id = super_group.members_by_id
+        return [
+            members_by_id[group_id]
+            for group_id in sorted(group_ids)
+            if group_id in members_by_id
+        ]
+
+    @classmethod
+    def n_venues(cls) -> int:
+        return sum(len(group_ids) for group_ids in cls._group_ids.values())
+
+    @classmethod
+    def clear(cls):
+        cls._group_ids.clear()
@@ -3,6 +3,8 @@ import numba as nb
 
 from typing import TYPE_CHECKING
 
+from june.epidemiology.infection.transmission import TransmissionProbabilities
+
 if TYPE_CHECKING:
     from june.groups.group.group import Group
 
@@ -34,7 +36,7 @@ class InteractiveGroup:
     - group : group that we want to prepare for interaction.
     """
 
-    def __init__(self, group: "Group", people_from_abroad=None):
+    def __init__(self, group: "Group", people_from_abroad=None, arrays=None):
         """
         Optimised version of InteractiveGroup.__init__ with vectorised person status checks.
         This function is performance-critical as InteractiveGroups are created millions of times.
@@ -49,9 +51,21 @@ class InteractiveGroup:
         - indices of the subgroups that contain susceptible.
         - spec of the group
         - super area of the group (for geo attributes like local regional compliances)
+
+        If ``arrays`` (an ``InteractiveGroupArrays`` taken from its pool) is given, the
+        people are written into it instead of into the nested dictionaries below.
         """
         people_from_abroad = people_from_abroad or {}
         self.group = group
+        self.arrays = arrays
+        if arrays is not None:
+            arrays.fill(group, people_from_abroad)
+            self.infectors_per_infection_per_subgroup = {}
+            self.susceptibles_per_subgroup = {}
+            self.subgroup_sizes = {}
+            self.must_timestep = arrays.must_timestep
+            self.size = arrays.size
+            return
         self.infectors_per_infection_per_subgroup = defaultdict(
             lambda: defaultdict(lambda: defaultdict(list))
         )  # maps virus variant -> subgroup -> infectors -> {infector ids, transmission probs}
@@ -93,13 +107,19 @@ class InteractiveGroup:
                         # Cache infection attributes to avoid repeated access
                         infection = person.infection
                         if infection is not None:
-                            infected_people.append((person.id, infection.infection_id(), infection.transmission.probability))
+                            infected_people.append((person.id, infection.infection_id(), infection.transmission))
                     else:
                         # Cache immunity attributes to avoid repeated access
                         susceptible_people.append((person.id, person.immunity.susceptibility_dict))
                 
-                # OPTIMISATION: Process infected people in batch
-                for person_id, infection_id, trans_prob in infected_people:
+                # OPTIMISATION: Process infected people in batch, reading their
+                # probabilities from TransmissionProbabilities in one go
+                trans_probs = TransmissionProbabilities.get_probabilities(
+                    [transmission for _, _, transmission in infected_people]
+                ).tolist()
+                for (person_id, infection_id, _), trans_prob in zip(
+                    infected_people, trans_probs
+                ):
                     infector_dict = self.infectors_per_infection_per_subgroup[infection_id][subgroup_index]
                     infector_dict["ids"].append(person_id)
                     infector_dict["trans_probs"].append(trans_prob)
@@ -179,6 +199,21 @@ class InteractiveGroup:
     def get_processed_contact_matrix(self, contact_matrix):
         return contact_matrix
 
+    def get_processed_beta_key(self, current_time=None):
+        """
+        Returns a hashable key that fully determines the processed beta of this group
+        for a given set of policies, so that it can be cached by the interaction.
+        Returns None if the processed beta can't be cached.
+        """
+        return (self.spec, self.region_name, self.lockdown_tier)
+
+    def get_processed_contact_matrix_key(self):
+        """
+        Returns a hashable key that fully determines the processed contact matrix
+        of this group, or None if it can't be cached.
+        """
+        return self.spec
+
     @property
     def spec(self):
         return self.group.spec
@@ -191,12 +226,30 @@ class InteractiveGroup:
     def regional_compliance(self):
         return self.group.super_area.region.regional_compliance
 
+    @property
+    def region_name(self):
+        try:
+            return self.super_area.region.name
+        except AttributeError:
+            return None
+
+    @property
+    def lockdown_tier(self):
+        try:
+            return self.super_area.region.policy["lockdown_tier"]
+        except Exception:
+            return None
+
     @property
     def has_susceptible(self):
         """Optimised version - avoid bool() call on already-computed result"""
+        if self.arrays is not None:
+            return self.arrays.n_susceptibles > 0
         return len(self.susceptibles_per_subgroup) > 0
 
     @property
     def has_infectors(self):
         """Optimised version - avoid bool() call on already-computed result"""
+        if self.arrays is not None:
+            return self.arrays.n_infectors > 0
         return len(self.infectors_per_infection_per_subgroup) > 0
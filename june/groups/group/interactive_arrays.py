@@ -0,0 +1,177 @@
+import numpy as np
+
+from typing import TYPE_CHECKING
+
+from june.epidemiology.infection.immunity import InfectionIdTable
+from june.epidemiology.infection.transmission import TransmissionProbabilities
+
+if TYPE_CHECKING:
+    from june.groups.group.group import Group
+
+
+class InteractiveGroupArrays:
+    """
+    Array-native representation of the people in a group, alternative to the nested
+    dictionaries of ``InteractiveGroup``. People are written into preallocated arrays
+    that only grow when a bigger group is found, and objects are pooled so that they
+    can be reused between groups and time steps without allocating new ones.
+
+    Infection types are stored as dense columns given by ``InfectionIdTable``.
+
+    Parameters
+    ----------
+    capacity
+        initial number of people that fit in the arrays
+    """
+
+    _pool = []
+
+    def __init__(self, capacity: int = 64):
+        self.n_infectors = 0
+        self.n_susceptibles = 0
+        self.size = 0
+        self.n_subgroups = 0
+        self._subgroup_sizes = np.zeros(0, dtype=np.float64)
+        self._allocate(capacity, max(1, InfectionIdTable.n_infections()))
+
+    def _allocate(self, capacity: int, n_infections: int):
+        self.capacity = capacity
+        self.infector_ids = np.empty(capacity, dtype=np.int64)
+        self.infector_subgroups = np.empty(capacity, dtype=np.int64)
+        self.infector_columns = np.empty(capacity, dtype=np.int64)
+        self.infector_trans_probs = np.empty(capacity, dtype=np.float64)
+        self.susceptible_ids = np.empty(capacity, dtype=np.int64)
+        self.susceptible_subgroups = np.empty(capacity, dtype=np.int64)
+        self.susceptibilities = np.ones((capacity, n_infections), dtype=np.float64)
+
+    def _ensure_capacity(self, capacity: int, n_infections: int):
+        if capacity > self.capacity:
+            self._allocate(
+                max(capacity, 2 * self.capacity), self.susceptibilities.shape[1]
+            )
+        if n_infections > self.susceptibilities.shape[1]:
+            susceptibilities = np.ones((self.capacity, n_infections), dtype=np.float64)
+            susceptibilities[
+                : self.n_susceptibles, : self.susceptibilities.shape[1]
+            ] = self.susceptibilities[: self.n_susceptibles]
+            self.susceptibilities = susceptibilities
+
+    @classmethod
+    def acquire(cls) -> "InteractiveGroupArrays":
+        """
+        Returns an object from the pool, or a new one if the pool is empty.
+        """
+        if cls._pool:
+            return cls._pool.pop()
+        return cls()
+
+    def release(self):
+        """
+        Returns this object to the pool. It must not be used after releasing it.
+        """
+        self.n_infectors = 0
+        self.n_susceptibles = 0
+        self.size = 0
+        self._pool.append(self)
+
+    @property
+    def subgroup_sizes(self) -> np.ndarray:
+        return self._subgroup_sizes[: self.n_subgroups]
+
+    @property
+    def must_timestep(self) -> bool:
+        return self.n_infectors > 0 and self.n_susceptibles > 0
+
+    def _add_susceptible(self, person_id, subgroup_index, susceptibilities):
+        n = self.n_susceptibles
+        self.susceptible_ids[n] = person_id
+        self.susceptible_subgroups[n] = subgroup_index
+        self.n_susceptibles += 1
+        row = self.susceptibilities[n]
+        row[:] = 1.0
+        for infection_id, susceptibility in susceptibilities:
+            column = InfectionIdTable.index(infection_id)
+            if column >= len(row):
+                self._ensure_capacity(self.capacity, column + 1)
+                row = self.susceptibilities[n]
+            row[column] = susceptibility
+
+    def _add_susceptible_row(self, person_id, subgroup_index, susceptibilities):
+        n = self.n_susceptibles
+        self.susceptible_ids[n] = person_id
+        self.susceptible_subgroups[n] = subgroup_index
+        self.n_susceptibles += 1
+        n_columns = len(susceptibilities)
+        if n_columns > self.susceptibilities.shape[1]:
+            self._ensure_capacity(self.capacity, n_columns)
+        row = self.susceptibilities[n]
+        row[:n_columns] = susceptibilities
+        row[n_columns:] = 1.0
+
+    def _add_infector(self, person_id, subgroup_index, infection_id, trans_prob):
+        n = self.n_infectors
+        self.infector_ids[n] = person_id
+        self.infector_subgroups[n] = subgroup_index
+        self.infector_columns[n] = InfectionIdTable.index(infection_id)
+        self.infector_trans_probs[n] = trans_prob
+        self.n_infectors += 1
+
+    def fill(self, group: "Group", people_from_abroad: dict = None):
+        """
+        Writes the infectors and susceptibles of the group, and the people from
+        other domains that are in it, into the arrays.
+        """
+        people_from_abroad = people_from_abroad or {}
+        self.n_infectors = 0
+        self.n_susceptibles = 0
+        self.n_subgroups = len(group.subgroups)
+        if len(self._subgroup_sizes) < self.n_subgroups:
+            self._subgroup_sizes = np.zeros(self.n_subgroups, dtype=np.float64)
+        subgroup_sizes = self.subgroup_sizes
+        for subgroup_index, subgroup in enumerate(group.subgroups):
+            subgroup_sizes[subgroup_index] = len(subgroup.people) + len(
+                people_from_abroad.get(subgroup.subgroup_type, ())
+            )
+        self.size = int(subgroup_sizes.sum())
+        self._ensure_capacity(self.size, InfectionIdTable.n_infections())
+        # positions of the local infectors, whose probabilities are read at the end
+        local_infectors = []
+        transmissions = []
+        for subgroup_index, subgroup in enumerate(group.subgroups):
+            for person in subgroup.people:
+                if person.infected:
+                    infection = person.infection
+                    if infection is not None:
+                        local_infectors.append(self.n_infectors)
+                        transmissions.append(infection.transmission)
+                        self._add_infector(
+                            person.id, subgroup_index, infection.infection_id(), 0.0
+                        )
+                else:
+                    self._add_susceptible_row(
+                        person.id, subgroup_index, person.immunity.susceptibilities
+                    )
+            people_abroad_data = people_from_abroad.get(subgroup.subgroup_type)
+            if not people_abroad_data:
+                continue
+            for person_id, person_data in people_abroad_data.items():
+                if person_data["susc"]:
+                    self._add_susceptible(
+                        person_id,
+                        subgroup_index,
+                        zip(
+                            person_data["immunity_inf_ids"],
+                            person_data["immunity_suscs"],
+                        ),
+                    )
+                if person_data["inf_id"] != 0:
+                    self._add_infector(
+                        person_id,
+                        subgroup_index,
+                        person_data["inf_id"],
+                        person_data["inf_prob"],
+                    )
+        if transmissions:
+            self.infector_trans_probs[
+                local_infectors
+            ] = TransmissionProbabilities.get_probabilities(transmissions)
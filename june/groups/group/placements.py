@@ -0,0 +1,89 @@
+class Placements:
+    """
+    Record of the changes the activity phase makes to the world in the current time
+    step, so that clearing the world at the end of the step only visits what was
+    touched instead of every group and every person. It tracks:
+
+    - the subgroups people were appended to (see ``Subgroup.append``),
+    - the people that were flagged busy or given a leisure subgroup without being
+      appended to a local subgroup (e.g. people going to other domains),
+    - the ids of the skinny persons registered for people coming from other domains.
+
+    Tracking only starts after the first full clear of the world, since people are
+    also placed in groups when the world is built.
+    """
+
+    tracking = False
+    _subgroups = {}  # maps id(subgroup) -> subgroup (ordered set)
+    _people = {}  # maps person id -> person
+    _imported_ids = []
+
+    @classmethod
+    def add_subgroup(cls, subgroup):
+        if cls.tracking:
+            cls._subgroups[id(subgroup)] = subgroup
+
+    @classmethod
+    def add_person(cls, person):
+        if cls.tracking:
+            cls._people[person.id] = person
+
+    @classmethod
+    def add_imported_id(cls, person_id: int):
+        cls._imported_ids.append(person_id)
+
+    @classmethod
+    def subgroups(cls):
+        return cls._subgroups.values()
+
+    @classmethod
+    def people(cls):
+        return cls._people.values()
+
+    @classmethod
+    def imported_ids(cls):
+        return cls._imported_ids
+
+    @classmethod
+    def clear(cls):
+        cls._subgroups.clear()
+        cls._people.clear()
+        cls._imported_ids.clear()
+
+
+class ActivityChanges:
+    """
+    People whose activity-relevant state changed outside the activity phase: the
+    subgroups they go to for non-drawn activities were reassigned (e.g. admitted to
+    or released from hospital, boarding a flight, activity overrides) or they died.
+    The ``ActivityPlanner`` reads and empties it before planning a time step, so
+    that its per-person arrays only need to be updated for these people.
+    """
+
+    tracking = False
+    activities = frozenset()  # activities the planner keeps columns for
+    _people = {}  # maps person id -> person
+
+    @classmethod
+    def add(cls, person):
+        if cls.tracking:
+            cls._people[person.id] = person
+
+    @classmethod
+    def add_activity(cls, person, activity: str):
+        """
+        Records the person if the subgroup they were given for ``activity`` is
+        one the planner reads, so leisure placements are not recorded.
+        """
+        if cls.tracking and activity in cls.activities:
+            cls._people[person.id] = person
+
+    @classmethod
+    def pop(cls) -> list:
+        people = list(cls._people.values())
+        cls._people.clear()
+        return people
+
+    @classmethod
+    def clear(cls):
+        cls._people.clear()
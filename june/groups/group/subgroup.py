@@ -1,5 +1,7 @@
 from june.demography.person import Person
 from .abstract import AbstractGroup
+from .infectious_venues import InfectiousVenues
+from .placements import Placements
 from typing import List
 
 
@@ -67,6 +69,22 @@ class Subgroup(AbstractGroup):
         """
         self.people.append(person)
         person.busy = True
+        Placements.add_subgroup(self)
+        if person.infection is not None:
+            InfectiousVenues.add(self.group)
+
+    def extend(self, people: List[Person]):
+        """
+        Add several people to this group at once
+        """
+        self.people.extend(people)
+        infected = False
+        for person in people:
+            person.busy = True
+            infected = infected or person.infection is not None
+        Placements.add_subgroup(self)
+        if infected:
+            InfectiousVenues.add(self.group)
 
     def remove(self, person: Person):
         self.people.remove(person)
@@ -9,7 +9,13 @@ import pandas as pd
 from sklearn.neighbors import BallTree
 
 from june.global_context import GlobalContext
-from june.groups import Group, Supergroup, ExternalGroup, ExternalSubgroup
+from june.groups import (
+    Group,
+    Supergroup,
+    ExternalGroup,
+    ExternalSubgroup,
+    ActivityChanges,
+)
 from june.exc import HospitalError
 
 logger = logging.getLogger("hospitals")
@@ -46,18 +52,22 @@ class AbstractHospital:
     def add_to_ward(self, person):
         self.ward_ids.add(person.id)
         person.subgroups.medical_facility = self.ward
+        ActivityChanges.add(person)
 
     def remove_from_ward(self, person):
         self.ward_ids.remove(person.id)
         person.subgroups.medical_facility = None
+        ActivityChanges.add(person)
 
     def add_to_icu(self, person):
         self.icu_ids.add(person.id)
         person.subgroups.medical_facility = self.icu
+        ActivityChanges.add(person)
 
     def remove_from_icu(self, person):
         self.icu_ids.remove(person.id)
         person.subgroups.medical_facility = None
+        ActivityChanges.add(person)
 
     def allocate_patient(self, person):
         """
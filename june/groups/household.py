@@ -4,7 +4,7 @@ import numpy as np
 from random import random
 
 from june.epidemiology.infection.disease_config import DiseaseConfig
-from june.groups import Group, Supergroup
+from june.groups import Group, Supergroup, Placements
 from june.groups.group.interactive import InteractiveGroup
 
 from typing import List
@@ -147,6 +147,7 @@ class Household(Group):
                 mate.subgroups.leisure = (
                     mate.residence  # person will be added later in the simulator.
                 )
+                Placements.add_person(mate)
 
     # @property
     # def kids(self):
@@ -196,8 +197,8 @@ class Household(Group):
         self.being_visited = False
         self.receiving_care = False
 
-    def get_interactive_group(self, people_from_abroad=None):
-        return InteractiveHousehold(self, people_from_abroad=people_from_abroad)
+    def get_interactive_group(self, people_from_abroad=None, arrays=None):
+        return InteractiveHousehold(self, people_from_abroad=people_from_abroad, arrays=arrays)
 
     def get_leisure_subgroup(self, person, subgroup_type, to_send_abroad):
         self.being_visited = True
@@ -253,6 +254,18 @@ class InteractiveHousehold(InteractiveGroup):
                     return True
         return False
     
+    def get_processed_beta_key(self, current_time=None):
+        if self.group.receiving_care:
+            spec = "care_visits"
+        elif self.group.being_visited:
+            spec = "household_visits"
+        else:
+            spec = "household"
+        isolating = current_time is not None and self.has_isolating_residents(
+            current_time
+        )
+        return (spec, isolating, self.region_name)
+
     def get_processed_beta(self, betas, beta_reductions, current_time=None):
         """
         Enhanced version that applies isolation precautions if residents are isolating.
@@ -12,8 +12,9 @@ from collections import defaultdict
 
 from june.demography.person import Person
 from june.groups.group.external import ExternalGroup, ExternalSubgroup
+from june.groups.group.placements import Placements
 from june.groups.leisure.social_network import SocialNetwork
-from june.mpi_wrapper import mpi_comm, mpi_rank, mpi_size
+from june.mpi_wrapper import mpi_comm, mpi_rank, mpi_size, DomainGraph
 
 # MPI Tags for friend invitation communication
 FRIEND_INVITATION_TAG = 300
@@ -180,7 +181,7 @@ class FriendInvitationManager:
         }
 
         # Try primary priority
-        if actions[priority]():
+        if actions[priority](person):
             if priority == "household":
                 #print(f"Priority is household, and we rolled household")
                 return "household"
@@ -190,7 +191,7 @@ class FriendInvitationManager:
         else:
             # Try fallback priority
             other_priority = "friends" if priority == "household" else "household"
-            if actions[other_priority]():
+            if actions[other_priority](person):
                 if other_priority == "household":
                     #print(f"Priority was friends, but now we are trying household")
                     return "household"
@@ -482,9 +483,6 @@ class FriendInvitationManager:
         Send all pending invitations to appropriate ranks and receive invitations from other ranks.
         """
         
-        # Add MPI barrier to ensure all ranks reach this point
-        mpi_comm.Barrier()
-        
         # Organize invitations by destination rank
         invitations_by_rank = defaultdict(list)
         for invitation in self.pending_invitations:
@@ -493,34 +491,17 @@ class FriendInvitationManager:
             else:
                 print(f"[Rank {mpi_rank}] exchange_invitations: WARNING - Invalid rank {invitation.friend_home_rank} for invitation {invitation.inviter_id}->{invitation.friend_id}")
                 
-        # Use non-blocking sends to avoid deadlock
-        send_requests = []
-        
-        # Send invitations to each rank using non-blocking sends
-        for rank in range(mpi_size):
-            if rank == mpi_rank:
-                continue
-            
-            invitations_for_rank = invitations_by_rank.get(rank, [])
-            
-            req = mpi_comm.isend(invitations_for_rank, dest=rank, tag=FRIEND_INVITATION_TAG)
-            send_requests.append(req)
-        
-        # Receive invitations from each rank
+        # Send the invitations to the ranks that have any, and receive from the
+        # neighbours of this domain
+        received_by_rank = DomainGraph.alltoall(
+            {rank: invitations_by_rank[rank] for rank in invitations_by_rank if rank != mpi_rank}
+        )
         self.received_invitations.clear()
         total_received = 0
-        for rank in range(mpi_size):
-            if rank == mpi_rank:
-                continue
-            
-
-            received = mpi_comm.recv(source=rank, tag=FRIEND_INVITATION_TAG)
-            self.received_invitations.extend(received)
-            total_received += len(received)
-        
-        # Wait for all sends to complete
-        for i, req in enumerate(send_requests):
-            req.wait()
+        for received in received_by_rank.values():
+            if received:
+                self.received_invitations.extend(received)
+                total_received += len(received)
             
     def process_invitations(self, potential_inviters: List[Person]) -> None:
         """
@@ -620,9 +601,6 @@ class FriendInvitationManager:
         Send all pending responses to appropriate ranks and receive responses from other ranks.
         """
         
-        # Add MPI barrier to ensure all ranks reach this point
-        mpi_comm.Barrier()
-        
         # Organize responses by destination rank
         responses_by_rank = defaultdict(list)
         for response in self.pending_responses:
@@ -631,33 +609,17 @@ class FriendInvitationManager:
             else:
                 print(f"[Rank {mpi_rank}] exchange_responses: WARNING - Invalid rank {response.invitation.inviter_home_rank} for response")
                 
-        # Use non-blocking sends to avoid deadlock
-        send_requests = []
-        
-        # Send responses to each rank using non-blocking sends
-        for rank in range(mpi_size):
-            if rank == mpi_rank:
-                continue
-            
-            responses_for_rank = responses_by_rank.get(rank, [])
-            
-            req = mpi_comm.isend(responses_for_rank, dest=rank, tag=FRIEND_RESPONSE_TAG)
-            send_requests.append(req)
-        
-        # Receive responses from each rank
+        # Send the responses to the ranks that have any, and receive from the
+        # neighbours of this domain
+        received_by_rank = DomainGraph.alltoall(
+            {rank: responses_by_rank[rank] for rank in responses_by_rank if rank != mpi_rank}
+        )
         self.received_responses.clear()
         total_received = 0
-        for rank in range(mpi_size):
-            if rank == mpi_rank:
-                continue
-                        
-            received = mpi_comm.recv(source=rank, tag=FRIEND_RESPONSE_TAG)
-            self.received_responses.extend(received)
-            total_received += len(received)
-        
-        # Wait for all sends to complete
-        for i, req in enumerate(send_requests):
-            req.wait()
+        for received in received_by_rank.values():
+            if received:
+                self.received_responses.extend(received)
+                total_received += len(received)
             
     def apply_friend_assignments(self, world) -> None:
         """
@@ -692,6 +654,7 @@ class FriendInvitationManager:
                 
                 # Assign to person - this will flag them for MPI transfer
                 person.subgroups.leisure = external_subgroup
+                Placements.add_person(person)
                 
                 # Track this group for debugging - it received a cross-rank friend
                 group_key = (invitation.activity_type, invitation.venue_id, invitation.inviter_home_rank)
@@ -833,9 +796,6 @@ class FriendInvitationManager:
         Send delegation requests to venue ranks and receive delegations from other ranks.
         This allows venue ranks to handle invitations on behalf of external inviters.
         """        
-        # Add MPI barrier to ensure all ranks reach this point
-        mpi_comm.Barrier()
-        
         # Organize delegations by destination venue rank
         delegations_by_rank = defaultdict(list)
         for delegation in self.pending_delegations:
@@ -845,33 +805,17 @@ class FriendInvitationManager:
             else:
                 print(f"[Rank {mpi_rank}] exchange_delegations: WARNING - Invalid venue rank {venue_rank} for delegation")
                 
-        # Use non-blocking sends to avoid deadlock
-        send_requests = []
-        
-        # Send delegations to each rank using non-blocking sends
-        for rank in range(mpi_size):
-            if rank == mpi_rank:
-                continue
-            
-            delegations_for_rank = delegations_by_rank.get(rank, [])
-            
-            req = mpi_comm.isend(delegations_for_rank, dest=rank, tag=FRIEND_DELEGATION_TAG)
-            send_requests.append(req)
-                
-        # Receive delegations from each rank
+        # Send the delegations to the ranks that have any, and receive from the
+        # neighbours of this domain
+        received_by_rank = DomainGraph.alltoall(
+            {rank: delegations_by_rank[rank] for rank in delegations_by_rank if rank != mpi_rank}
+        )
         self.received_delegations = []
         total_received = 0
-        for rank in range(mpi_size):
-            if rank == mpi_rank:
-                continue
-            
-            received = mpi_comm.recv(source=rank, tag=FRIEND_DELEGATION_TAG)
-            self.received_delegations.extend(received)
-            total_received += len(received)
-        
-        # Wait for all sends to complete
-        for i, req in enumerate(send_requests):
-            req.wait()
+        for received in received_by_rank.values():
+            if received:
+                self.received_delegations.extend(received)
+                total_received += len(received)
             
     def process_delegations(self) -> None:
         """
@@ -2,7 +2,6 @@ import numpy as np
 import yaml
 import logging
 import pandas as pd
-from random import random
 from typing import Dict, List
 from june.demography import Person
 from june.geography import SuperAreas, Areas, Regions, Region
@@ -15,7 +14,9 @@ from june.groups.leisure import (
     GymDistributor,
 )
 from june.groups.leisure.friend_invitations import FriendInvitationManager
-from june.utils import random_choice_numba
+from june.groups.group.placements import Placements
+from june.groups.leisure.social_venue_distributor import ADULT_OR_CHILD_DRAW
+from june.utils import inverse_cdf_choice, RandomStreams
 from june import paths
 from june.utils.parse_probabilities import parse_opens
 from june.mpi_wrapper import mpi_comm, mpi_rank, mpi_size, MPI, mpi_available
@@ -249,12 +250,13 @@ class Leisure:
         # Calculate probabilities for activities
         prob_age_sex = self._get_activity_probabilities_for_person(person=person)
 
-        # Check if the person does any activity
-        if random() < prob_age_sex["does_activity"]:
+        # Check if the person does any activity, drawing from the person's
+        # "leisure" stream so the decision does not depend on the visiting order
+        uniforms = RandomStreams.uniforms("leisure", (person.id,), 2)[0]
+        if uniforms[0] < prob_age_sex["does_activity"]:
             # Select activity based on probabilities
-            activity_idx = random_choice_numba(
-                arr=np.arange(0, len(prob_age_sex["activities"])),
-                prob=np.array(list(prob_age_sex["activities"].values())),
+            activity_idx = inverse_cdf_choice(
+                np.array(list(prob_age_sex["activities"].values())), uniforms[1]
             )
             activity = list(prob_age_sex["activities"].keys())[activity_idx]
 
@@ -265,8 +267,10 @@ class Leisure:
             )
             
             
-            # Assign the subgroup to the person
+            # Assign the subgroup to the person, recording it so that the
+            # incremental clear of the world resets it
             person.subgroups.leisure = subgroup
+            Placements.add_person(person)
 
             person.age = age_before
             return subgroup
@@ -440,8 +444,8 @@ class Leisure:
     def P_IsChild(self, age):
         return 1 - self.P_IsAdult(age)
 
-    def AorC(self, age):
-        r = np.random.rand(1)[0]
+    def AorC(self, age, person_id):
+        r = RandomStreams.uniform("leisure", person_id, ADULT_OR_CHILD_DRAW)
         if r < self.P_IsAdult(age):
             return "Adult"
         else:
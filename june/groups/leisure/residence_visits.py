@@ -4,8 +4,12 @@ import numpy as np
 import pandas as pd
 
 from june.groups.leisure import SocialVenueDistributor
+from june.groups.leisure.social_venue_distributor import (
+    VENUE_DRAW,
+    RESIDENCE_TYPE_DRAW,
+)
 from june.paths import configs_path
-from june.utils import random_choice_numba
+from june.utils import inverse_cdf_choice, RandomStreams
 from june.mpi_wrapper import mpi_rank, mpi_available
 
 default_config_filename = configs_path / "defaults/groups/leisure/visits.yaml"
@@ -119,7 +123,7 @@ class ResidenceVisitsDistributor(SocialVenueDistributor):
         }
 
         # Try primary priority
-        if actions[priority]():
+        if actions[priority](person):
             if priority == "household":
                 household_invitees = self._coordinate_household_invitations(person, to_send_abroad)
                 invited_people.extend(household_invitees or [])
@@ -129,7 +133,7 @@ class ResidenceVisitsDistributor(SocialVenueDistributor):
         else:
             # Try fallback priority
             other_priority = "friends" if priority == "household" else "household"
-            if actions[other_priority]():
+            if actions[other_priority](person):
                 if other_priority == "household":
                     household_invitees = self._coordinate_household_invitations(person, to_send_abroad)
                     invited_people.extend(household_invitees or [])
@@ -311,9 +315,9 @@ class ResidenceVisitsDistributor(SocialVenueDistributor):
             residence_type_probabilities = (
                 residence_type_probabilities / residence_type_probabilities.sum()
             )
-            type_sample = random_choice_numba(
-                tuple(range(len(residence_type_probabilities))),
+            type_sample = inverse_cdf_choice(
                 residence_type_probabilities,
+                RandomStreams.uniform("leisure", person.id, RESIDENCE_TYPE_DRAW),
             )
             which_type = residence_types[type_sample]
         candidates = person.residence.group.residences_to_visit[which_type]
@@ -323,7 +327,8 @@ class ResidenceVisitsDistributor(SocialVenueDistributor):
         elif n_candidates == 1:
             group = candidates[0]
         else:
-            group = candidates[randint(0, n_candidates - 1)]
+            uniform = RandomStreams.uniform("leisure", person.id, VENUE_DRAW)
+            group = candidates[min(int(uniform * n_candidates), n_candidates - 1)]
         return group
 
     def get_poisson_parameter(
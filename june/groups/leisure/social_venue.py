@@ -7,7 +7,7 @@ from enum import IntEnum
 from sklearn.neighbors import BallTree
 
 from june.epidemiology.infection.disease_config import DiseaseConfig
-from june.groups import Supergroup, Group
+from june.groups import Supergroup, Group, ActivityChanges
 from june.geography import Area, Areas, SuperArea, SuperAreas, Geography
 from june.mpi_wrapper import mpi_rank, mpi_available
 
@@ -36,6 +36,7 @@ class SocialVenue(Group):
     def add(self, person, activity="leisure"):
         self.subgroups[0].append(person)
         setattr(person.subgroups, activity, self.subgroups[0])
+        ActivityChanges.add_activity(person, activity)
 
     @property
     def super_area(self):
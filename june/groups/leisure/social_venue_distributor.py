@@ -1,6 +1,5 @@
 import random as rnd
 import numpy as np
-from random import sample, randint 
 from numba import jit
 from typing import Dict
 import yaml
@@ -12,6 +11,15 @@ from june.groups.leisure.social_network import SocialNetwork
 from june.utils.parse_probabilities import parse_age_probabilities
 from june.geography import Area
 from june.mpi_wrapper import MPI, mpi_comm, mpi_rank, mpi_size, mpi_available
+from june.utils import RandomStreams
+
+# indices of the draws a person takes from their "leisure" stream in a time step.
+# The first two decide whether they do leisure and which activity (see Leisure).
+VENUE_DRAW = 2
+DRAGS_HOUSEHOLD_DRAW = 3
+INVITES_FRIENDS_DRAW = 4
+RESIDENCE_TYPE_DRAW = 5
+ADULT_OR_CHILD_DRAW = 6
 
 
 @jit(nopython=True)
@@ -250,7 +258,12 @@ class SocialVenueDistributor:
             return tuple([potential_venues[idx] for idx in range(indices_len)])
         else:
             indices_len = min(len(potential_venues), self.neighbours_to_consider)
-            random_idx_choice = sample(range(len(potential_venues)), indices_len)
+            # a random subset drawn from the stream of the area, so that it does not
+            # depend on the order in which areas are visited
+            uniforms = RandomStreams.uniforms(
+                f"leisure_venues_{self.spec}", (area.id,), len(potential_venues)
+            )[0]
+            random_idx_choice = np.argsort(uniforms)[:indices_len].tolist()
             return tuple([potential_venues[idx] for idx in random_idx_choice])
 
 
@@ -262,7 +275,8 @@ class SocialVenueDistributor:
         elif n_candidates == 1:
             group = candidates[0]
         else:
-            group = candidates[randint(0, n_candidates - 1)]
+            uniform = RandomStreams.uniform("leisure", person.id, VENUE_DRAW)
+            group = candidates[min(int(uniform * n_candidates), n_candidates - 1)]
         return group
 
     def get_leisure_subgroup(self, person, to_send_abroad=None):
@@ -277,14 +291,20 @@ class SocialVenueDistributor:
         )
         return subgroup
 
-    def person_drags_household(self):
+    def person_drags_household(self, person):
         """
         Check whether person drags household or not.
         """
-        return rnd.random() < self.drags_household_probability
+        return (
+            RandomStreams.uniform("leisure", person.id, DRAGS_HOUSEHOLD_DRAW)
+            < self.drags_household_probability
+        )
     
-    def person_invites_friends(self):
+    def person_invites_friends(self, person):
         """
         Check whether person invites friends or not.
         """
-        return rnd.random() < self.invites_friends_probability
\ No newline at end of file
+        return (
+            RandomStreams.uniform("leisure", person.id, INVITES_FRIENDS_DRAW)
+            < self.invites_friends_probability
+        )
\ No newline at end of file
@@ -88,8 +88,8 @@ class School(Group):
         self.years = tuple(range(age_min, age_max + 1)) if years is None else tuple(years)
         self.registered_members_ids = registered_members_ids if registered_members_ids is not None else {}
 
-    def get_interactive_group(self, people_from_abroad=None):
-        return InteractiveSchool(self, people_from_abroad=people_from_abroad)
+    def get_interactive_group(self, people_from_abroad=None, arrays=None):
+        return InteractiveSchool(self, people_from_abroad=people_from_abroad, arrays=arrays)
 
     def add(self, person):
         if person.age <= self.age_max:
@@ -416,8 +416,10 @@ def _translate_school_subgroup(idx, school_years):
 
 
 class InteractiveSchool(InteractiveGroup):
-    def __init__(self, group: "Group", people_from_abroad=None):
-        super().__init__(group=group, people_from_abroad=people_from_abroad)
+    def __init__(self, group: "Group", people_from_abroad=None, arrays=None):
+        super().__init__(
+            group=group, people_from_abroad=people_from_abroad, arrays=arrays
+        )
         self.school_years = group.years
         self.sector = group.sector
 
@@ -484,6 +486,12 @@ class InteractiveSchool(InteractiveGroup):
                             ret[i, j] = contact_matrix[year_idx_i, year_idx_j]
         return ret
 
+    def get_processed_contact_matrix_key(self):
+        return (self.spec, tuple(self.school_years))
+
+    def get_processed_beta_key(self, current_time=None):
+        return (self.spec, self.sector, self.region_name, self.lockdown_tier)
+
     def get_processed_beta(self, betas, beta_reductions):
         """
         Returns the processed contact intensity, by taking into account the policies
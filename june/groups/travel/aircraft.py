@@ -61,16 +61,26 @@ class Aircraft(Group):
         super().remove_person(person)
         self._occupied_seats -= 1
 
-    def get_interactive_group(self, people_from_abroad=None) -> InteractiveGroup:
+    def get_interactive_group(
+        self, people_from_abroad=None, arrays=None
+    ) -> InteractiveGroup:
         """Create interactive group using InteractiveAircraft"""
-        return InteractiveAircraft(self, people_from_abroad=people_from_abroad)
+        return InteractiveAircraft(
+            self, people_from_abroad=people_from_abroad, arrays=arrays
+        )
 
 
 class InteractiveAircraft(InteractiveGroup):
-    def __init__(self, group: "Aircraft", people_from_abroad=None):
-        super().__init__(group=group, people_from_abroad=people_from_abroad)
+    def __init__(self, group: "Aircraft", people_from_abroad=None, arrays=None):
+        super().__init__(
+            group=group, people_from_abroad=people_from_abroad, arrays=arrays
+        )
         self.characteristic_time = group.flight_duration
 
+    def get_processed_contact_matrix_key(self):
+        # depends on the passengers on board, can't be cached
+        return None
+
     def get_processed_contact_matrix(self, contact_matrix):
         """
         Process contact matrix based on current aircraft state.
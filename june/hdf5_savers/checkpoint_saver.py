@@ -12,6 +12,8 @@ from june.policy import Policies
 from june.event import Events
 from june.simulator import Simulator
 from june.epidemiology.epidemiology import Epidemiology
+from june.epidemiology.active_infections import ActiveInfections
+from june.epidemiology.infection import TransmissionProbabilities
 from june.hdf5_savers.utils import write_dataset
 from june.demography import Population
 from june.demography.person import Activities
@@ -157,6 +159,8 @@ def combine_checkpoints_for_ranks(hdf5_file_root: str):
     save_immunities_to_hdf5(
         hdf5_file_path=unified_checkpoint_path, immunities=ret["immunity_list"]
     )
+    for immunity in ret["immunity_list"]:
+        immunity.release()
 
 
 def restore_simulator_to_checkpoint(
@@ -201,13 +205,18 @@ def restore_simulator_to_checkpoint(
                 continue
             person = simulator.world.people.get_from_id(infected_id)
             person.infection = infection
-    # restore immunities
+            ActiveInfections.add(person)
+            TransmissionProbabilities.register(person)
+    # restore immunities, returning the rows of the replaced ones to the store
     for person_id, immunity in zip(
         checkpoint_data["people_id"], checkpoint_data["immunity_list"]
     ):
         if person_id not in people_ids:
+            immunity.release()
             continue
         person = world.people.get_from_id(person_id)
+        if person.immunity is not None:
+            person.immunity.release()
         person.immunity = immunity
     # restore timer
     checkpoint_date = datetime.strptime(checkpoint_data["date"], "%Y-%m-%d")
@@ -1,3 +1,4 @@
 from .interaction import Interaction
+from .parallel_interaction import InteractionPool
 
 # from .interactive_group import InteractiveGroup
@@ -0,0 +1,588 @@
+import numpy as np
+import numba as nb
+
+from typing import TYPE_CHECKING, List
+
+from june.exc import InteractionError
+from june.utils import RandomStreams
+from june.epidemiology.infection.immunity import InfectionIdTable
+
+if TYPE_CHECKING:
+    from june.groups.group.interactive import InteractiveGroup
+
+
+def check_subgroups(
+    interactive_group: "InteractiveGroup",
+    n_subgroups: int,
+    infector_subgroups,
+    susceptible_subgroups,
+):
+    """
+    Makes sure the infectors and susceptibles of an interactive group are in
+    subgroups of its ``n_subgroups`` x ``n_subgroups`` contact matrix, raising an
+    InteractionError otherwise. Subgroup sizes beyond the contact matrix are
+    ignored instead, since groups can have empty subgroups the matrix does not
+    cover. Shared by the per-group and the batched interaction.
+    """
+    for subgroups in (infector_subgroups, susceptible_subgroups):
+        if len(subgroups) and np.max(subgroups) >= n_subgroups:
+            raise InteractionError(
+                f"Group {interactive_group.group.id} has people in subgroups "
+                f"beyond its {n_subgroups}x{n_subgroups} contact matrix"
+            )
+
+
+@nb.jit(nopython=True)
+def _effective_subgroup_size(subgroup_sizes, offset, susceptible_subgroup, infector_subgroup):
+    """
+    Number of people an infector in ``infector_subgroup`` shares contacts with,
+    seen from ``susceptible_subgroup``. People do not contact themselves, so we
+    remove one person when both subgroups are the same.
+    """
+    size = subgroup_sizes[offset + infector_subgroup]
+    if susceptible_subgroup == infector_subgroup:
+        size = max(1.0, size - 1.0)
+    return size
+
+
+@nb.jit(nopython=True)
+def _compute_exposures(
+    n_infections,
+    subgroup_offsets,
+    subgroup_sizes,
+    contact_matrix_offsets,
+    contact_matrices,
+    betas,
+    transmission_sums,
+):
+    """
+    Computes the exposure of every subgroup of every group to every infection type.
+    The exposure of subgroup i to infection k is
+
+    $ beta * sum_j contact_matrix[i, j] * transmission_sum[j, k] / size_j $
+
+    where beta already includes the time step duration.
+
+    Returns
+    -------
+    Flat array indexed by ``(subgroup_offsets[g] + i) * n_infections + k``.
+    """
+    n_groups = len(subgroup_offsets) - 1
+    exposures = np.zeros(subgroup_offsets[-1] * n_infections)
+    for g in range(n_groups):
+        offset = subgroup_offsets[g]
+        n_subgroups = subgroup_offsets[g + 1] - offset
+        cm_offset = contact_matrix_offsets[g]
+        for j in range(n_subgroups):
+            for k in range(n_infections):
+                transmission_sum = transmission_sums[(offset + j) * n_infections + k]
+                if transmission_sum == 0.0:
+                    continue
+                for i in range(n_subgroups):
+                    contacts = contact_matrices[cm_offset + i * n_subgroups + j]
+                    exposures[(offset + i) * n_infections + k] += (
+                        betas[g]
+                        * contacts
+                        * transmission_sum
+                        / _effective_subgroup_size(subgroup_sizes, offset, i, j)
+                    )
+    return exposures
+
+
+@nb.jit(nopython=True)
+def _batched_time_step(
+    n_infections,
+    subgroup_offsets,
+    subgroup_sizes,
+    contact_matrix_offsets,
+    contact_matrices,
+    betas,
+    transmission_sums,
+    infector_offsets,
+    infector_probs,
+    susceptible_groups,
+    susceptible_subgroups,
+    susceptibilities,
+    uniforms,
+):
+    """
+    Runs the interaction over all the groups packed in the arrays. For each susceptible
+    we decide whether they get infected, by which infection type, which subgroup is to
+    blame and finally which infector within that subgroup is to blame. Susceptible n
+    uses the four random numbers in ``uniforms[n]``.
+
+    Returns
+    -------
+    (susceptible indices, infection type indices, infector indices).
+    """
+    exposures = _compute_exposures(
+        n_infections,
+        subgroup_offsets,
+        subgroup_sizes,
+        contact_matrix_offsets,
+        contact_matrices,
+        betas,
+        transmission_sums,
+    )
+    n_susceptibles = len(susceptible_groups)
+    infected = np.empty(n_susceptibles, dtype=np.int64)
+    infection_types = np.empty(n_susceptibles, dtype=np.int64)
+    blamed = np.empty(n_susceptibles, dtype=np.int64)
+    weights = np.empty(n_infections)
+    n_new = 0
+    for n in range(n_susceptibles):
+        g = susceptible_groups[n]
+        i = susceptible_subgroups[n]
+        offset = subgroup_offsets[g]
+        total_exposure = 0.0
+        for k in range(n_infections):
+            weights[k] = exposures[(offset + i) * n_infections + k] * susceptibilities[n, k]
+            total_exposure += weights[k]
+        if total_exposure == 0.0:
+            continue
+        if uniforms[n, 0] >= 1.0 - np.exp(-total_exposure):
+            continue
+        # select the infection type
+        k = 0
+        if n_infections > 1:
+            threshold = uniforms[n, 1] * total_exposure
+            cumulative = 0.0
+            for k in range(n_infections):
+                cumulative += weights[k]
+                if cumulative > threshold:
+                    break
+        # select the subgroup to blame
+        n_subgroups = subgroup_offsets[g + 1] - offset
+        cm_offset = contact_matrix_offsets[g]
+        subgroup_total = 0.0
+        for j in range(n_subgroups):
+            subgroup_total += (
+                contact_matrices[cm_offset + i * n_subgroups + j]
+                * transmission_sums[(offset + j) * n_infections + k]
+                / _effective_subgroup_size(subgroup_sizes, offset, i, j)
+            )
+        threshold = uniforms[n, 2] * subgroup_total
+        cumulative = 0.0
+        blamed_subgroup = 0
+        for j in range(n_subgroups):
+            transmission_sum = transmission_sums[(offset + j) * n_infections + k]
+            if transmission_sum == 0.0:
+                continue
+            blamed_subgroup = j
+            cumulative += (
+                contact_matrices[cm_offset + i * n_subgroups + j]
+                * transmission_sum
+                / _effective_subgroup_size(subgroup_sizes, offset, i, j)
+            )
+            if cumulative > threshold:
+                break
+        # select the individual to blame
+        cell = (offset + blamed_subgroup) * n_infections + k
+        start = infector_offsets[cell]
+        end = infector_offsets[cell + 1]
+        threshold = uniforms[n, 3] * transmission_sums[cell]
+        cumulative = 0.0
+        blamed_infector = start
+        for idx in range(start, end):
+            blamed_infector = idx
+            cumulative += infector_probs[idx]
+            if cumulative > threshold:
+                break
+        infected[n_new] = n
+        infection_types[n_new] = k
+        blamed[n_new] = blamed_infector
+        n_new += 1
+    return infected[:n_new], infection_types[:n_new], blamed[:n_new]
+
+
+def run_group_range(n_infections, kernel_arrays, uniforms, group_start, group_end):
+    """
+    Runs the compiled kernel over the groups ``group_start:group_end`` of packed
+    kernel arrays (see ``InteractionBatch.kernel_arrays``). The arrays of those
+    groups are contiguous slices, rebased so that the range looks like a batch of
+    its own, and the indices returned are those of the whole batch. Susceptibles
+    keep their own uniforms, so the results are the ones of running the whole
+    batch at once.
+
+    Returns
+    -------
+    (susceptible indices, infection type indices, infector indices).
+    """
+    (
+        subgroup_offsets,
+        subgroup_sizes,
+        contact_matrix_offsets,
+        contact_matrices,
+        betas,
+        transmission_sums,
+        infector_offsets,
+        infector_probs,
+        susceptible_groups,
+        susceptible_subgroups,
+        susceptibilities,
+    ) = kernel_arrays
+    subgroup_start = subgroup_offsets[group_start]
+    subgroup_end = subgroup_offsets[group_end]
+    cell_start = subgroup_start * n_infections
+    cell_end = subgroup_end * n_infections
+    infector_start = infector_offsets[cell_start]
+    infector_end = infector_offsets[cell_end]
+    matrix_start = contact_matrix_offsets[group_start]
+    matrix_end = contact_matrix_offsets[group_end]
+    susceptible_start, susceptible_end = np.searchsorted(
+        susceptible_groups, [group_start, group_end]
+    )
+    infected, infection_types, blamed = _batched_time_step(
+        n_infections,
+        subgroup_offsets[group_start : group_end + 1] - subgroup_start,
+        subgroup_sizes[subgroup_start:subgroup_end],
+        contact_matrix_offsets[group_start : group_end + 1] - matrix_start,
+        contact_matrices[matrix_start:matrix_end],
+        betas[group_start:group_end],
+        transmission_sums[cell_start:cell_end],
+        infector_offsets[cell_start : cell_end + 1] - infector_start,
+        infector_probs[infector_start:infector_end],
+        susceptible_groups[susceptible_start:susceptible_end] - group_start,
+        susceptible_subgroups[susceptible_start:susceptible_end],
+        susceptibilities[susceptible_start:susceptible_end],
+        uniforms[susceptible_start:susceptible_end],
+    )
+    return infected + susceptible_start, infection_types, blamed + infector_start
+
+
+class InteractionBatch:
+    """
+    Packs all the interactive groups of a supergroup that must be time stepped into
+    flat CSR-style arrays, so that the interaction for the whole supergroup is run
+    in a single compiled pass.
+
+    Subgroups of group ``g`` live in ``subgroup_offsets[g]:subgroup_offsets[g+1]``,
+    and every (subgroup, infection type) pair defines a cell that stores the sum
+    of the transmission probabilities of its infectors, and the range of its
+    infectors in ``infector_ids`` / ``infector_probs``.
+    """
+
+    def __init__(
+        self,
+        groups: list,
+        infection_ids: List[int],
+        subgroup_offsets: np.ndarray,
+        subgroup_sizes: np.ndarray,
+        contact_matrix_offsets: np.ndarray,
+        contact_matrices: np.ndarray,
+        betas: np.ndarray,
+        transmission_sums: np.ndarray,
+        infector_offsets: np.ndarray,
+        infector_ids: np.ndarray,
+        infector_probs: np.ndarray,
+        susceptible_ids: np.ndarray,
+        susceptible_groups: np.ndarray,
+        susceptible_subgroups: np.ndarray,
+        susceptibilities: np.ndarray,
+    ):
+        self.groups = groups
+        self.infection_ids = infection_ids
+        self.subgroup_offsets = subgroup_offsets
+        self.subgroup_sizes = subgroup_sizes
+        self.contact_matrix_offsets = contact_matrix_offsets
+        self.contact_matrices = contact_matrices
+        self.betas = betas
+        self.transmission_sums = transmission_sums
+        self.infector_offsets = infector_offsets
+        self.infector_ids = infector_ids
+        self.infector_probs = infector_probs
+        self.susceptible_ids = susceptible_ids
+        self.susceptible_groups = susceptible_groups
+        self.susceptible_subgroups = susceptible_subgroups
+        self.susceptibilities = susceptibilities
+
+    @property
+    def n_groups(self):
+        return len(self.groups)
+
+    @property
+    def must_run(self):
+        return len(self.susceptible_ids) > 0 and len(self.infection_ids) > 0
+
+    def group_chunks(self, max_susceptibles: int) -> list:
+        """
+        Splits the groups into consecutive ranges (start, end) with about
+        ``max_susceptibles`` susceptibles each, see ``run_group_range``. A group is
+        never split, so a range can hold more susceptibles if a group does.
+        """
+        if not self.n_groups:
+            return []
+        cumulative = np.cumsum(
+            np.bincount(self.susceptible_groups, minlength=self.n_groups)
+        )
+        max_susceptibles = max(1, max_susceptibles)
+        ends = (
+            np.searchsorted(
+                cumulative, np.arange(max_susceptibles, cumulative[-1], max_susceptibles)
+            )
+            + 1
+        )
+        bounds = np.unique(np.concatenate([[0], ends, [self.n_groups]]))
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def draw_uniforms(self):
+        """
+        Draws the four random numbers of every susceptible from their
+        "interaction" stream for the current time step, so that the outcome does
+        not depend on the order of the groups or on where the batch is run.
+        """
+        return RandomStreams.uniforms("interaction", self.susceptible_ids, 4)
+
+    @property
+    def kernel_arrays(self):
+        """
+        Arrays passed to the compiled kernel, in order.
+        """
+        return (
+            self.subgroup_offsets,
+            self.subgroup_sizes,
+            self.contact_matrix_offsets,
+            self.contact_matrices,
+            self.betas,
+            self.transmission_sums,
+            self.infector_offsets,
+            self.infector_probs,
+            self.susceptible_groups,
+            self.susceptible_subgroups,
+            self.susceptibilities,
+        )
+
+    @staticmethod
+    def _get_group_arrays(interactive_group: "InteractiveGroup"):
+        """
+        Returns the people of an interactive group as flat arrays:
+        (infector subgroups, infector infection columns, infector ids, infector
+        transmission probabilities, susceptible ids, susceptible subgroups,
+        susceptibilities), where infection columns are those of ``InfectionIdTable``.
+        Groups built with ``InteractiveGroupArrays`` are returned without copying.
+        """
+        arrays = interactive_group.arrays
+        if arrays is not None:
+            n_infectors = arrays.n_infectors
+            n_susceptibles = arrays.n_susceptibles
+            return (
+                arrays.infector_subgroups[:n_infectors],
+                arrays.infector_columns[:n_infectors],
+                arrays.infector_ids[:n_infectors],
+                arrays.infector_trans_probs[:n_infectors],
+                arrays.susceptible_ids[:n_susceptibles],
+                arrays.susceptible_subgroups[:n_susceptibles],
+                arrays.susceptibilities[:n_susceptibles],
+            )
+        infector_subgroups, infector_columns, infector_ids, infector_probs = (
+            [],
+            [],
+            [],
+            [],
+        )
+        for (
+            infection_id,
+            infectors_per_subgroup,
+        ) in interactive_group.infectors_per_infection_per_subgroup.items():
+            column = InfectionIdTable.index(infection_id)
+            for subgroup_id, infectors in infectors_per_subgroup.items():
+                infector_subgroups += [subgroup_id] * len(infectors["ids"])
+                infector_columns += [column] * len(infectors["ids"])
+                infector_ids += infectors["ids"]
+                infector_probs += infectors["trans_probs"]
+        susceptible_ids, susceptible_subgroups, susceptibility_dicts = [], [], []
+        for (
+            subgroup_id,
+            subgroup_susceptibles,
+        ) in interactive_group.susceptibles_per_subgroup.items():
+            for susceptible_id, susceptibility_dict in subgroup_susceptibles.items():
+                susceptible_ids.append(susceptible_id)
+                susceptible_subgroups.append(subgroup_id)
+                susceptibility_dicts.append(susceptibility_dict)
+        susceptibilities = np.ones(
+            (len(susceptible_ids), InfectionIdTable.n_infections()), dtype=np.float64
+        )
+        for n, susceptibility_dict in enumerate(susceptibility_dicts):
+            for infection_id, susceptibility in susceptibility_dict.items():
+                column = InfectionIdTable.index(infection_id)
+                if column < susceptibilities.shape[1]:
+                    susceptibilities[n, column] = susceptibility
+        return (
+            np.array(infector_subgroups, dtype=np.int64),
+            np.array(infector_columns, dtype=np.int64),
+            np.array(infector_ids, dtype=np.int64),
+            np.array(infector_probs, dtype=np.float64),
+            np.array(susceptible_ids, dtype=np.int64),
+            np.array(susceptible_subgroups, dtype=np.int64),
+            susceptibilities,
+        )
+
+    @classmethod
+    def from_interactive_groups(
+        cls,
+        interactive_groups: List["InteractiveGroup"],
+        contact_matrices: list,
+        betas: list,
+    ) -> "InteractionBatch":
+        """
+        Packs a list of interactive groups, with their processed contact matrices
+        and betas (already multiplied by the time step duration), into flat arrays.
+        Interactive groups can be built either with nested dictionaries or with
+        ``InteractiveGroupArrays``; the data is copied so the latter can be released
+        back to their pool after packing.
+        """
+        group_arrays = [
+            cls._get_group_arrays(interactive_group)
+            for interactive_group in interactive_groups
+        ]
+        # dense infection columns present in this batch, ordered by infection id
+        columns = np.unique(
+            np.concatenate(
+                [np.zeros(0, dtype=np.int64)]
+                + [infector_columns for _, infector_columns, *_ in group_arrays]
+            )
+        )
+        infection_ids = sorted(InfectionIdTable.infection_id(c) for c in columns)
+        columns = np.array(
+            [InfectionIdTable.index(infection_id) for infection_id in infection_ids],
+            dtype=np.int64,
+        )
+        n_infections = len(infection_ids)
+        column_to_k = np.full(InfectionIdTable.n_infections(), -1, dtype=np.int64)
+        column_to_k[columns] = np.arange(n_infections)
+        n_subgroups_per_group = [len(cm) for cm in contact_matrices]
+        subgroup_offsets = np.zeros(len(interactive_groups) + 1, dtype=np.int64)
+        subgroup_offsets[1:] = np.cumsum(n_subgroups_per_group)
+        contact_matrix_offsets = np.zeros(len(interactive_groups) + 1, dtype=np.int64)
+        contact_matrix_offsets[1:] = np.cumsum(
+            [n_subgroups**2 for n_subgroups in n_subgroups_per_group]
+        )
+        n_cells = subgroup_offsets[-1] * n_infections
+        subgroup_sizes = np.zeros(subgroup_offsets[-1], dtype=np.float64)
+        infector_cells, infector_ids, infector_probs = [], [], []
+        susceptible_ids, susceptible_groups, susceptible_subgroups = [], [], []
+        susceptibilities = []
+        for g, interactive_group in enumerate(interactive_groups):
+            offset = subgroup_offsets[g]
+            if interactive_group.arrays is not None:
+                n_subgroups = min(
+                    n_subgroups_per_group[g], interactive_group.arrays.n_subgroups
+                )
+                subgroup_sizes[offset : offset + n_subgroups] = (
+                    interactive_group.arrays.subgroup_sizes[:n_subgroups]
+                )
+            else:
+                for (
+                    subgroup_id,
+                    subgroup_size,
+                ) in interactive_group.subgroup_sizes.items():
+                    # groups can have more subgroups than their contact matrix
+                    if subgroup_id < n_subgroups_per_group[g]:
+                        subgroup_sizes[offset + subgroup_id] = subgroup_size
+            (
+                group_infector_subgroups,
+                group_infector_columns,
+                group_infector_ids,
+                group_infector_probs,
+                group_susceptible_ids,
+                group_susceptible_subgroups,
+                group_susceptibilities,
+            ) = group_arrays[g]
+            check_subgroups(
+                interactive_group,
+                n_subgroups_per_group[g],
+                group_infector_subgroups,
+                group_susceptible_subgroups,
+            )
+            infector_cells.append(
+                (offset + group_infector_subgroups) * n_infections
+                + column_to_k[group_infector_columns]
+            )
+            infector_ids.append(group_infector_ids)
+            infector_probs.append(group_infector_probs)
+            susceptible_ids.append(group_susceptible_ids)
+            susceptible_groups.append(
+                np.full(len(group_susceptible_ids), g, dtype=np.int64)
+            )
+            susceptible_subgroups.append(group_susceptible_subgroups)
+            # infection types not known when the group was built have susceptibility 1
+            group_rows = np.ones(
+                (len(group_susceptible_ids), n_infections), dtype=np.float64
+            )
+            known = columns < group_susceptibilities.shape[1]
+            group_rows[:, known] = group_susceptibilities[:, columns[known]]
+            susceptibilities.append(group_rows)
+        infector_cells = np.concatenate([np.zeros(0, dtype=np.int64)] + infector_cells)
+        infector_ids = np.concatenate([np.zeros(0, dtype=np.int64)] + infector_ids)
+        infector_probs = np.concatenate(
+            [np.zeros(0, dtype=np.float64)] + infector_probs
+        )
+        transmission_sums = np.bincount(
+            infector_cells, weights=infector_probs, minlength=n_cells
+        ).astype(np.float64)
+        # sort infectors by cell so that each cell owns a contiguous range, and by
+        # id within the cell so that blame does not depend on the placement order
+        order = np.lexsort((infector_ids, infector_cells))
+        infector_offsets = np.zeros(n_cells + 1, dtype=np.int64)
+        infector_offsets[1:] = np.cumsum(
+            np.bincount(infector_cells, minlength=n_cells)
+        )
+        return cls(
+            groups=[interactive_group.group for interactive_group in interactive_groups],
+            infection_ids=infection_ids,
+            subgroup_offsets=subgroup_offsets,
+            subgroup_sizes=subgroup_sizes,
+            contact_matrix_offsets=contact_matrix_offsets,
+            contact_matrices=np.concatenate(
+                [np.asarray(cm, dtype=np.float64).ravel() for cm in contact_matrices]
+            )
+            if contact_matrices
+            else np.zeros(0, dtype=np.float64),
+            betas=np.array(betas, dtype=np.float64),
+            transmission_sums=transmission_sums,
+            infector_offsets=infector_offsets,
+            infector_ids=infector_ids[order],
+            infector_probs=infector_probs[order],
+            susceptible_ids=np.concatenate(
+                [np.zeros(0, dtype=np.int64)] + susceptible_ids
+            ),
+            susceptible_groups=np.concatenate(
+                [np.zeros(0, dtype=np.int64)] + susceptible_groups
+            ),
+            susceptible_subgroups=np.concatenate(
+                [np.zeros(0, dtype=np.int64)] + susceptible_subgroups
+            ),
+            susceptibilities=np.concatenate(
+                [np.zeros((0, n_infections), dtype=np.float64)] + susceptibilities
+            ),
+        )
+
+    def run(self):
+        """
+        Runs the interaction for all the packed groups.
+
+        Returns
+        -------
+        A list with, for every packed group, a tuple of
+        (infected ids, infection ids, infector ids to blame).
+        """
+        if not self.must_run:
+            return self.unpack_results(None)
+        kernel_results = _batched_time_step(
+            len(self.infection_ids), *self.kernel_arrays, self.draw_uniforms()
+        )
+        return self.unpack_results(kernel_results)
+
+    def unpack_results(self, kernel_results):
+        """
+        Converts the indices returned by the kernel into ids, grouped by group.
+        """
+        ret = [([], [], []) for _ in range(self.n_groups)]
+        if kernel_results is None:
+            return ret
+        for n, k, blamed_idx in zip(*kernel_results):
+            infected_ids, infection_ids, to_blame_ids = ret[self.susceptible_groups[n]]
+            infected_ids.append(int(self.susceptible_ids[n]))
+            infection_ids.append(self.infection_ids[k])
+            to_blame_ids.append(int(self.infector_ids[blamed_idx]))
+        return ret
@@ -1,13 +1,15 @@
 import numpy as np
-from random import random
+import numba as nb
 from typing import List, Dict
 from collections import defaultdict
 from june.mpi_wrapper import mpi_comm, mpi_rank, mpi_available, mpi_size
 
 from june.global_context import GlobalContext
 from june.groups.group.interactive import InteractiveGroup
-from june.groups import InteractiveSchool
+from june.interaction.batched_interaction import InteractionBatch, check_subgroups
+from june.groups import InteractiveSchool, InteractiveGroupArrays
 from june.records import Record
+from june.utils import inverse_cdf_choice, RandomStreams
 from june import paths
 
 default_sector_beta_filename = (
@@ -15,6 +17,84 @@ default_sector_beta_filename = (
 )
 
 
+@nb.jit(nopython=True)
+def _draw_subgroup_infections(exposures, susceptibilities, uniforms):
+    """
+    Decides which susceptibles of a subgroup get infected, by which infection type
+    and which subgroup is to blame. Susceptible n uses the random numbers in
+    ``uniforms[n]``.
+
+    Parameters
+    ----------
+    exposures
+        (infection x subgroup) array with the exposure of the susceptible subgroup
+        to the infectors of every subgroup
+    susceptibilities
+        (susceptible x infection) array of susceptibilities
+
+    Returns
+    -------
+    (susceptible indices, infection type indices, blamed subgroups)
+    """
+    n_infections = exposures.shape[0]
+    n_susceptibles = susceptibilities.shape[0]
+    infected = np.empty(n_susceptibles, dtype=np.int64)
+    infection_types = np.empty(n_susceptibles, dtype=np.int64)
+    blamed_subgroups = np.empty(n_susceptibles, dtype=np.int64)
+    total_exposures = np.empty(n_infections)
+    for k in range(n_infections):
+        total_exposures[k] = exposures[k].sum()
+    weights = np.empty(n_infections)
+    n_new = 0
+    for n in range(n_susceptibles):
+        total_exposure = 0.0
+        for k in range(n_infections):
+            weights[k] = total_exposures[k] * susceptibilities[n, k]
+            total_exposure += weights[k]
+        if total_exposure == 0.0:
+            continue
+        if uniforms[n, 0] >= 1.0 - np.exp(-total_exposure):
+            continue
+        k = 0
+        if n_infections > 1:
+            k = inverse_cdf_choice(weights, uniforms[n, 1])
+        infected[n_new] = n
+        infection_types[n_new] = k
+        blamed_subgroups[n_new] = inverse_cdf_choice(exposures[k], uniforms[n, 2])
+        n_new += 1
+    return infected[:n_new], infection_types[:n_new], blamed_subgroups[:n_new]
+
+
+@nb.jit(nopython=True)
+def _draw_single_infection_subgroup(exposures, susceptibilities, uniforms):
+    """
+    Specialisation of ``_draw_subgroup_infections`` for runs with a single
+    infection type. The exposure of the susceptible subgroup is a single scalar,
+    so the infection draw is done for all the susceptibles in one vectorised step,
+    and only the infected ones go on to select the subgroup to blame. The same
+    random numbers as the general sampler are used, so results are identical.
+
+    Parameters
+    ----------
+    exposures
+        array with the exposure of the susceptible subgroup to the infectors of
+        every subgroup
+    susceptibilities
+        array of susceptibilities of the susceptibles in the subgroup
+
+    Returns
+    -------
+    (susceptible indices, blamed subgroups)
+    """
+    total_exposure = exposures.sum()
+    infection_probabilities = 1.0 - np.exp(-total_exposure * susceptibilities)
+    infected = np.nonzero(uniforms[:, 0] < infection_probabilities)[0]
+    blamed_subgroups = np.empty(len(infected), dtype=np.int64)
+    for i in range(len(infected)):
+        blamed_subgroups[i] = inverse_cdf_choice(exposures, uniforms[infected[i], 2])
+    return infected, blamed_subgroups
+
+
 class Interaction:
     """
     Class to handle interaction in groups.
@@ -43,6 +123,17 @@ class Interaction:
         )
         self.beta_reductions = {}
         self.current_time = None  # Track current simulation time for isolation checks
+
+        # Processed betas and contact matrices only change when the policies do, so
+        # we cache them. The epoch is bumped every time the policies change.
+        self.policy_epoch = 0
+        self._processed_betas = {}
+        self._processed_contact_matrices = {}
+        self._scratch_buffers = {}
+
+        # Set when the simulation only has one infection type, see
+        # ``set_infection_selectors``.
+        self.single_infection_id = None
         
         # Counter for initial infected IDs in transmission chains
         self.initial_infected_transmission_counts = defaultdict(int)
@@ -433,7 +524,74 @@ class Interaction:
             contact_matrices[group] = contact_matrix
         return contact_matrices
 
+    def set_infection_selectors(self, infection_selectors):
+        """
+        Checks whether the simulation has a single infection type, in which case
+        the interaction of every subgroup is run through a specialised sampler
+        that works with scalar exposures instead of (infection x subgroup) arrays.
+
+        Parameters
+        ----------
+        infection_selectors
+            the InfectionSelectors of the epidemiology module
+        """
+        infection_ids = list(infection_selectors.infection_id_to_selector)
+        if len(infection_ids) == 1:
+            self.single_infection_id = infection_ids[0]
+        else:
+            self.single_infection_id = None
+
+    def set_beta_reductions(self, beta_reductions: dict):
+        """
+        Sets the policy beta reductions, invalidating the processed betas cache
+        only if they are different from the current ones.
+        """
+        if dict(beta_reductions) != dict(self.beta_reductions):
+            self.invalidate_processed_cache()
+        self.beta_reductions = beta_reductions
+
+    def invalidate_processed_cache(self):
+        """
+        Empties the processed betas and contact matrices caches. Needs to be called
+        whenever the interaction policies or the regional compliances change.
+        """
+        self.policy_epoch += 1
+        self._processed_betas.clear()
+        self._processed_contact_matrices.clear()
+
     def _get_interactive_group_beta(self, interactive_group):
+        """
+        Get processed beta for an interactive group. Betas are cached by the key
+        given by the interactive group, which is valid for the current policy epoch.
+        """
+        key = interactive_group.get_processed_beta_key(current_time=self.current_time)
+        if key is None:
+            return self._compute_interactive_group_beta(interactive_group)
+        beta = self._processed_betas.get(key)
+        if beta is None:
+            beta = self._compute_interactive_group_beta(interactive_group)
+            self._processed_betas[key] = beta
+        return beta
+
+    def _get_interactive_group_contact_matrix(self, interactive_group):
+        """
+        Get processed contact matrix for an interactive group, cached by the key
+        given by the interactive group.
+        """
+        key = interactive_group.get_processed_contact_matrix_key()
+        if key is None:
+            return interactive_group.get_processed_contact_matrix(
+                self.contact_matrices[interactive_group.spec]
+            )
+        contact_matrix = self._processed_contact_matrices.get(key)
+        if contact_matrix is None:
+            contact_matrix = interactive_group.get_processed_contact_matrix(
+                self.contact_matrices[interactive_group.spec]
+            )
+            self._processed_contact_matrices[key] = contact_matrix
+        return contact_matrix
+
+    def _compute_interactive_group_beta(self, interactive_group):
         """Get processed beta for an interactive group, passing current time for household isolation checks."""
         # Check if this is a household group that supports isolation detection
         if hasattr(interactive_group, 'has_isolating_residents'):
@@ -448,6 +606,17 @@ class Interaction:
                 betas=self.betas, beta_reductions=self.beta_reductions
             )
 
+    def _get_scratch_buffer(self, name, shape):
+        """
+        Returns a preallocated array of the given name and shape. The content of
+        the buffer is only valid until the next call with the same name and shape.
+        """
+        buffer = self._scratch_buffers.get((name, shape))
+        if buffer is None:
+            buffer = np.empty(shape, dtype=np.float64)
+            self._scratch_buffers[(name, shape)] = buffer
+        return buffer
+
     def create_infector_tensor(
         self,
         infectors_per_infection_per_subgroup,
@@ -456,27 +625,56 @@ class Interaction:
         beta,
         delta_time,
     ):
-        ret = {}
-        for inf_id in infectors_per_infection_per_subgroup:
-            infector_matrix = np.zeros_like(contact_matrix, dtype=np.float64)
-            for subgroup_id in infectors_per_infection_per_subgroup[inf_id]:
-                subgroup_trans_prob = sum(
-                    infectors_per_infection_per_subgroup[inf_id][subgroup_id][
-                        "trans_probs"
-                    ]
-                )
-                for i in range(len(contact_matrix)):
-                    subgroup_size = subgroup_sizes[subgroup_id]
-                    if i == subgroup_id:
-                        subgroup_size = max(1, subgroup_size - 1)
-                    infector_matrix[i, subgroup_id] = (
-                        contact_matrix[i, subgroup_id]
-                        * subgroup_trans_prob
-                        / subgroup_size
-                    )
-            ret[inf_id] = infector_matrix * beta * delta_time
-        return ret
-    
+        """
+        Computes, for every infection id, the matrix with elements
+
+        $ beta * delta_time * contact_matrix[i, j] * transmission_sum[j] / size_j $
+
+        where transmission_sum[j] is the sum of the transmission probabilities of the
+        infectors in subgroup j, and size_j excludes the susceptible themselves when
+        i == j. This is done as a single broadcasted operation over a
+        (infection x subgroup) matrix of transmission sums.
+
+        The returned matrices are views of a scratch buffer that is reused between
+        calls, so they must be consumed before calling this method again.
+        """
+        infection_ids = list(infectors_per_infection_per_subgroup)
+        n_subgroups = len(contact_matrix)
+        transmission_sums = self._get_scratch_buffer(
+            "transmission_sums", (len(infection_ids), n_subgroups)
+        )
+        transmission_sums[:] = 0.0
+        for k, infection_id in enumerate(infection_ids):
+            for subgroup_id, infectors in infectors_per_infection_per_subgroup[
+                infection_id
+            ].items():
+                transmission_sums[k, subgroup_id] = sum(infectors["trans_probs"])
+        # inverse of the number of people each susceptible contacts in every subgroup
+        inverse_sizes = self._get_scratch_buffer(
+            "inverse_sizes", (n_subgroups, n_subgroups)
+        )
+        sizes = np.zeros(n_subgroups, dtype=np.float64)
+        for subgroup_id, subgroup_size in subgroup_sizes.items():
+            # groups can have more subgroups than their contact matrix
+            if subgroup_id < n_subgroups:
+                sizes[subgroup_id] = subgroup_size
+        np.divide(1.0, sizes, out=inverse_sizes[0], where=sizes > 0)
+        inverse_sizes[0, sizes == 0] = 0.0
+        inverse_sizes[1:] = inverse_sizes[0]
+        np.fill_diagonal(inverse_sizes, 1.0 / np.maximum(1.0, sizes - 1.0))
+        infector_tensor = self._get_scratch_buffer(
+            "infector_tensor", (len(infection_ids), n_subgroups, n_subgroups)
+        )
+        np.multiply(
+            contact_matrix * inverse_sizes * (beta * delta_time),
+            transmission_sums[:, np.newaxis, :],
+            out=infector_tensor,
+        )
+        return {
+            infection_id: infector_tensor[k]
+            for k, infection_id in enumerate(infection_ids)
+        }
+
     def _count_initial_infected_transmissions(self, to_blame_ids, group=None):
         """
         Count how many times each initial infected ID appears in to_blame_ids.
@@ -536,9 +734,18 @@ class Interaction:
 
         # Process the group's beta and contact matrix
         beta = self._get_interactive_group_beta(interactive_group)
-        contact_matrix_raw = self.contact_matrices[group.spec]
-        contact_matrix = interactive_group.get_processed_contact_matrix(
-            contact_matrix_raw
+        contact_matrix = self._get_interactive_group_contact_matrix(interactive_group)
+        check_subgroups(
+            interactive_group,
+            len(contact_matrix),
+            [
+                subgroup_id
+                for subgroups in (
+                    interactive_group.infectors_per_infection_per_subgroup.values()
+                )
+                for subgroup_id in subgroups
+            ],
+            list(interactive_group.susceptibles_per_subgroup),
         )
 
         # Create the infector tensor
@@ -550,26 +757,46 @@ class Interaction:
             delta_time,
         )
 
-        # Process susceptibles and compute infections
+        # Process susceptibles and compute infections. Groups whose infectors all
+        # carry the only infection type of the simulation take the fast path.
+        single_infection_id = self.single_infection_id
+        if single_infection_id is not None and (
+            len(infector_tensor) != 1 or single_infection_id not in infector_tensor
+        ):
+            single_infection_id = None
         for (
             susceptible_subgroup_id,
             subgroup_susceptibles,
         ) in interactive_group.susceptibles_per_subgroup.items():
-            (
-                new_infected_ids,
-                new_infection_ids,
-                new_to_blame_subgroups,
-            ) = self._time_step_for_subgroup(
-                infector_tensor=infector_tensor,
-                susceptible_subgroup_id=susceptible_subgroup_id,
-                subgroup_susceptibles=subgroup_susceptibles,
-            )
+            if single_infection_id is not None:
+                (
+                    new_infected_ids,
+                    new_infection_ids,
+                    new_to_blame_subgroups,
+                ) = self._time_step_for_subgroup_single_infection(
+                    exposures=infector_tensor[single_infection_id][
+                        susceptible_subgroup_id
+                    ],
+                    infection_id=single_infection_id,
+                    subgroup_susceptibles=subgroup_susceptibles,
+                )
+            else:
+                (
+                    new_infected_ids,
+                    new_infection_ids,
+                    new_to_blame_subgroups,
+                ) = self._time_step_for_subgroup(
+                    infector_tensor=infector_tensor,
+                    susceptible_subgroup_id=susceptible_subgroup_id,
+                    subgroup_susceptibles=subgroup_susceptibles,
+                )
             infected_ids += new_infected_ids
             infection_ids += new_infection_ids
             to_blame_subgroups += new_to_blame_subgroups
 
         # Determine the individuals responsible for infections
         to_blame_ids = self._blame_individuals(
+            infected_ids,
             to_blame_subgroups,
             infection_ids,
             interactive_group.infectors_per_infection_per_subgroup,
@@ -590,7 +817,170 @@ class Interaction:
 
         return infected_ids, infection_ids, interactive_group.size
 
-    
+    def time_step_for_supergroup(
+        self,
+        super_group,
+        delta_time: float,
+        people_from_abroad_dict: dict = None,
+        record: Record = None,
+        groups: list = None,
+    ):
+        """
+        Runs an interaction time step for all the groups of a supergroup at once.
+        The groups that must be time stepped are packed into flat arrays and the
+        infection draws and blame assignment are done in a single compiled pass.
+        Results are equivalent (in distribution) to calling ``time_step_for_group``
+        on every group.
+
+        Parameters
+        ----------
+        groups
+            subset of the groups of the supergroup to interact (e.g. the infectious
+            venues), defaults to all of them.
+
+        Returns
+        -------
+        infected_ids, infection_ids
+            ids of the newly infected people and of the infections they got.
+        """
+        batch = self.pack_supergroup(
+            super_group=super_group,
+            delta_time=delta_time,
+            people_from_abroad_dict=people_from_abroad_dict,
+            groups=groups,
+        )
+        if batch is None:
+            return [], []
+        return self.merge_batch_results(batch, batch.run(), record=record)
+
+    def time_step_for_supergroups(
+        self,
+        super_groups_and_groups: list,
+        delta_time: float,
+        people_from_abroad_dict: dict = None,
+        record: Record = None,
+        pool=None,
+    ):
+        """
+        Runs an interaction time step for several supergroups. All the supergroups
+        are packed first and then run, either here or concurrently in the given
+        ``InteractionPool``. Random numbers come from the counter-based streams of
+        the susceptibles and results are merged in supergroup order, so the outcome
+        is the same with and without the pool.
+
+        Parameters
+        ----------
+        super_groups_and_groups
+            list of (supergroup, groups to interact or None for all of them)
+        pool
+            optional InteractionPool to run the batches in
+
+        Returns
+        -------
+        infected_ids, infection_ids
+            ids of the newly infected people and of the infections they got.
+        """
+        batches = []
+        for super_group, groups in super_groups_and_groups:
+            batch = self.pack_supergroup(
+                super_group=super_group,
+                delta_time=delta_time,
+                people_from_abroad_dict=people_from_abroad_dict,
+                groups=groups,
+            )
+            if batch is not None:
+                batches.append(batch)
+        if pool is not None:
+            results = pool.run_batches(batches)
+        else:
+            results = [batch.run() for batch in batches]
+        infected_ids = []
+        infection_ids = []
+        for batch, batch_results in zip(batches, results):
+            new_infected_ids, new_infection_ids = self.merge_batch_results(
+                batch, batch_results, record=record
+            )
+            infected_ids += new_infected_ids
+            infection_ids += new_infection_ids
+        return infected_ids, infection_ids
+
+    def pack_supergroup(
+        self,
+        super_group,
+        delta_time: float,
+        people_from_abroad_dict: dict = None,
+        groups: list = None,
+    ):
+        """
+        Packs the groups of a supergroup that must be time stepped into an
+        InteractionBatch. Returns None if there is nothing to interact.
+        """
+        people_from_abroad_dict = people_from_abroad_dict or {}
+        interactive_groups = []
+        contact_matrices = []
+        betas = []
+        if groups is None:
+            groups = super_group
+        for group in groups:
+            if group.external:
+                continue
+            people_from_abroad = people_from_abroad_dict.get(group.spec, {}).get(
+                group.id, None
+            )
+            arrays = InteractiveGroupArrays.acquire()
+            interactive_group = group.get_interactive_group(
+                people_from_abroad=people_from_abroad, arrays=arrays
+            )
+            if not interactive_group.must_timestep:
+                arrays.release()
+                continue
+            beta = self._get_interactive_group_beta(interactive_group)
+            contact_matrix = self._get_interactive_group_contact_matrix(
+                interactive_group
+            )
+            interactive_groups.append(interactive_group)
+            contact_matrices.append(contact_matrix)
+            betas.append(beta * delta_time)
+
+        if not interactive_groups:
+            return None
+
+        batch = InteractionBatch.from_interactive_groups(
+            interactive_groups=interactive_groups,
+            contact_matrices=contact_matrices,
+            betas=betas,
+        )
+        # the batch holds copies of the data, so the arrays can go back to the pool
+        for interactive_group in interactive_groups:
+            if interactive_group.arrays is not None:
+                interactive_group.arrays.release()
+        return batch
+
+    def merge_batch_results(self, batch, batch_results, record: Record = None):
+        """
+        Counts and records the infections produced by a batch, and returns the
+        ids of the newly infected people and of the infections they got.
+        """
+        infected_ids = []
+        infection_ids = []
+        for group, (new_infected_ids, new_infection_ids, to_blame_ids) in zip(
+            batch.groups, batch_results
+        ):
+            if not new_infected_ids:
+                continue
+            self._count_initial_infected_transmissions(to_blame_ids, group)
+            if record:
+                self._log_infections_to_record(
+                    infected_ids=new_infected_ids,
+                    infection_ids=new_infection_ids,
+                    to_blame_ids=to_blame_ids,
+                    record=record,
+                    group=group,
+                )
+            infected_ids += new_infected_ids
+            infection_ids += new_infection_ids
+        return infected_ids, infection_ids
+
     def _time_step_for_subgroup(
         self, infector_tensor, susceptible_subgroup_id, subgroup_susceptibles
     ):
@@ -598,67 +988,108 @@ class Interaction:
         Time step for one susceptible subgroup. We first compute the combined
         effective transmission probability of all the subgroups that contain infected
         people, and then run this effective transmission over the susceptible subgroup,
-        to check who got infected.
+        to check who got infected. The draws are done by a compiled sampler that
+        takes the random numbers of every susceptible from their "interaction"
+        stream, so they do not depend on the order in which groups are visited.
 
         Parameters
         ----------
         """
-        new_infected_ids = []
-        new_infection_ids = []
-        new_to_blame_subgroups = []
         infection_ids = list(infector_tensor.keys())
-        for susceptible_id, susceptibility_dict in subgroup_susceptibles.items():
-            infection_transmission_parameters = []
-            for infection_id in infector_tensor:
-                susceptibility = susceptibility_dict.get(infection_id, 1.0)
-                infector_transmission = infector_tensor[infection_id][
-                    susceptible_subgroup_id
-                ].sum()
-                infection_transmission_parameters.append(
-                    infector_transmission * susceptibility
-                )
-            infection_id = self._gets_infected(
-                np.array(infection_transmission_parameters), infection_ids
-            )
-            if infection_id is not None:
-                new_infected_ids.append(susceptible_id)
-                new_infection_ids.append(infection_id)
-                new_to_blame_subgroups.append(
-                    self._blame_subgroup(
-                        infector_tensor[infection_id][susceptible_subgroup_id]
-                    )
-                )
+        susceptible_ids = list(subgroup_susceptibles.keys())
+        exposures = np.array(
+            [
+                infector_tensor[infection_id][susceptible_subgroup_id]
+                for infection_id in infection_ids
+            ]
+        )
+        susceptibilities = np.array(
+            [
+                [
+                    susceptibility_dict.get(infection_id, 1.0)
+                    for infection_id in infection_ids
+                ]
+                for susceptibility_dict in subgroup_susceptibles.values()
+            ],
+            dtype=np.float64,
+        ).reshape(len(susceptible_ids), len(infection_ids))
+        infected, infection_types, blamed_subgroups = _draw_subgroup_infections(
+            exposures,
+            susceptibilities,
+            RandomStreams.uniforms("interaction", susceptible_ids, 4),
+        )
+        new_infected_ids = [susceptible_ids[n] for n in infected]
+        new_infection_ids = [infection_ids[k] for k in infection_types]
+        new_to_blame_subgroups = [int(j) for j in blamed_subgroups]
         return new_infected_ids, new_infection_ids, new_to_blame_subgroups
 
+    def _time_step_for_subgroup_single_infection(
+        self, exposures, infection_id, subgroup_susceptibles
+    ):
+        """
+        Time step for one susceptible subgroup when there is a single infection
+        type. Equivalent to ``_time_step_for_subgroup``, but the susceptibilities
+        are read into a flat array and the infections of all the susceptibles are
+        drawn at once.
 
-    def _gets_infected(self, infection_transmission_parameters, infection_ids):
-        total_exp = infection_transmission_parameters.sum()
-        if random() < 1 - np.exp(-total_exp):
-            if len(infection_ids) == 1:
-                return infection_ids[0]
-            return np.random.choice(
-                infection_ids, p=infection_transmission_parameters / total_exp
-            )
-
-    def _blame_subgroup(self, vector):
-        probs = vector / vector.sum()
-        return np.random.choice(len(vector), p=probs)
+        Parameters
+        ----------
+        exposures
+            exposure of the susceptible subgroup to the infectors of every subgroup
+        infection_id
+            id of the only infection type
+        subgroup_susceptibles
+            dictionary mapping the susceptible ids to their susceptibility dicts
+        """
+        susceptible_ids = np.fromiter(
+            subgroup_susceptibles.keys(),
+            dtype=np.int64,
+            count=len(subgroup_susceptibles),
+        )
+        susceptibilities = np.fromiter(
+            (
+                susceptibility_dict.get(infection_id, 1.0)
+                for susceptibility_dict in subgroup_susceptibles.values()
+            ),
+            dtype=np.float64,
+            count=len(subgroup_susceptibles),
+        )
+        infected, blamed_subgroups = _draw_single_infection_subgroup(
+            np.ascontiguousarray(exposures),
+            susceptibilities,
+            RandomStreams.uniforms("interaction", susceptible_ids, 4),
+        )
+        new_infected_ids = susceptible_ids[infected].tolist()
+        new_infection_ids = [infection_id] * len(new_infected_ids)
+        new_to_blame_subgroups = blamed_subgroups.tolist()
+        return new_infected_ids, new_infection_ids, new_to_blame_subgroups
 
     def _blame_individuals(
-        self, to_blame_subgroups, infection_ids, infectors_per_infection_per_subgroup
+        self,
+        infected_ids,
+        to_blame_subgroups,
+        infection_ids,
+        infectors_per_infection_per_subgroup,
     ):
+        """
+        Selects the infector to blame for every new infection, using the fourth
+        draw of the "interaction" stream of the infected person. Candidates are
+        sorted by id so that the choice does not depend on the placement order.
+        """
         ret = []
-        for infection_id, subgroup in zip(infection_ids, to_blame_subgroups):
-            candidates_ids = infectors_per_infection_per_subgroup[infection_id][
-                subgroup
-            ]["ids"]
-            candidates_probs = np.array(
-                infectors_per_infection_per_subgroup[infection_id][subgroup][
-                    "trans_probs"
-                ]
+        if not infected_ids:
+            return ret
+        uniforms = RandomStreams.uniforms("interaction", infected_ids, 4)[:, 3]
+        for u, infection_id, subgroup in zip(
+            uniforms, infection_ids, to_blame_subgroups
+        ):
+            candidates = infectors_per_infection_per_subgroup[infection_id][subgroup]
+            candidates_ids = np.array(candidates["ids"], dtype=np.int64)
+            order = np.argsort(candidates_ids)
+            idx = inverse_cdf_choice(
+                np.array(candidates["trans_probs"], dtype=np.float64)[order], u
             )
-            candidates_probs /= candidates_probs.sum()
-            ret.append(np.random.choice(candidates_ids, p=candidates_probs))
+            ret.append(int(candidates_ids[order[idx]]))
         return ret
 
     def _log_infections_to_record(
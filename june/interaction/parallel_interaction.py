@@ -0,0 +1,195 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from typing import List
+
+from june.exc import InteractionError
+from june.interaction.batched_interaction import (
+    InteractionBatch,
+    _batched_time_step,
+    run_group_range,
+)
+from june.mpi_wrapper import mpi_size
+
+
+def _run_shared_groups(
+    n_infections: int, shm_name: str, layout: list, group_start: int, group_end: int
+):
+    """
+    Runs the compiled interaction kernel in a worker process over a range of
+    groups of a batch whose arrays live in a shared memory block.
+
+    Parameters
+    ----------
+    n_infections
+        number of infection types in the batch
+    shm_name
+        name of the shared memory block
+    layout
+        list of (offset, shape, dtype) for the kernel arrays followed by the uniforms
+    group_start, group_end
+        range of groups to run, see ``run_group_range``
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = [
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        for offset, shape, dtype in layout
+    ]
+    results = run_group_range(
+        n_infections, arrays[:-1], arrays[-1], group_start, group_end
+    )
+    # the views must be released before the shared block can be closed
+    del arrays
+    shm.close()
+    return results
+
+
+class InteractionPool:
+    """
+    Pool of worker processes that run the interaction of the groups of a rank
+    concurrently. Groups are independent within a time step, so the groups of
+    every packed supergroup (an ``InteractionBatch``) are split into chunks of
+    about ``chunk_susceptibles`` susceptibles, and every chunk can be run by a
+    different worker, so that a supergroup with most of the susceptibles (e.g.
+    households) is spread over all the workers. The batch arrays are placed in
+    shared memory so they are not pickled. Random numbers come from the
+    counter-based streams of the susceptibles, so the results are identical to
+    running the batches serially.
+
+    Workers are started with ``forkserver`` by default: forking a process that
+    initialised MPI is unsafe with most MPI implementations, so ``fork`` is
+    refused when running on several ranks.
+
+    Parameters
+    ----------
+    n_workers
+        number of worker processes
+    min_susceptibles
+        batches with fewer susceptibles than this are run in the main process,
+        since shipping them to a worker costs more than running them
+    chunk_susceptibles
+        number of susceptibles per chunk, by default enough chunks to give every
+        worker four of each large batch
+    start_method
+        multiprocessing start method used to create the workers
+    """
+
+    def __init__(
+        self,
+        n_workers: int = 4,
+        min_susceptibles: int = 1000,
+        chunk_susceptibles: int = None,
+        start_method="forkserver",
+    ):
+        if start_method == "fork" and mpi_size > 1:
+            raise InteractionError(
+                "The interaction pool cannot fork workers from an MPI rank, use "
+                "the forkserver or spawn start methods"
+            )
+        self.n_workers = n_workers
+        self.min_susceptibles = min_susceptibles
+        self.chunk_susceptibles = chunk_susceptibles
+        self.start_method = start_method
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = mp.get_context(self.start_method).Pool(self.n_workers)
+        return self._pool
+
+    def _chunk_size(self, batch: InteractionBatch) -> int:
+        if self.chunk_susceptibles:
+            return self.chunk_susceptibles
+        return max(
+            self.min_susceptibles,
+            -(-len(batch.susceptible_ids) // (4 * self.n_workers)),
+        )
+
+    @staticmethod
+    def _to_shared_memory(arrays: list):
+        """
+        Copies the arrays into a new shared memory block.
+
+        Returns
+        -------
+        the shared memory block and the (offset, shape, dtype) of every array.
+        """
+        layout = []
+        offset = 0
+        for array in arrays:
+            # keep every array 8-byte aligned
+            offset = (offset + 7) // 8 * 8
+            layout.append((offset, array.shape, array.dtype.str))
+            offset += array.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for array, (offset, shape, dtype) in zip(arrays, layout):
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+        return shm, layout
+
+    def run_batches(self, batches: List[InteractionBatch]) -> list:
+        """
+        Runs the given batches, returning their results in the same order as
+        ``InteractionBatch.run`` would.
+        """
+        pending = []
+        shms = []
+        try:
+            for batch in batches:
+                if not batch.must_run:
+                    pending.append(None)
+                elif len(batch.susceptible_ids) < self.min_susceptibles:
+                    pending.append(
+                        _batched_time_step(
+                            len(batch.infection_ids),
+                            *batch.kernel_arrays,
+                            batch.draw_uniforms(),
+                        )
+                    )
+                else:
+                    shm, layout = self._to_shared_memory(
+                        list(batch.kernel_arrays) + [batch.draw_uniforms()]
+                    )
+                    shms.append(shm)
+                    pending.append(
+                        [
+                            self.pool.apply_async(
+                                _run_shared_groups,
+                                (
+                                    len(batch.infection_ids),
+                                    shm.name,
+                                    layout,
+                                    group_start,
+                                    group_end,
+                                ),
+                            )
+                            for group_start, group_end in batch.group_chunks(
+                                self._chunk_size(batch)
+                            )
+                        ]
+                    )
+            results = []
+            for batch, kernel_results in zip(batches, pending):
+                if isinstance(kernel_results, list):
+                    chunk_results = [chunk.get() for chunk in kernel_results]
+                    kernel_results = tuple(
+                        np.concatenate(
+                            [np.zeros(0, dtype=np.int64)]
+                            + [chunk[i] for chunk in chunk_results]
+                        )
+                        for i in range(3)
+                    )
+                results.append(batch.unpack_results(kernel_results))
+            return results
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
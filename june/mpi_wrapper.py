@@ -1,9 +1,13 @@
 # june/mpi_wrapper.py
 import os
+import heapq
 import logging
 import numpy as np
+from collections import defaultdict
 from pathlib import Path
 
+from june.exc import SimulatorError
+
 logger = logging.getLogger("mpi_wrapper")
 
 # Try to import MPI, but don't fail if it's not available
@@ -96,32 +100,69 @@ except ImportError:
     mpi_size = 1
 
 
+# Record of a person sent to another domain. The immunity of the person is
+# stored in separate packed arrays, at [immunity_offset, immunity_offset + count).
+movable_person_dtype = np.dtype(
+    [
+        ("group_spec", "S32"),
+        ("group_id", np.int64),
+        ("subgroup_type", np.int64),
+        ("id", np.int64),
+        ("inf_prob", np.float64),
+        ("inf_id", np.int64),
+        ("susc", np.bool_),
+        ("active", np.bool_),
+        ("dom", np.int64),
+        ("immunity_offset", np.int64),
+        ("immunity_count", np.int64),
+    ],
+    align=True,
+)
+
+# Group of another domain that receives people from this domain, sent ahead of
+# the people so that the receiver knows which of its groups must wait for them.
+foreign_group_dtype = np.dtype(
+    [("group_spec", "S32"), ("group_id", np.int64)], align=True
+)
+
+
 class MovablePeople:
     """
     Class for managing mobile people across domains.
     This version is MPI-aware but works in both MPI and non-MPI modes.
+
+    People going to other domains are stored in a flat append-only table. Every
+    row holds the destination subgroup, as an index into ``subgroup_keys`` of
+    (domain, spec, group id, subgroup type), and the data of the person.
+    ``index`` maps (subgroup key index, person id) to the row, so adding and
+    deleting people are O(1). Deleted rows are marked dead instead of being
+    removed.
     """
     def __init__(self):
-        self.skinny_out = {}
         self.skinny_in = {}
+        # maps the id of every person received from abroad to their home domain,
+        # used to send their infections back home
+        self.home_domains = {}
         self.index = {}
+        self.subgroup_keys = []
+        self._subgroup_key_ids = {}
+        self._row_keys = []
+        self._row_views = []
+        self._row_alive = []
+        self._row_routable = []
+        self._counts_by_domain = {}
+        self._n_people = 0
 
     def count_total_people(self):
         """
-        Calculate the total number of people in skinny_out across all domains.
+        Calculate the total number of people scheduled for transfer, across all domains.
         
         Returns
         -------
         int
             Total number of people scheduled for transfer
         """
-        total_count = 0
-        for domain_id in self.skinny_out:
-            for group_spec in self.skinny_out[domain_id]:
-                for group_id in self.skinny_out[domain_id][group_spec]:
-                    for subgroup_type in self.skinny_out[domain_id][group_spec][group_id]:
-                        total_count += len(self.skinny_out[domain_id][group_spec][group_id][subgroup_type])
-        return total_count
+        return self._n_people
 
     def count_people_by_domain(self):
         """
@@ -132,15 +173,32 @@ class MovablePeople:
         dict
             Dictionary mapping domain_id to number of people
         """
-        counts_by_domain = {}
-        for domain_id in self.skinny_out:
-            domain_count = 0
-            for group_spec in self.skinny_out[domain_id]:
-                for group_id in self.skinny_out[domain_id][group_spec]:
-                    for subgroup_type in self.skinny_out[domain_id][group_spec][group_id]:
-                        domain_count += len(self.skinny_out[domain_id][group_spec][group_id][subgroup_type])
-            counts_by_domain[domain_id] = domain_count
-        return counts_by_domain
+        return dict(self._counts_by_domain)
+
+    def _get_subgroup_key_id(self, subgroup_key):
+        key_id = self._subgroup_key_ids.get(subgroup_key)
+        if key_id is None:
+            key_id = len(self.subgroup_keys)
+            self._subgroup_key_ids[subgroup_key] = key_id
+            self.subgroup_keys.append(subgroup_key)
+        return key_id
+
+    def _add_row(self, subgroup_key, person_id, view, routable=False):
+        key_id = self._get_subgroup_key_id(subgroup_key)
+        row = self.index.get((key_id, person_id))
+        if row is not None:
+            # the person was already going to this subgroup, update their data
+            self._row_views[row] = view
+            self._row_routable[row] = routable
+            return
+        self.index[(key_id, person_id)] = len(self._row_views)
+        self._row_keys.append(key_id)
+        self._row_views.append(view)
+        self._row_alive.append(True)
+        self._row_routable.append(routable)
+        domain_id = subgroup_key[0]
+        self._counts_by_domain[domain_id] = self._counts_by_domain.get(domain_id, 0) + 1
+        self._n_people += 1
 
     def add_person(self, person, external_subgroup):
         """Add or update a person to the outward facing group"""
@@ -149,20 +207,13 @@ class MovablePeople:
         # Rest of implementation only matters in MPI mode
         if not mpi_available and domain_id != 0:
             return  # In non-MPI mode, we only care about domain 0
-            
-        group_spec = external_subgroup.spec
-        group_id = external_subgroup.group_id
-        subgroup_type = external_subgroup.subgroup_type
-
-        # Initialize domain structures if needed
-        if domain_id not in self.skinny_out:
-            self.skinny_out[domain_id] = {}
-        if group_spec not in self.skinny_out[domain_id]:
-            self.skinny_out[domain_id][group_spec] = {}
-        if group_id not in self.skinny_out[domain_id][group_spec]:
-            self.skinny_out[domain_id][group_spec][group_id] = {}
-        if subgroup_type not in self.skinny_out[domain_id][group_spec][group_id]:
-            self.skinny_out[domain_id][group_spec][group_id][subgroup_type] = {}
+
+        subgroup_key = (
+            domain_id,
+            external_subgroup.spec,
+            external_subgroup.group_id,
+            external_subgroup.subgroup_type,
+        )
 
         # Create the view array with person data
         if person.infected:
@@ -189,7 +240,14 @@ class MovablePeople:
                 True,
             ]
 
-        self.skinny_out[domain_id][group_spec][group_id][subgroup_type][person.id] = view
+        # placements that repeat every step can be sent through CrossDomainRoutes.
+        # Commute subgroups are drawn every step (e.g. a random carriage), so they
+        # are not
+        subgroups = person.subgroups
+        routable = (
+            subgroups is not None and external_subgroup is subgroups.primary_activity
+        )
+        self._add_row(subgroup_key, person.id, view, routable=routable)
 
     def delete_person(self, person, external_subgroup):
         """Remove a person from the external subgroup"""
@@ -197,111 +255,665 @@ class MovablePeople:
         
         if not mpi_available and domain_id != 0:
             return 0  # In non-MPI mode, success by default
-            
-        group_spec = external_subgroup.spec
-        group_id = external_subgroup.group_id
-        subgroup_type = external_subgroup.subgroup_type
-        
-        try:
-            # Remove from skinny_out
-            del self.skinny_out[domain_id][group_spec][group_id][subgroup_type][person.id]
-            return 0
-        except KeyError:
+
+        key_id = self._subgroup_key_ids.get(
+            (
+                domain_id,
+                external_subgroup.spec,
+                external_subgroup.group_id,
+                external_subgroup.subgroup_type,
+            )
+        )
+        row = self.index.pop((key_id, person.id), None)
+        if row is None:
             return 1
+        self._row_alive[row] = False
+        self._row_views[row] = None
+        self._counts_by_domain[domain_id] -= 1
+        self._n_people -= 1
+        return 0
 
-    def serialise(self, rank):
-        """Serialize person data for MPI communication"""
-        # In single-process mode, this is simplified
-        if not mpi_available:
-            return None, None, 0
-            
-        keys, data = [], []
-        if rank not in self.skinny_out:
-            return None, None, 0
-
-        # Serialize person data
-        for group_spec in self.skinny_out[rank]:
-            for group_id in self.skinny_out[rank][group_spec]:
-                for subgroup_type in self.skinny_out[rank][group_spec][group_id]:
-                    keys.append((
-                        group_spec,
-                        group_id,
-                        subgroup_type,
-                        len(self.skinny_out[rank][group_spec][group_id][subgroup_type])
-                    ))
-                    data += [
-                        view
-                        for pid, view in self.skinny_out[rank][group_spec][group_id][
-                            subgroup_type
-                        ].items()
-                    ]
-
-        outbound = np.array(data, dtype=object)
-        
-        return keys, outbound, outbound.shape[0]
+    def merge(self, other: "MovablePeople"):
+        """
+        Adds the people of another MovablePeople to this one. People already
+        going to the same subgroup get the data of ``other``.
+        """
+        for row, (key_id, view) in enumerate(zip(other._row_keys, other._row_views)):
+            if other._row_alive[row]:
+                self._add_row(
+                    other.subgroup_keys[key_id],
+                    view[0],
+                    view,
+                    routable=other._row_routable[row],
+                )
+
+    def rows_for_domain(self, rank) -> np.ndarray:
+        """
+        Rows of the people going to ``rank``, sorted by destination subgroup.
+        """
+        key_ids = np.array(self._row_keys, dtype=np.int64)
+        if not len(key_ids):
+            return np.zeros(0, dtype=np.int64)
+        alive = np.array(self._row_alive, dtype=bool)
+        key_domains = np.array(
+            [subgroup_key[0] for subgroup_key in self.subgroup_keys], dtype=np.int64
+        )
+        rows = np.flatnonzero(alive & (key_domains[key_ids] == rank))
+        return rows[np.argsort(key_ids[rows], kind="stable")]
+
+    def destination_groups(self, rows) -> np.ndarray:
+        """
+        Distinct groups the given rows go to, as an array of ``foreign_group_dtype``.
+        """
+        group_keys = {
+            self.subgroup_keys[self._row_keys[row]][1:3] for row in rows
+        }
+        return np.array(sorted(group_keys), dtype=foreign_group_dtype)
+
+    def pack_rows(self, rows):
+        """
+        Packs the given rows into a record array of ``movable_person_dtype``, plus
+        the packed infection ids and susceptibilities of their immunities, which
+        every record indexes with its immunity offset and count.
+
+        Returns
+        -------
+        records, immunity_ids, immunity_suscs
+        """
+        records = np.zeros(len(rows), dtype=movable_person_dtype)
+        if not len(rows):
+            return (
+                records,
+                np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.float64),
+            )
+        subgroup_keys = [self.subgroup_keys[self._row_keys[row]] for row in rows]
+        views = [self._row_views[row] for row in rows]
+        _, group_specs, group_ids, subgroup_types = zip(*subgroup_keys)
+        ids, probs, inf_ids, suscs, immunity_ids, immunity_suscs, doms, actives = zip(
+            *views
+        )
+        immunity_counts = np.fromiter(
+            (len(inf_ids) for inf_ids in immunity_ids), dtype=np.int64, count=len(views)
+        )
+        records["group_spec"] = group_specs
+        records["group_id"] = group_ids
+        records["subgroup_type"] = subgroup_types
+        records["id"] = ids
+        records["inf_prob"] = probs
+        records["inf_id"] = inf_ids
+        records["susc"] = suscs
+        records["active"] = actives
+        records["dom"] = doms
+        records["immunity_count"] = immunity_counts
+        records["immunity_offset"][1:] = np.cumsum(immunity_counts)[:-1]
+        return (
+            records,
+            np.concatenate(immunity_ids).astype(np.int64, copy=False),
+            np.concatenate(immunity_suscs).astype(np.float64, copy=False),
+        )
+
+    def pack(self, rank):
+        """
+        Packs all the people going to ``rank``, see ``pack_rows``.
+        """
+        return self.pack_rows(self.rows_for_domain(rank))
+
+    @staticmethod
+    def to_bytes(records, immunity_ids, immunity_suscs) -> np.ndarray:
+        """
+        Writes packed people into a single byte buffer. The record size is a
+        multiple of 8 bytes, so every part of the buffer stays 8-byte aligned.
+        """
+        return np.concatenate(
+            [
+                records.view(np.uint8),
+                immunity_ids.view(np.uint8),
+                immunity_suscs.view(np.uint8),
+            ]
+        )
+
+    @staticmethod
+    def n_bytes(n_records, n_immunity):
+        return n_records * movable_person_dtype.itemsize + n_immunity * 16
+
+    @staticmethod
+    def from_bytes(buffer: np.ndarray, n_records: int, n_immunity: int):
+        """
+        Inverse of ``to_bytes``, returns views of the buffer.
+        """
+        records_end = n_records * movable_person_dtype.itemsize
+        ids_end = records_end + 8 * n_immunity
+        return (
+            buffer[:records_end].view(movable_person_dtype),
+            buffer[records_end:ids_end].view(np.int64),
+            buffer[ids_end : ids_end + 8 * n_immunity].view(np.float64),
+        )
+
+    @staticmethod
+    def unpack_record(record: tuple, immunity_ids, immunity_suscs):
+        """
+        Converts a record (as a tuple) into the destination subgroup and the
+        person data stored in skinny_in.
+
+        Returns
+        -------
+        group_spec, group_id, subgroup_type, person_id, person data
+        """
+        (
+            group_spec,
+            group_id,
+            subgroup_type,
+            person_id,
+            inf_prob,
+            inf_id,
+            susc,
+            active,
+            home_rank,
+            immunity_offset,
+            immunity_count,
+        ) = record
+        immunity_end = immunity_offset + immunity_count
+        return (
+            group_spec.decode(),
+            group_id,
+            subgroup_type,
+            person_id,
+            {
+                "inf_prob": inf_prob,
+                "inf_id": inf_id,
+                "susc": susc,
+                "immunity_inf_ids": immunity_ids[immunity_offset:immunity_end],
+                "immunity_suscs": immunity_suscs[immunity_offset:immunity_end],
+                "dom": home_rank,
+                "active": active,
+            },
+        )
+
+    def receive_person(self, group_spec, group_id, subgroup_type, person_id, data):
+        """
+        Registers a person from another domain in skinny_in, and creates a skinny
+        person for them in this domain.
+        """
+        from june.demography import Person
+        from june.groups import Placements
+
+        # Register person in Person._persons dictionary
+        if person_id not in Person._persons:
+            # Create minimal person instance
+            person = Person(
+                id=person_id,
+            )
+            person._home_rank = data["dom"]
+            person._current_rank = mpi_rank
+            # This will automatically register in Person._persons
+        else:
+            person = Person._persons[person_id]
+            # Update person's rank since they've moved
+            person._current_rank = mpi_rank
+        Placements.add_imported_id(person_id)
+        self.home_domains[person_id] = int(data["dom"])
+        self.skinny_in.setdefault(group_spec, {}).setdefault(group_id, {}).setdefault(
+            subgroup_type, {}
+        )[person_id] = data
 
-    def update(self, rank, keys, rank_data):
-        """Update with person registration in the destination rank"""
+    def update(self, rank, records, immunity_ids, immunity_suscs):
+        """
+        Registers the people received from ``rank`` in skinny_in, and creates
+        skinny persons for them in this domain.
+        """
         # In single-process mode, this is simplified
         if not mpi_available:
             return
-            
-        index = 0
-
-        for key in keys:
-            group_spec, group_id, subgroup_type, n_data = key
-            if group_spec not in self.skinny_in:
-                self.skinny_in[group_spec] = {}
-            if group_id not in self.skinny_in[group_spec]:
-                self.skinny_in[group_spec][group_id] = {}
-            if subgroup_type not in self.skinny_in[group_spec][group_id]:
-                self.skinny_in[group_spec][group_id][subgroup_type] = {}
-            
-            data = rank_data[index : index + n_data]
-            index += n_data
-
-            try:
-                # Update skinny_in with person data
-                for k, i, t, s, iids, iis, d, a in data:
-                    person_id = int(k)
-                    # Register person in Person._persons dictionary
-                    from june.demography import Person
-                    if person_id not in Person._persons:
-                        # Create minimal person instance
-                        person = Person(
-                            id=person_id,
-                        )
-                        person._home_rank = d
-                        person._current_rank = mpi_rank
-                        # This will automatically register in Person._persons
-                    else:
-                        person = Person._persons[person_id]
-                        # Update person's rank since they've moved
-                        person._current_rank = mpi_rank
-                    
-                    self.skinny_in[group_spec][group_id][subgroup_type][person_id] = {
-                        "inf_prob": i,
-                        "inf_id": t,
-                        "susc": s,
-                        "immunity_inf_ids": iids,
-                        "immunity_suscs": iis,
-                        "dom": d,
-                        "active": a,
-                    }
-            except Exception:
-                print("failing", rank, "f-done")
-                raise
+        try:
+            for record in records.tolist():
+                self.receive_person(
+                    *self.unpack_record(record, immunity_ids, immunity_suscs)
+                )
+        except Exception:
+            print("failing", rank, "f-done")
+            raise
+
+
+def _same_person_data(view, other_view) -> bool:
+    """
+    Whether two views of a person carry the same data for the receiving domain.
+    """
+    return (
+        view[1] == other_view[1]
+        and view[2] == other_view[2]
+        and view[3] == other_view[3]
+        and view[7] == other_view[7]
+        and np.array_equal(view[4], other_view[4])
+        and np.array_equal(view[5], other_view[5])
+    )
+
+
+class CrossDomainRoutes:
+    """
+    Persistent routing tables for the people that go to the same subgroup of
+    another domain step after step, i.e. to their primary activity subgroup. For
+    every pair of domains, the sender and the receiver keep the same table of
+    routes (destination subgroup, person id), to which routes are added the first
+    time they are used. In later steps a route is sent as a single presence bit,
+    and the data of the person is only sent again when it changed (e.g. they got
+    infected or their transmission probability changed).
+
+    Routes that are not used in ``max_idle_exchanges`` exchanges between the two
+    domains (e.g. the person changed job or is in hospital) are dropped, and their
+    slots are reused by new routes. Both sides count the exchanges and see the
+    same presence bits, so they drop the same routes without telling each other.
+
+    The buffer sent to every domain contains, in order: the records of the people
+    without a route, the records of new or changed routes, the packed immunity
+    arrays of all the records, the route index of every routed record and the
+    presence bits of the routes, padded to 8 bytes.
+
+    Parameters
+    ----------
+    max_idle_exchanges
+        number of exchanges with a domain after which an unused route is dropped
+    """
+
+    def __init__(self, max_idle_exchanges: int = 48):
+        self.max_idle_exchanges = max_idle_exchanges
+        # sender side, per destination domain
+        self._out_route_ids = defaultdict(dict)  # route key -> route
+        self._out_keys = defaultdict(list)  # route -> route key, None if free
+        self._out_views = defaultdict(list)
+        self._out_last_used = defaultdict(list)  # exchange of last use, -1 if free
+        self._out_free = defaultdict(list)  # heap of free routes
+        self._out_n_exchanges = defaultdict(int)
+        # receiver side, per source domain
+        self._in_routes = defaultdict(list)
+        self._in_last_used = defaultdict(list)
+        self._in_n_exchanges = defaultdict(int)
+
+    def _idle_routes(self, last_used: list, n_exchanges: int) -> list:
+        last_used = np.array(last_used, dtype=np.int64)
+        return np.flatnonzero(
+            (last_used >= 0) & (n_exchanges - last_used >= self.max_idle_exchanges)
+        ).tolist()
+
+    def _drop_idle_out_routes(self, rank: int):
+        route_ids = self._out_route_ids[rank]
+        route_keys = self._out_keys[rank]
+        route_views = self._out_views[rank]
+        last_used = self._out_last_used[rank]
+        free = self._out_free[rank]
+        for route in self._idle_routes(last_used, self._out_n_exchanges[rank]):
+            del route_ids[route_keys[route]]
+            route_keys[route] = None
+            route_views[route] = None
+            last_used[route] = -1
+            heapq.heappush(free, route)
+        if route_keys and route_keys[-1] is None:
+            while route_keys and route_keys[-1] is None:
+                route_keys.pop()
+                route_views.pop()
+                last_used.pop()
+            free[:] = [route for route in free if route < len(route_keys)]
+            heapq.heapify(free)
+
+    def _drop_idle_in_routes(self, rank: int):
+        routes = self._in_routes[rank]
+        last_used = self._in_last_used[rank]
+        for route in self._idle_routes(last_used, self._in_n_exchanges[rank]):
+            routes[route] = None
+            last_used[route] = -1
+        while routes and routes[-1] is None:
+            routes.pop()
+            last_used.pop()
+
+    def pack(self, movable_people: MovablePeople, rank: int, rows=None):
+        """
+        Packs the people going to ``rank``, or only the given rows of
+        ``movable_people`` if passed.
+
+        Returns
+        -------
+        the byte buffer, and the sizes (number of records, number of immunity
+        entries, number of routed records, number of presence bytes)
+        """
+        route_ids = self._out_route_ids[rank]
+        route_keys = self._out_keys[rank]
+        route_views = self._out_views[rank]
+        last_used = self._out_last_used[rank]
+        free = self._out_free[rank]
+        self._out_n_exchanges[rank] += 1
+        n_exchanges = self._out_n_exchanges[rank]
+        unrouted_rows, routed_rows, route_indices, present = [], [], [], []
+        if rows is None:
+            rows = movable_people.rows_for_domain(rank)
+        for row in rows:
+            if not movable_people._row_routable[row]:
+                unrouted_rows.append(row)
+                continue
+            view = movable_people._row_views[row]
+            # subgroup key ids are local to movable_people, so use the keys
+            subgroup_key = movable_people.subgroup_keys[movable_people._row_keys[row]]
+            route_key = (subgroup_key, view[0])
+            route = route_ids.get(route_key)
+            if route is None:
+                if free:
+                    route = heapq.heappop(free)
+                    route_keys[route] = route_key
+                    route_views[route] = view
+                else:
+                    route = len(route_views)
+                    route_keys.append(route_key)
+                    route_views.append(view)
+                    last_used.append(-1)
+                route_ids[route_key] = route
+                routed_rows.append(row)
+                route_indices.append(route)
+            elif not _same_person_data(route_views[route], view):
+                route_views[route] = view
+                routed_rows.append(row)
+                route_indices.append(route)
+            present.append(route)
+            last_used[route] = n_exchanges
+        presence = np.zeros(len(route_views), dtype=bool)
+        presence[present] = True
+        self._drop_idle_out_routes(rank)
+        presence_bytes = np.packbits(presence)
+        presence_bytes = np.concatenate(
+            [presence_bytes, np.zeros(-len(presence_bytes) % 8, dtype=np.uint8)]
+        )
+        records, immunity_ids, immunity_suscs = movable_people.pack_rows(
+            unrouted_rows + routed_rows
+        )
+        buffer = np.concatenate(
+            [
+                MovablePeople.to_bytes(records, immunity_ids, immunity_suscs),
+                np.array(route_indices, dtype=np.int64).view(np.uint8),
+                presence_bytes,
+            ]
+        )
+        sizes = (len(records), len(immunity_ids), len(routed_rows), len(presence_bytes))
+        return buffer, sizes
+
+    @staticmethod
+    def n_bytes(sizes: np.ndarray) -> np.ndarray:
+        """
+        Number of bytes of the buffers with the given (n, 4) array of sizes.
+        """
+        return (
+            MovablePeople.n_bytes(sizes[:, 0], sizes[:, 1])
+            + 8 * sizes[:, 2]
+            + sizes[:, 3]
+        )
+
+    def unpack(self, movable_people: MovablePeople, rank: int, buffer, sizes) -> int:
+        """
+        Reads the buffer received from ``rank`` into the skinny_in of
+        ``movable_people``, updating the routes from that domain.
+
+        Returns
+        -------
+        the number of people received
+        """
+        n_records, n_immunity, n_routed, n_presence_bytes = (int(n) for n in sizes)
+        people_end = MovablePeople.n_bytes(n_records, n_immunity)
+        records, immunity_ids, immunity_suscs = MovablePeople.from_bytes(
+            buffer[:people_end], n_records, n_immunity
+        )
+        route_indices = buffer[people_end : people_end + 8 * n_routed].view(np.int64)
+        presence_bytes = buffer[people_end + 8 * n_routed :][:n_presence_bytes]
+        n_unrouted = n_records - n_routed
+        movable_people.update(
+            rank, records[:n_unrouted], immunity_ids, immunity_suscs
+        )
+        routes = self._in_routes[rank]
+        last_used = self._in_last_used[rank]
+        self._in_n_exchanges[rank] += 1
+        n_exchanges = self._in_n_exchanges[rank]
+        for record, route in zip(
+            records[n_unrouted:].tolist(), route_indices.tolist()
+        ):
+            (
+                group_spec,
+                group_id,
+                subgroup_type,
+                person_id,
+                data,
+            ) = MovablePeople.unpack_record(record, immunity_ids, immunity_suscs)
+            # the routes outlive the receive buffer, so keep copies of the arrays
+            data["immunity_inf_ids"] = data["immunity_inf_ids"].copy()
+            data["immunity_suscs"] = data["immunity_suscs"].copy()
+            entry = (group_spec, group_id, subgroup_type, person_id, data)
+            if route == len(routes):
+                routes.append(entry)
+                last_used.append(-1)
+            else:
+                routes[route] = entry
+        presence = np.unpackbits(presence_bytes, count=len(routes)).astype(bool)
+        present_routes = np.flatnonzero(presence).tolist()
+        for route in present_routes:
+            group_spec, group_id, subgroup_type, person_id, data = routes[route]
+            movable_people.receive_person(
+                group_spec, group_id, subgroup_type, person_id, dict(data)
+            )
+            last_used[route] = n_exchanges
+        self._drop_idle_in_routes(rank)
+        return n_unrouted + len(present_routes)
+
+
+class DomainGraph:
+    """
+    Graph of the domains that exchange people or messages with each other, and the
+    MPI distributed graph communicator built from it, so that the exchanges of a
+    time step only involve neighbouring domains instead of every pair of ranks.
+
+    The graph is symmetric and is built once, before the simulation starts, from
+    the adjacency of the domains given by the DomainSplitter plus the domains the
+    local world links to (see ``set_neighbours``). Exchanges never change it, so
+    they never synchronise all the ranks: sending to a domain that is not a
+    neighbour is an error.
+    """
+
+    neighbours = []
+    _neighbour_set = set()
+    comm = None
+    # non-blocking requests started on ``comm``, which must complete before it is
+    # freed
+    _requests = []
+
+    @classmethod
+    def _free(cls):
+        if cls.comm is None:
+            return
+        if cls._requests:
+            MPI.Request.Waitall(cls._requests)
+        cls._requests = []
+        cls.comm.Free()
+        cls.comm = None
+
+    @classmethod
+    def _build(cls, neighbours):
+        cls._free()
+        cls.neighbours = sorted(neighbours)
+        cls._neighbour_set = set(cls.neighbours)
+        cls.comm = mpi_comm.Create_dist_graph_adjacent(
+            cls.neighbours, cls.neighbours, reorder=False
+        )
+
+    @classmethod
+    def set_neighbours(cls, neighbours, links=()):
+        """
+        Builds the graph from the given neighbours of this domain, adding the
+        domains that have this one as a neighbour. Must be called by all the ranks.
+
+        Parameters
+        ----------
+        neighbours
+            domains this domain exchanges with
+        links
+            pairs of other domains that exchange with each other because of this
+            domain, e.g. the domain of a leisure venue of a local area, which
+            invites the friends of local people living in a third domain
+        """
+        if mpi_size == 1:
+            return
+        neighbours = {
+            int(rank) for rank in neighbours if rank != mpi_rank and 0 <= rank < mpi_size
+        }
+        links = {
+            (int(rank), int(other_rank))
+            for rank, other_rank in links
+            if rank != other_rank and 0 <= rank < mpi_size and 0 <= other_rank < mpi_size
+        }
+        all_edges = mpi_comm.allgather((sorted(neighbours), sorted(links)))
+        for rank, (rank_neighbours, rank_links) in enumerate(all_edges):
+            if mpi_rank in rank_neighbours:
+                neighbours.add(rank)
+            for link in rank_links:
+                if mpi_rank in link:
+                    neighbours.add(link[0] if link[1] == mpi_rank else link[1])
+        cls._build(neighbours)
+
+    @classmethod
+    def check_destinations(cls, destinations):
+        """
+        Makes sure the given ranks are neighbours of this domain before an exchange.
+        """
+        if mpi_size == 1:
+            return
+        if cls.comm is None:
+            raise SimulatorError(
+                "The DomainGraph must be set up with set_neighbours before exchanging"
+            )
+        missing = {int(rank) for rank in destinations if rank != mpi_rank}
+        missing -= cls._neighbour_set
+        if missing:
+            raise SimulatorError(
+                f"Rank {mpi_rank} sends to domains {sorted(missing)}, "
+                f"which are not its neighbours in the DomainGraph"
+            )
+
+    @classmethod
+    def alltoall(cls, send: dict) -> dict:
+        """
+        Sends a (pickled) object to some of the ranks.
+
+        Parameters
+        ----------
+        send
+            dictionary rank -> object to send to it
+
+        Returns
+        -------
+        dictionary neighbour rank -> object received from it, None if it sent nothing
+        """
+        if mpi_size == 1:
+            return {}
+        cls.check_destinations(send.keys())
+        received = cls.comm.neighbor_alltoall(
+            [send.get(rank) for rank in cls.neighbours]
+        )
+        return dict(zip(cls.neighbours, received))
+
+    @classmethod
+    def alltoall_sizes(cls, send_sizes: dict, n_sizes: int) -> np.ndarray:
+        """
+        Exchanges a row of ``n_sizes`` integers with every neighbour, e.g. the sizes of
+        the buffers that follow.
+
+        Parameters
+        ----------
+        send_sizes
+            dictionary rank -> sizes sent to it, zeros are sent to the other neighbours
+
+        Returns
+        -------
+        array with the sizes received from every neighbour, in the order of
+        ``neighbours``
+        """
+        if mpi_size == 1:
+            # single rank, there are no neighbours
+            return np.zeros((0, n_sizes), dtype=np.int64)
+        cls.check_destinations(send_sizes.keys())
+        send = np.zeros((len(cls.neighbours), n_sizes), dtype=np.int64)
+        for i, rank in enumerate(cls.neighbours):
+            if rank in send_sizes:
+                send[i] = send_sizes[rank]
+        recv = np.zeros_like(send)
+        cls.comm.Neighbor_alltoall(send, recv)
+        return recv
+
+    @classmethod
+    def ialltoallv(
+        cls, send_buffers: dict, recv_counts: np.ndarray, dtype, datatype=None
+    ):
+        """
+        Starts sending the given buffers to the neighbours, without waiting. The
+        destinations must be neighbours, which ``alltoall_sizes`` checks when the
+        sizes are exchanged.
+
+        Parameters
+        ----------
+        send_buffers
+            dictionary rank -> contiguous array of ``dtype`` to send to it
+        recv_counts
+            number of elements received from every neighbour
+        dtype
+            numpy dtype of the elements sent and received
+        datatype
+            MPI datatype matching ``dtype``, derived from it by default
+
+        Returns
+        -------
+        the request, the send buffer (which must be kept until the request
+        completes), the receive buffer and the offset of every neighbour in it.
+        """
+        dtype = np.dtype(dtype)
+        if mpi_size == 1:
+            # single rank, there are no neighbours and nothing to wait for
+            return (
+                None,
+                np.zeros(0, dtype=dtype),
+                np.zeros(0, dtype=dtype),
+                np.zeros(0, dtype=np.int64),
+            )
+        if datatype is None:
+            datatype = MPI._typedict[dtype.char]
+        send = [
+            np.asarray(send_buffers.get(rank, ()), dtype=dtype)
+            for rank in cls.neighbours
+        ]
+        send_counts = np.array([len(buffer) for buffer in send], dtype=np.int64)
+        send_buffer = np.concatenate([np.zeros(0, dtype=dtype)] + send)
+        recv_counts = np.asarray(recv_counts, dtype=np.int64)
+        recv_displs = _displacements(recv_counts)
+        recv_buffer = np.empty(recv_counts.sum(), dtype=dtype)
+        request = cls.comm.Ineighbor_alltoallv(
+            [send_buffer, (send_counts, _displacements(send_counts)), datatype],
+            [recv_buffer, (recv_counts, recv_displs), datatype],
+        )
+        # requests that completed since the last exchange are null by now
+        cls._requests = [
+            pending for pending in cls._requests if pending != MPI.REQUEST_NULL
+        ]
+        cls._requests.append(request)
+        return request, send_buffer, recv_buffer, recv_displs
+
+
+def _displacements(counts: np.ndarray) -> np.ndarray:
+    displacements = np.zeros(len(counts), dtype=np.int64)
+    displacements[1:] = np.cumsum(counts)[:-1]
+    return displacements
 
 
 def move_info(info2move):
     """
     Move information between processes in MPI mode, or simply return the 
-    information as-is in non-MPI mode.
+    information as-is in non-MPI mode. Only the non-empty arrays are sent, through
+    the neighbour communicator of the DomainGraph.
     
     Parameters
     ----------
     info2move : list
-        Information to move between processes
+        Information to move between processes, one uint32 array per rank
         
     Returns
     -------
@@ -312,24 +924,27 @@ def move_info(info2move):
         # In non-MPI mode, just flatten the list and return it
         buffer = np.concatenate(info2move)
         return buffer, len(buffer), len(buffer)
-        
-    # In MPI mode, do the actual movement
-    assert len(info2move) == mpi_size
-    buffer = np.concatenate(info2move)
-    assert buffer.dtype == np.uint32
 
-    n_sending = len(buffer)
-    count = np.array([len(x) for x in info2move])
-    displ = np.array([sum(count[:p]) for p in range(len(info2move))])
-
-    values = mpi_comm.alltoall(count)
-    n_receiving = sum(values)
-    r_buffer = np.zeros(n_receiving, dtype=np.uint32)
-    rdisp = np.array([sum(values[:p]) for p in range(len(values))])
+    assert len(info2move) == mpi_size
+    if mpi_size == 1:
+        # a single rank only keeps what it sends to itself
+        return np.asarray(info2move[mpi_rank], dtype=np.uint32), 0, 0
 
-    mpi_comm.Alltoallv(
-        [buffer, count, displ, MPI.UINT32_T],
-        [r_buffer, values, rdisp, MPI.UINT32_T]
+    # In MPI mode, do the actual movement
+    info2move = [np.asarray(info, dtype=np.uint32) for info in info2move]
+    send = {
+        rank: info
+        for rank, info in enumerate(info2move)
+        if rank != mpi_rank and len(info)
+    }
+    count = {rank: len(info) for rank, info in send.items()}
+    values = DomainGraph.alltoall_sizes(count, 1)[:, 0]
+    request, _, r_buffer, _ = DomainGraph.ialltoallv(
+        send, values, dtype=np.uint32, datatype=MPI.UINT32_T
     )
-
+    request.Wait()
+    n_sending = sum(count.values())
+    n_receiving = len(r_buffer)
+    # what this rank sends to itself does not go through MPI
+    r_buffer = np.concatenate([info2move[mpi_rank], r_buffer])
     return r_buffer, n_sending, n_receiving
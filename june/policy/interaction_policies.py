@@ -30,8 +30,8 @@ class InteractionPolicies(PolicyCollection):
             for group in beta_reductions_dict:
                 beta_reductions[group] *= beta_reductions_dict[group]
 
-        # Assign final reductions to the interaction
-        interaction.beta_reductions = beta_reductions
+        # Assign final reductions to the interaction (invalidates its cache if they changed)
+        interaction.set_beta_reductions(beta_reductions)
         print(f"Final beta reductions assigned to interaction: {dict(interaction.beta_reductions)}")
 
 
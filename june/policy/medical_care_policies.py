@@ -6,6 +6,7 @@ import random
 import inspect
 import functools
 from june.epidemiology.test_and_trace import TestAndTrace
+from june.epidemiology.active_infections import TestAndTraceActive
 
 from june.epidemiology.infection.disease_config import DiseaseConfig
 from june.global_context import GlobalContext
@@ -586,6 +587,7 @@ class Testing(MedicalCarePolicy):
 
         if person.hospitalised and person.test_and_trace is None: #First time coming here, entered via hospitalisation
             person.test_and_trace = TestAndTrace()
+            TestAndTraceActive.add(person)
         elif person.hospitalised and person.test_and_trace.test_result is not None: #They are hospitalised but are tested already
             return False
 
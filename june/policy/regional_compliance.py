@@ -21,13 +21,26 @@ class RegionalCompliance(Policy):
 class RegionalCompliances(PolicyCollection):
     policy_type = "regional_compliance"
 
-    def apply(self, date: datetime, regions: Regions):
+    def apply(self, date: datetime, regions: Regions, interaction=None):
+        """
+        Applies the active regional compliances. If an interaction is given and any
+        regional compliance changed, its processed betas cache is invalidated.
+        """
+        if not self.policies:
+            return False
+        previous_compliances = [region.regional_compliance for region in regions]
         # before applying compliances, reset all of them to 1.0
-        if self.policies:
-            for region in regions:
-                region.regional_compliance = 1.0
+        for region in regions:
+            region.regional_compliance = 1.0
         for policy in self.policies:
             policy.apply(date=date, regions=regions)
+        changed = any(
+            region.regional_compliance != previous
+            for region, previous in zip(regions, previous_compliances)
+        )
+        if changed and interaction is not None:
+            interaction.invalidate_processed_cache()
+        return changed
 
 
 class TieredLockdown(Policy):
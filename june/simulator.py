@@ -2,6 +2,7 @@ import logging
 import datetime
 import yaml
 import numpy as np
+from collections import defaultdict
 from typing import Optional, List
 from pathlib import Path
 from time import perf_counter
@@ -14,8 +15,10 @@ from june.global_context import GlobalContext
 from june.groups.leisure import Leisure
 from june.groups.travel import Travel
 from june.groups.contact import ContactManager
+from june.groups import InfectiousVenues, Placements
+from june.utils import RandomStreams
 from june.epidemiology.epidemiology import Epidemiology
-from june.interaction import Interaction
+from june.interaction import Interaction, InteractionPool
 from june.records.event_recording import TTEventRecorder, print_tt_simulation_report
 from june.tracker import Tracker
 from june.policy import Policies
@@ -23,7 +26,7 @@ from june.event import Events
 from june.time import Timer
 from june.records import Record
 from june.world import World
-from june.mpi_wrapper import mpi_rank, mpi_comm, mpi_size, mpi_available
+from june.mpi_wrapper import mpi_rank, mpi_comm, mpi_size, mpi_available, DomainGraph
 
 # Import ZoonoticTransmission for handling rat-human disease transmission
 try:
@@ -104,20 +107,54 @@ class Simulator:
         self.test_and_trace_enabled = feature_flags.get("test_and_trace_enabled", False)
         self.ratty_dynamics_enabled = feature_flags.get("ratty_dynamics_enabled", False)
         self.rat_animations_enabled = feature_flags.get("rat_animations_enabled", False)
+        self.batched_interaction_enabled = feature_flags.get("batched_interaction_enabled", False)
+        self.interaction_pool = None
+        if self.batched_interaction_enabled and feature_flags.get(
+            "parallel_interaction_enabled", False
+        ):
+            self.interaction_pool = InteractionPool(
+                n_workers=feature_flags.get("parallel_interaction_workers", 4),
+                min_susceptibles=feature_flags.get(
+                    "parallel_interaction_min_susceptibles", 1000
+                ),
+            )
         
         # Original initialization code
         self.activity_manager = activity_manager
+        self.activity_manager.use_activity_planner = feature_flags.get(
+            "activity_planner_enabled", False
+        )
+        # check the global conservation of people every this many time steps,
+        # 0 disables the check
+        self.conservation_check_every = feature_flags.get(
+            "conservation_check_every", 0
+        )
+        self._n_timesteps = 0
         self.world = world
         self.interaction = interaction
         self.events = events
         self.timer = timer
         self.epidemiology = epidemiology
+        # specs of the groups emptied when clearing the world, see clear_world
+        self._cleared_specs = None
         
         if self.epidemiology:
             self.epidemiology.set_medical_care(
                 world=world, activity_manager=activity_manager
             )
             self.epidemiology.set_immunity(self.world)
+            if (
+                feature_flags.get("completion_time_tables_enabled", False)
+                and self.epidemiology.infection_selectors
+            ):
+                for infection_selector in self.epidemiology.infection_selectors:
+                    infection_selector.trajectory_maker.use_quantile_tables(
+                        feature_flags.get("completion_time_table_size", 16384)
+                    )
+            if self.interaction is not None and self.epidemiology.infection_selectors:
+                self.interaction.set_infection_selectors(
+                    self.epidemiology.infection_selectors
+                )
             self.epidemiology.set_past_vaccinations(
                 people=self.world.people, date=self.timer.date, record=record
             )
@@ -226,11 +263,49 @@ class Simulator:
         ratty_dynamics_enabled = ratty_dynamics_config.get("enabled", False)
         rat_animations_enabled = ratty_dynamics_config.get("animations", False)
 
+        # Batched interaction settings
+        batched_interaction_config = features.get("batched_interaction", {"enabled": False})
+        batched_interaction_enabled = batched_interaction_config.get("enabled", False)
+
+        # Columnar activity planner settings
+        activity_planner_config = features.get("activity_planner", {"enabled": False})
+        activity_planner_enabled = activity_planner_config.get("enabled", False)
+
+        # Parallel interaction settings
+        parallel_interaction_config = features.get("parallel_interaction", {"enabled": False})
+        parallel_interaction_enabled = parallel_interaction_config.get("enabled", False)
+        parallel_interaction_workers = parallel_interaction_config.get("n_workers", 4)
+        parallel_interaction_min_susceptibles = parallel_interaction_config.get(
+            "min_susceptibles", 1000
+        )
+
+        # Quantile tables of the completion times of symptom trajectories
+        completion_time_tables_config = features.get(
+            "completion_time_tables", {"enabled": False}
+        )
+        completion_time_tables_enabled = completion_time_tables_config.get(
+            "enabled", False
+        )
+        completion_time_table_size = completion_time_tables_config.get(
+            "table_size", 16384
+        )
+
+        # People conservation check settings
+        conservation_check_config = features.get(
+            "conservation_check", {"every_n_steps": 0}
+        )
+        conservation_check_every = conservation_check_config.get("every_n_steps", 0)
         
         output_logger.info(f"Feature flags from config: Friend hangouts: {friend_hangouts_enabled}, "
                         f"Test and Trace: {test_and_trace_enabled}, "
                         f"Ratty Dynamics: {ratty_dynamics_enabled}, "
-                        f"Rat Animations: {rat_animations_enabled}, ")
+                        f"Rat Animations: {rat_animations_enabled}, "
+                        f"Batched Interaction: {batched_interaction_enabled}, "
+                        f"Activity Planner: {activity_planner_enabled}, "
+                        f"Parallel Interaction: {parallel_interaction_enabled} "
+                        f"({parallel_interaction_workers} workers), "
+                        f"Completion time tables: {completion_time_tables_enabled}, "
+                        f"Conservation check every {conservation_check_every} steps")
         
         # Continue with original method
         checkpoint_save_dates = _read_checkpoint_dates_from_file(config_filename)
@@ -250,7 +325,15 @@ class Simulator:
             "friend_hangouts_enabled": friend_hangouts_enabled,
             "test_and_trace_enabled": test_and_trace_enabled,
             "ratty_dynamics_enabled": ratty_dynamics_enabled,
-            "rat_animations_enabled": rat_animations_enabled
+            "rat_animations_enabled": rat_animations_enabled,
+            "batched_interaction_enabled": batched_interaction_enabled,
+            "activity_planner_enabled": activity_planner_enabled,
+            "parallel_interaction_enabled": parallel_interaction_enabled,
+            "parallel_interaction_workers": parallel_interaction_workers,
+            "parallel_interaction_min_susceptibles": parallel_interaction_min_susceptibles,
+            "completion_time_tables_enabled": completion_time_tables_enabled,
+            "completion_time_table_size": completion_time_table_size,
+            "conservation_check_every": conservation_check_every,
         }
 
         simulator = cls(
@@ -306,7 +389,41 @@ class Simulator:
         """
         Removes everyone from all possible groups, sets everyone's busy attribute
         to False, and cleans up skinny persons that have moved back home.
+        The first call walks the whole world. Afterwards only the subgroups, people
+        and skinny persons recorded in ``Placements`` during the time step are
+        visited, so clearing costs O(people moved) instead of O(world).
+        """
+        if self._cleared_specs is None or not Placements.tracking:
+            self._clear_whole_world()
+            return
+        from june.demography import Person
+
+        for subgroup in Placements.subgroups():
+            for person in subgroup.people:
+                person.busy = False
+                person.subgroups.leisure = None
+            if subgroup.group.spec in self._cleared_specs:
+                subgroup.clear()
+        for person in Placements.people():
+            person.busy = False
+            person.subgroups.leisure = None
+
+        InfectiousVenues.clear()
+
+        # Clean up skinny persons registered for people from other domains.
+        # This only changes the local registry, so no synchronisation is needed.
+        for person_id in Placements.imported_ids():
+            person = Person._persons.get(person_id)
+            if person is not None and person._current_rank != mpi_rank:
+                del Person._persons[person_id]
+        Placements.clear()
+
+    def _clear_whole_world(self):
         """
+        Clears every group of every supergroup and every person of the world, and
+        starts recording the changes of the following time steps in ``Placements``.
+        """
+        self._cleared_specs = set()
         # Clear all groups first
         for super_group_name in self.activity_manager.all_super_groups:
             if "visits" in super_group_name:
@@ -316,10 +433,13 @@ class Simulator:
                 if grouptype is not None:
                     for group in grouptype.members:
                         group.clear()
+                        self._cleared_specs.add(group.spec)
             except AttributeError:
                 # If the attribute doesn't exist, just continue
                 continue
 
+        InfectiousVenues.clear()
+
         # Reset busy flags and leisure subgroups
         for person in self.world.people.members:            
             person.busy = False
@@ -338,10 +458,116 @@ class Simulator:
         for person_id in to_remove:
             if person_id in Person._persons:
                 del Person._persons[person_id]
+
+        Placements.clear()
+        Placements.tracking = True
+
+
+    def check_people_conservation(
+        self,
+        initial_people: int,
+        final_people: int,
+        n_people_from_abroad: int,
+        n_people_going_abroad: int,
+    ):
+        """
+        Checks that no people are created or lost across all the domains in the
+        time step, raising a SimulatorError otherwise. All the ranks must call it
+        in the same time step, since the counts are gathered from every rank.
+        """
+        # Gather detailed counts from all ranks
+        local_counts = (
+            initial_people,  # Initial people count
+            final_people,    # Final people count
+            n_people_from_abroad,
+            n_people_going_abroad
+        )
+        all_counts = mpi_comm.allgather(local_counts)
+
+        # Calculate global totals
+        total_initial = sum(c[0] for c in all_counts)
+        total_final = sum(c[1] for c in all_counts)
+        total_from_abroad = sum(c[2] for c in all_counts)
+        total_going_abroad = sum(c[3] for c in all_counts)
         
-        # Synchronize removal across ranks
-        mpi_comm.Barrier()
-        
+        # Verify global conservation of people
+        if total_initial != total_final:
+            movement_delta = total_final - total_initial
+            abroad_delta = total_from_abroad - total_going_abroad
+            raise SimulatorError(
+                f"Global people conservation error on rank {mpi_rank}:\n"
+                f"Total initial people: {total_initial}\n"
+                f"Total final people: {total_final}\n"
+                f"Net change in people: {movement_delta}\n"
+                f"Expected net change (from_abroad - going_abroad): {abroad_delta}\n"
+                f"Discrepancy: {movement_delta - abroad_delta}\n"
+                f"Movement details:\n"
+                f"- Total from abroad: {total_from_abroad}\n"
+                f"- Total going abroad: {total_going_abroad}\n"
+                f"Local counts on this rank:\n"
+                f"- Initial people: {initial_people}\n"
+                f"- Final people: {final_people}\n"
+                f"- From abroad: {n_people_from_abroad}\n"
+                f"- Going abroad: {n_people_going_abroad}\n"
+                f"- Net movement: {final_people - initial_people}"
+            )
+
+    def _interact_infectious_groups(
+        self, super_group_instances, select_group, people_from_abroad_dict: dict
+    ):
+        """
+        Runs the interaction over the infectious venues of the given supergroups
+        that pass ``select_group``.
+
+        Returns
+        -------
+        infected_ids, infection_ids
+            ids of the newly infected people and of the infections they got.
+        """
+        super_groups_and_groups = [
+            (
+                super_group,
+                [
+                    group
+                    for group in InfectiousVenues.groups_for_supergroup(super_group)
+                    if select_group(group)
+                ],
+            )
+            for super_group in super_group_instances
+        ]
+        if self.batched_interaction_enabled:
+            # Pack the groups of every supergroup and interact each supergroup in one
+            # pass, concurrently if a worker pool is configured
+            return self.interaction.time_step_for_supergroups(
+                super_groups_and_groups=super_groups_and_groups,
+                people_from_abroad_dict=people_from_abroad_dict,
+                delta_time=self.timer.duration,
+                record=self.record,
+                pool=self.interaction_pool,
+            )
+        infected_ids = []
+        infection_ids = []
+        for super_group, infectious_groups in super_groups_and_groups:
+            for group in infectious_groups:
+                if group.external:
+                    continue
+
+                # Get people from abroad for this group
+                people_from_abroad = people_from_abroad_dict.get(
+                    group.spec, {}
+                ).get(group.id, None)
+
+                # Only track new infections, ignore group size
+                new_infected, new_infections, _ = self.interaction.time_step_for_group(
+                    group=group,
+                    people_from_abroad=people_from_abroad,
+                    delta_time=self.timer.duration,
+                    record=self.record,
+                )
+
+                infected_ids.extend(new_infected)
+                infection_ids.extend(new_infections)
+        return infected_ids, infection_ids
 
     def do_timestep(self):
         """
@@ -357,12 +583,17 @@ class Simulator:
         tick_s, tickw_s = perf_counter(), wall_clock()
         tick, tickw = perf_counter(), wall_clock()
 
+        # key the counter-based random streams with the current time step
+        RandomStreams.set_time(self.timer.now)
+
         if self.activity_manager.policies is not None:
             self.activity_manager.policies.interaction_policies.apply(
                 date=self.timer.date, interaction=self.interaction
             )
             self.activity_manager.policies.regional_compliance.apply(
-                date=self.timer.date, regions=self.world.regions
+                date=self.timer.date,
+                regions=self.world.regions,
+                interaction=self.interaction,
             )
         activities = self.timer.activities
         # apply events
@@ -380,12 +611,11 @@ class Simulator:
 
         print("======DO_TIMESTEP ACTIVITY MANAGER=======")
 
-        (
-            people_from_abroad_dict,
-            n_people_from_abroad,
-            n_people_going_abroad,
-            to_send_abroad,  # useful for knowing who's MPI-ing, so can send extra info as needed.
-        ) = self.activity_manager.do_timestep(record=self.record)
+        # useful for knowing who's MPI-ing, so can send extra info as needed.
+        to_send_abroad = self.activity_manager.move_people(record=self.record)
+        # post the exchange of people with other domains, the groups that do not
+        # receive people from abroad are interacted while it is in flight
+        people_exchange = self.activity_manager.post_people_exchange(to_send_abroad)
         tick_interaction = perf_counter()
         print("=========DO_TIMESTEP ACTIVITY MANAGER FINISHED =========")
 
@@ -395,23 +625,9 @@ class Simulator:
         if self.interaction:
             self.interaction.current_time = self.timer.now
             
-        # get the supergroup instances that are active in this time step:
-        active_super_groups = self.activity_manager.active_super_groups
-        super_group_instances = []
-        for super_group_name in active_super_groups:
-            if "visits" not in super_group_name:
-                try:
-                    super_group_instance = getattr(self.world, super_group_name, None)
-                    if super_group_instance is not None and len(super_group_instance) > 0:
-                        super_group_instances.append(super_group_instance)
-                except (AttributeError, TypeError) as e:
-                    output_logger.warning(f"Could not access supergroup {super_group_name}: {e}")
-                    continue
-
-        # Log the final list of super group instances
-        print("\n=== Super Group Instances ===")
-        for idx, instance in enumerate(super_group_instances, start=1):
-            print(f"Instance {idx}: {repr(instance)}")
+        # get the supergroup instances that are active in this time step, these
+        # are resolved once per time slot by the activity manager
+        super_group_instances = self.activity_manager.active_super_group_instances
 
         # Initialize counters for people tracking
         initial_people = len(self.world.people)  # People before movement
@@ -432,33 +648,39 @@ class Simulator:
         
         print(f"[Rank {mpi_rank}] Simulator: Starting timestep for {self.timer.date}")
         
-        # Process groups for infections only
-        for super_group in super_group_instances:
-            for group in super_group:
-                if group.external:
-                    continue
-                
-                # Get people from abroad for this group
-                people_from_abroad = people_from_abroad_dict.get(
-                    group.spec, {}
-                ).get(group.id, None)
-                
-                # Only track new infections, ignore group size
-                new_infected, new_infections, _ = self.interaction.time_step_for_group(
-                    group=group,
-                    people_from_abroad=people_from_abroad,
-                    delta_time=self.timer.duration,
-                    record=self.record,
-                )
+        # Only groups with at least one infector can produce infections. First
+        # interact the groups that get no people from abroad, then wait for the
+        # people from abroad and interact the groups that receive them
+        foreign_groups = people_exchange.foreign_groups()
+        new_infected, new_infections = self._interact_infectious_groups(
+            super_group_instances,
+            lambda group: group.id not in foreign_groups.get(group.spec, ()),
+            people_from_abroad_dict={},
+        )
+        infected_ids.extend(new_infected)
+        infection_ids.extend(new_infections)
 
-                infected_ids.extend(new_infected)
-                infection_ids.extend(new_infections)
-        
+        (
+            people_from_abroad_dict,
+            n_people_from_abroad,
+            n_people_going_abroad,
+        ) = self.activity_manager.complete_people_exchange(people_exchange)
+        InfectiousVenues.add_people_from_abroad(people_from_abroad_dict)
+        rank_logger.info(f"Rank {mpi_rank} -- infectious venues -- {InfectiousVenues.n_venues()}")
+        if foreign_groups:
+            new_infected, new_infections = self._interact_infectious_groups(
+                super_group_instances,
+                lambda group: group.id in foreign_groups.get(group.spec, ()),
+                people_from_abroad_dict=people_from_abroad_dict,
+            )
+            infected_ids.extend(new_infected)
+            infection_ids.extend(new_infections)
 
         if self.interaction and hasattr(self.interaction, '_receive_infection_records'):
             self.interaction._receive_infection_records(self.record)
 
-        mpi_comm.Barrier()
+        # no barrier here: the infections of people from abroad are sent home with
+        # the collectives of Epidemiology.tell_domains_to_infect
         
         # Calculate final people count after movement
         final_people = len(self.world.people)  # People after movement
@@ -495,7 +717,8 @@ class Simulator:
             record=self.record,
             infected_ids=infected_ids,
             infection_ids=infection_ids,
-            people_from_abroad_dict=people_from_abroad_dict
+            people_from_abroad_dict=people_from_abroad_dict,
+            foreign_home_domains=people_exchange.movable_people.home_domains,
         )
         
         self.interaction.print_transmission_statistics()
@@ -508,8 +731,6 @@ class Simulator:
         if is_end_of_day and self.test_and_trace_enabled and self.contact_manager is not None:
             
             self.contact_manager.process_test_results(self.timer.now)
-            
-            mpi_comm.Barrier()    
 
             output_logger.info("Cleaning old contacts in the contact manager")
             output_logger.info(f"Current simulation day (fractional): {self.timer.now}")
@@ -561,51 +782,19 @@ class Simulator:
                 # Save the current state as a frame
                 self.rat_manager.rat_visualisation.save_geo_sections_frame(date=current_date)
 
-        tick, tickw = perf_counter(), wall_clock()
-        mpi_comm.Barrier()
-        tock, tockw = perf_counter(), wall_clock()
-        rank_logger.info(f"Rank {mpi_rank} -- interaction_waiting -- {tock-tick}")
-
-        # Ensure all ranks have finished processing
-        mpi_comm.Barrier()
-        
-        # Gather detailed counts from all ranks
-        local_counts = (
-            initial_people,  # Initial people count
-            final_people,    # Final people count
-            n_people_from_abroad,
-            n_people_going_abroad
-        )
-        all_counts = mpi_comm.allgather(local_counts)
-        
-        # Calculate global totals
-        total_initial = sum(c[0] for c in all_counts)
-        total_final = sum(c[1] for c in all_counts)
-        total_from_abroad = sum(c[2] for c in all_counts)
-        total_going_abroad = sum(c[3] for c in all_counts)
-        
-        # Verify global conservation of people
-        if total_initial != total_final:
-            movement_delta = total_final - total_initial
-            abroad_delta = total_from_abroad - total_going_abroad
-            raise SimulatorError(
-                f"Global people conservation error on rank {mpi_rank}:\n"
-                f"Total initial people: {total_initial}\n"
-                f"Total final people: {total_final}\n"
-                f"Net change in people: {movement_delta}\n"
-                f"Expected net change (from_abroad - going_abroad): {abroad_delta}\n"
-                f"Discrepancy: {movement_delta - abroad_delta}\n"
-                f"Movement details:\n"
-                f"- Total from abroad: {total_from_abroad}\n"
-                f"- Total going abroad: {total_going_abroad}\n"
-                f"Local counts on this rank:\n"
-                f"- Initial people: {initial_people}\n"
-                f"- Final people: {final_people}\n"
-                f"- From abroad: {n_people_from_abroad}\n"
-                f"- Going abroad: {n_people_going_abroad}\n"
-                f"- Net movement: {final_people - initial_people}"
+        # the global conservation of people is checked every few time steps only,
+        # since it needs a collective over all the ranks
+        self._n_timesteps += 1
+        if self.conservation_check_every and not (
+            self._n_timesteps % self.conservation_check_every
+        ):
+            self.check_people_conservation(
+                initial_people=initial_people,
+                final_people=final_people,
+                n_people_from_abroad=n_people_from_abroad,
+                n_people_going_abroad=n_people_going_abroad,
             )
-        
+
         if self.test_and_trace_enabled:
             #from june.records.event_recording import are_test_and_trace_policies_active
             #if are_test_and_trace_policies_active():
@@ -652,6 +841,8 @@ class Simulator:
             self.update_friends_home_ranks()
             mpi_comm.Barrier()
 
+        self.set_up_domain_graph()
+
         self.clear_world()
 
         if self.record is not None:
@@ -665,31 +856,36 @@ class Simulator:
                 output_logger.error(f"Error recording parameters: {e}")
 
         #START OF THE SIMULATION LOOP
-        while self.timer.date < self.timer.final_date:
-            if self.epidemiology:
-                self.epidemiology.infection_seeds_timestep(
-                    self.timer, record=self.record
-                )
-                # Update interaction with any new initial infected IDs after seeding
-                if hasattr(self.interaction, 'update_initial_infected_ids'):
-                    self.interaction.update_initial_infected_ids()
-            mpi_comm.Barrier()
-            if mpi_rank == 0:
-                rank_logger.info("Next timestep")
-            self.do_timestep()
+        # the workers of the interaction pool, and the shared memory of the batches
+        # in flight, must be released even if a time step fails
+        try:
+            while self.timer.date < self.timer.final_date:
+                if self.epidemiology:
+                    self.epidemiology.infection_seeds_timestep(
+                        self.timer, record=self.record
+                    )
+                    # Update interaction with any new initial infected IDs after seeding
+                    if hasattr(self.interaction, 'update_initial_infected_ids'):
+                        self.interaction.update_initial_infected_ids()
+                if mpi_rank == 0:
+                    rank_logger.info("Next timestep")
+                self.do_timestep()
                 
-            if (
-                self.timer.date.date() in self.checkpoint_save_dates
-                and (self.timer.now + self.timer.duration).is_integer()
-            ):  # this saves in the last time step of the day
-                saving_date = self.timer.date.date()
-                # we can resume consistenly
-                output_logger.info(
-                    f"Saving simulation checkpoint at {self.timer.date.date()}"
-                )
-                self.save_checkpoint(saving_date)
-            next(self.timer)
-        
+                if (
+                    self.timer.date.date() in self.checkpoint_save_dates
+                    and (self.timer.now + self.timer.duration).is_integer()
+                ):  # this saves in the last time step of the day
+                    saving_date = self.timer.date.date()
+                    # we can resume consistenly
+                    output_logger.info(
+                        f"Saving simulation checkpoint at {self.timer.date.date()}"
+                    )
+                    self.save_checkpoint(saving_date)
+                next(self.timer)
+        finally:
+            if self.interaction_pool is not None:
+                self.interaction_pool.close()
+
         # Create animation from saved frames (only on rank 0)
         if mpi_rank == 0 and self.rat_manager is not None and self.produce_rat_animations:
             animation_paths = self.rat_manager.rat_visualisation.compile_geo_sections_animations(
@@ -840,6 +1036,51 @@ class Simulator:
         # Ensure all ranks are synchronized in MPI mode
         mpi_comm.Barrier()
 
+    def set_up_domain_graph(self):
+        """
+        Builds the DomainGraph used for the exchanges between domains from the
+        neighbouring domains given by the domain decomposition, and the domains this
+        domain is linked to: the external subgroups people go to, the external
+        leisure venues of the areas and the home ranks of friends. The domains of
+        the external venues of an area also exchange invitations and people with the
+        home ranks of the friends of the people living in the area, so those pairs
+        are linked too. The graph does not change during the simulation.
+        """
+        if mpi_size == 1:
+            return
+        neighbours = set(getattr(self.world, "neighbour_domains", None) or ())
+        friend_ranks_per_area = defaultdict(set)
+        for person in self.world.people:
+            for subgroup in person.subgroups.iter():
+                if subgroup is not None and subgroup.external:
+                    neighbours.add(subgroup.domain_id)
+            friend_ranks = friend_ranks_per_area[person.area]
+            for friend_data in person.friends.values():
+                if isinstance(friend_data, dict):
+                    friend_ranks.add(friend_data.get("home_rank", 0))
+                else:
+                    friend_ranks.add(friend_data)
+        links = set()
+        areas = getattr(self.world, "areas", None)
+        if areas is not None:
+            for area in areas:
+                friend_ranks = friend_ranks_per_area.get(area, ())
+                for venues in (getattr(area, "social_venues", None) or {}).values():
+                    for venue in venues:
+                        if venue.external:
+                            neighbours.add(venue.domain_id)
+                            links.update(
+                                (venue.domain_id, friend_rank)
+                                for friend_rank in friend_ranks
+                                if friend_rank != mpi_rank
+                            )
+        for friend_ranks in friend_ranks_per_area.values():
+            neighbours.update(friend_ranks)
+        DomainGraph.set_neighbours(neighbours, links)
+        output_logger.info(
+            f"Rank {mpi_rank} exchanges with {len(DomainGraph.neighbours)} domains"
+        )
+
     def update_friends_home_ranks(self):
         """
         Update the home rank for each person's friends after domain splitting.
@@ -4,5 +4,6 @@ from .parse_probabilities import (
     read_comorbidity_csv,
     convert_comorbidities_prevalence_to_dict,
 )
-from .numba_random import random_choice_numba
+from .numba_random import random_choice_numba, inverse_cdf_choice
+from .random_streams import RandomStreams
 from .readers import read_date, str_to_class
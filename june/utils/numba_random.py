@@ -12,3 +12,27 @@ def random_choice_numba(arr, prob):
     Fast implementation of np.random.choice
     """
     return arr[np.searchsorted(np.cumsum(prob), random(), side="right")]
+
+
+@jit(nopython=True)
+def inverse_cdf_choice(weights, u):
+    """
+    Selects an index with probability proportional to ``weights`` (which need not
+    be normalised) using the uniform random number ``u`` in [0, 1).
+    Indices with zero weight are never selected.
+    """
+    total = 0.0
+    for i in range(len(weights)):
+        total += weights[i]
+    threshold = u * total
+    cumulative = 0.0
+    selected = 0
+    for i in range(len(weights)):
+        if weights[i] == 0.0:
+            continue
+        selected = i
+        cumulative += weights[i]
+        if cumulative > threshold:
+            break
+    return selected
+
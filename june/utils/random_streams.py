@@ -0,0 +1,167 @@
+"""
+Counter-based random number streams. Every random number is a pure function of
+(seed, stream name, time step, entity id, draw index), so results do not depend
+on the order in which entities are visited, or on how the world is split in domains.
+"""
+import random
+from contextlib import contextmanager
+from zlib import crc32
+
+import numba as nb
+import numpy as np
+
+_PHILOX_M0 = np.uint64(0xD2511F53)
+_PHILOX_M1 = np.uint64(0xCD9E8D57)
+_PHILOX_W0 = np.uint64(0x9E3779B9)
+_PHILOX_W1 = np.uint64(0xBB67AE85)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+@nb.jit(nopython=True)
+def _philox4x32(c0, c1, c2, c3, k0, k1):
+    """
+    Philox4x32-10 block function (Salmon et al. 2011). Takes a 128 bit counter and a
+    64 bit key (as 32 bit words stored in uint64) and returns four 32 bit words.
+    """
+    for _ in range(10):
+        product0 = _PHILOX_M0 * c0
+        product1 = _PHILOX_M1 * c2
+        hi0 = product0 >> np.uint64(32)
+        lo0 = product0 & _MASK32
+        hi1 = product1 >> np.uint64(32)
+        lo1 = product1 & _MASK32
+        c0, c1, c2, c3 = (hi1 ^ c1 ^ k0) & _MASK32, lo1, (hi0 ^ c3 ^ k1) & _MASK32, lo0
+        k0 = (k0 + _PHILOX_W0) & _MASK32
+        k1 = (k1 + _PHILOX_W1) & _MASK32
+    return c0, c1, c2, c3
+
+
+@nb.jit(nopython=True)
+def _philox_uniforms(entity_ids, n_per_entity, time_step, stream_tag, k0, k1):
+    """
+    Returns an (entities x n_per_entity) array of uniforms in [0, 1). Every block
+    of the Philox function gives two doubles with 53 bits of randomness each.
+    """
+    out = np.empty((len(entity_ids), n_per_entity))
+    c2 = np.uint64(time_step) & _MASK32
+    c3 = np.uint64(stream_tag) & _MASK32
+    for n in range(len(entity_ids)):
+        c1 = np.uint64(entity_ids[n]) & _MASK32
+        for block in range((n_per_entity + 1) // 2):
+            x0, x1, x2, x3 = _philox4x32(np.uint64(block), c1, c2, c3, k0, k1)
+            i = 2 * block
+            out[n, i] = ((x0 >> np.uint64(5)) * 67108864.0 + (x1 >> np.uint64(6))) / 9007199254740992.0
+            if i + 1 < n_per_entity:
+                out[n, i + 1] = ((x2 >> np.uint64(5)) * 67108864.0 + (x3 >> np.uint64(6))) / 9007199254740992.0
+    return out
+
+
+@nb.jit(nopython=True)
+def _philox_words(block, entity_id, time_step, stream_tag, k0, k1):
+    """
+    Returns the four 32 bit words of a Philox block of a stream, as an array of
+    uint32.
+    """
+    x0, x1, x2, x3 = _philox4x32(
+        np.uint64(block),
+        np.uint64(entity_id) & _MASK32,
+        np.uint64(time_step) & _MASK32,
+        np.uint64(stream_tag) & _MASK32,
+        k0,
+        k1,
+    )
+    out = np.empty(4, dtype=np.uint32)
+    out[0] = x0
+    out[1] = x1
+    out[2] = x2
+    out[3] = x3
+    return out
+
+
+class RandomStreams:
+    """
+    Counter-based random streams, keyed by the simulation seed. A stream is
+    identified by a name (e.g. "interaction", "leisure", "infection"), the current
+    time step and the id of the entity (person or group) that consumes it, and any
+    number of draws can be taken from it by index.
+    """
+
+    seed = 0
+    time_step = 0
+    _stream_tags = {}
+
+    @classmethod
+    def set_seed(cls, seed: int):
+        cls.seed = int(seed)
+
+    @classmethod
+    def set_time(cls, time: float):
+        """
+        Sets the current time step from the simulation time in days.
+        Streams are keyed by the number of minutes since the start.
+        """
+        cls.time_step = int(round(time * 24 * 60))
+
+    @classmethod
+    def _key(cls):
+        return np.uint64(cls.seed & 0xFFFFFFFF), np.uint64((cls.seed >> 32) & 0xFFFFFFFF)
+
+    @classmethod
+    def stream_tag(cls, name: str) -> int:
+        tag = cls._stream_tags.get(name)
+        if tag is None:
+            tag = crc32(name.encode("ascii"))
+            cls._stream_tags[name] = tag
+        return tag
+
+    @classmethod
+    def uniforms(cls, name: str, entity_ids, n_per_entity: int) -> np.ndarray:
+        """
+        Returns an array of shape (len(entity_ids), n_per_entity) of uniforms,
+        row i being the first draws of the stream of entity_ids[i].
+        """
+        k0, k1 = cls._key()
+        return _philox_uniforms(
+            np.asarray(entity_ids, dtype=np.int64),
+            n_per_entity,
+            cls.time_step,
+            cls.stream_tag(name),
+            k0,
+            k1,
+        )
+
+    @classmethod
+    def uniform(cls, name: str, entity_id: int, index: int = 0) -> float:
+        """
+        Returns draw number ``index`` of the stream of an entity.
+        """
+        return cls.uniforms(name, np.array([entity_id]), index + 1)[0, index]
+
+    @classmethod
+    @contextmanager
+    def seeded(cls, name: str, entity_id: int):
+        """
+        Context in which the global ``random`` and ``np.random`` generators are
+        seeded from the stream of the given entity, for code that draws from them
+        (for instance scipy distributions). The global states are restored on exit.
+        Each generator is seeded with the 128 raw bits of its own Philox block of
+        the stream, so that different entities do not share seeds and the two
+        generators do not produce the same sequence.
+        """
+        np_state = np.random.get_state()
+        py_state = random.getstate()
+        k0, k1 = cls._key()
+        entity_id = int(entity_id)
+        tag = cls.stream_tag(name)
+        np.random.seed(_philox_words(0, entity_id, cls.time_step, tag, k0, k1))
+        random.seed(
+            int.from_bytes(
+                _philox_words(1, entity_id, cls.time_step, tag, k0, k1).tobytes(),
+                "little",
+            )
+        )
+        try:
+            yield
+        finally:
+            np.random.set_state(np_state)
+            random.setstate(py_state)
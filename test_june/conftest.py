@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from june.epidemiology.infection import InfectionSelector, InfectionSelectors
+from june.epidemiology.infection.disease_config import DiseaseConfig
+from june.epidemiology.infection.health_index.health_index import (
+    HealthIndexGenerator,
+    _parse_interval,
+)
+from june.global_context import GlobalContext
+
+_rates = {
+    "asymptomatic": 0.3,
+    "mild": 0.4,
+    "hospital": 0.05,
+    "icu": 0.01,
+    "home_ifr": 0.002,
+    "hospital_ifr": 0.01,
+    "icu_ifr": 0.004,
+}
+
+
+@pytest.fixture(name="disease_config", scope="session")
+def make_disease_config():
+    disease_config = DiseaseConfig("covid19")
+    GlobalContext.set_disease_config(disease_config)
+    return disease_config
+
+
+@pytest.fixture(name="rates_df", scope="session")
+def make_rates_df():
+    """
+    Outcome rates that grow with age and differ between populations and sexes,
+    in place of the rates of the data directory.
+    """
+    age_bins = ["[0,19]", "[20,49]", "[50,69]", "[70,99]"]
+    columns = {}
+    for population, population_factor in (("ch", 1.5), ("gp", 1.0)):
+        for sex, sex_factor in (("male", 1.2), ("female", 1.0)):
+            for parameter, rate in _rates.items():
+                factor = 1.0
+                if parameter not in ("asymptomatic", "mild"):
+                    factor = population_factor * sex_factor
+                columns[f"{population}_{parameter}_{sex}"] = [
+                    rate * factor * (1 + i) for i in range(len(age_bins))
+                ]
+    return pd.DataFrame(columns, index=age_bins).rename(_parse_interval)
+
+
+@pytest.fixture(name="health_index_generator", scope="session")
+def make_health_index_generator(disease_config, rates_df):
+    return HealthIndexGenerator(disease_config=disease_config, rates_df=rates_df)
+
+
+@pytest.fixture(name="infection_selector", scope="session")
+def make_infection_selector(disease_config, health_index_generator):
+    return InfectionSelector(
+        disease_config=disease_config, health_index_generator=health_index_generator
+    )
+
+
+@pytest.fixture(name="infection_selectors")
+def make_infection_selectors(infection_selector):
+    return InfectionSelectors([infection_selector])
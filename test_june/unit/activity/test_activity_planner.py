@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from june.activity.activity_planner import ActivityPlanner, column_activities
+from june.demography import Person
+from june.groups import ActivityChanges, Company, Hospital, Household
+from june.groups.leisure import Pub
+
+activities = ["medical_facility", "primary_activity", "leisure", "residence"]
+
+
+@pytest.fixture(name="people")
+def make_people(disease_config):
+    people = [Person.from_attributes(age=20 + 10 * i, sex="m") for i in range(5)]
+    household = Household(type="family")
+    company = Company()
+    for i, person in enumerate(people):
+        household.add(person, subgroup_type=2)
+        if i % 2 == 0:
+            company.add(person)
+    yield people
+    ActivityChanges.tracking = False
+    ActivityChanges.clear()
+
+
+def python_resolution(person):
+    """
+    Walks the activity hierarchy as ``ActivityManager.move_to_active_subgroup``
+    does, stopping at the first activity that is not read from a column.
+    """
+    for index, activity in enumerate(activities):
+        if activity not in column_activities:
+            return None, index
+        subgroup = getattr(person.subgroups, activity)
+        if subgroup is not None:
+            return subgroup, -1
+    return None, -1
+
+
+def assert_matches_python(planner):
+    planner.update()
+    available = np.ones(len(planner.people), dtype=bool)
+    handles, first_python_activity, unresolved = planner.resolve(
+        activities, available
+    )
+    assert not unresolved.any()
+    for index, person in enumerate(planner.people):
+        subgroup, python_activity = python_resolution(person)
+        assert first_python_activity[index] == python_activity
+        if subgroup is None:
+            assert handles[index] == -1
+        else:
+            assert planner.subgroups[handles[index]] is subgroup
+
+
+class TestActivityPlanner:
+    def test__admission_and_discharge(self, people):
+        hospital = Hospital(n_beds=10, n_icu_beds=2)
+        planner = ActivityPlanner(people, has_travel=False)
+        assert_matches_python(planner)
+        hospital.add_to_ward(people[0])
+        hospital.add_to_icu(people[1])
+        assert_matches_python(planner)
+        assert planner.columns["medical_facility"][1] >= 0
+        hospital.release_patient(people[0])
+        hospital.release_patient(people[1])
+        assert_matches_python(planner)
+        assert (planner.columns["medical_facility"] == -1).all()
+
+    def test__leisure_placements_are_not_recorded(self, people):
+        planner = ActivityPlanner(people, has_travel=False)
+        pub = Pub()
+        pub.add(people[0])
+        assert people[0].subgroups.leisure is pub.subgroups[0]
+        assert ActivityChanges.pop() == []
+        company = Company()
+        company.add(people[1])
+        assert_matches_python(planner)
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from june.epidemiology.infection import Immunity
+from june.epidemiology.infection.health_index.health_index import HealthIndexGenerator
+
+
+def baseline_health_index(health_index_generator, person, infection_id):
+    """
+    Health index computed directly from the probabilities, without tables or
+    caches.
+    """
+    if (
+        person.residence is not None
+        and person.residence.group.spec == "care_home"
+        and person.age >= health_index_generator.care_home_min_age
+    ):
+        population = "ch"
+    else:
+        population = "gp"
+    if health_index_generator.use_physiological_age:
+        age = health_index_generator.physiological_age(int(person.age), person.sex)
+    else:
+        age = int(person.age)
+    probabilities = health_index_generator.probabilities[population][person.sex][age]
+    if infection_id is not None:
+        effective_multiplier = person.immunity.get_effective_multiplier(infection_id)
+        if effective_multiplier != 1.0:
+            probabilities = health_index_generator.apply_effective_multiplier(
+                probabilities, effective_multiplier
+            )
+    return np.cumsum(probabilities)
+
+
+def make_people(n_people=300, seed=0):
+    rng = np.random.default_rng(seed)
+    care_home = SimpleNamespace(group=SimpleNamespace(spec="care_home"))
+    household = SimpleNamespace(group=SimpleNamespace(spec="household"))
+    people = []
+    for _ in range(n_people):
+        effective_multipliers = {}
+        if rng.random() < 0.5:
+            # few distinct multipliers, so that cached rows are reused
+            effective_multipliers[1] = float(rng.choice([0.2, 0.5, 1.0, 1.5]))
+        people.append(
+            SimpleNamespace(
+                age=int(rng.integers(0, 100)),
+                sex=str(rng.choice(["m", "f"])),
+                residence=[None, household, care_home][int(rng.integers(0, 3))],
+                immunity=Immunity(effective_multiplier_dict=effective_multipliers),
+            )
+        )
+    return people
+
+
+@pytest.mark.parametrize(
+    "life_expectancies",
+    [{}, {"m_exp": 75.0, "f_exp": 80.0}],
+    ids=["chronological_age", "physiological_age"],
+)
+class TestHealthIndexTables:
+    def test__tables_match_direct_computation(
+        self, disease_config, rates_df, life_expectancies
+    ):
+        health_index_generator = HealthIndexGenerator(
+            disease_config=disease_config, rates_df=rates_df, **life_expectancies
+        )
+        assert health_index_generator.use_physiological_age == bool(life_expectancies)
+        people = make_people()
+        for infection_id in (None, 1):
+            expected = np.array(
+                [
+                    baseline_health_index(health_index_generator, person, infection_id)
+                    for person in people
+                ]
+            )
+            # twice, so that the second pass reads the cached adjusted rows
+            for _ in range(2):
+                np.testing.assert_allclose(
+                    [
+                        health_index_generator(person, infection_id)
+                        for person in people
+                    ],
+                    expected,
+                    rtol=1e-12,
+                )
+            np.testing.assert_allclose(
+                health_index_generator.cumulative_probabilities(people, infection_id),
+                expected,
+                rtol=1e-12,
+            )
+
+    def test__rows_are_read_only(self, disease_config, rates_df, life_expectancies):
+        health_index_generator = HealthIndexGenerator(
+            disease_config=disease_config, rates_df=rates_df, **life_expectancies
+        )
+        person = make_people(1)[0]
+        person.immunity.effective_multiplier_dict[1] = 0.5
+        for infection_id in (None, 1):
+            with pytest.raises(ValueError):
+                health_index_generator(person, infection_id)[0] = 1.0
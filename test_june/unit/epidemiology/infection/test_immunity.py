@@ -0,0 +1,61 @@
+import copy
+import gc
+
+import numpy as np
+
+from june.epidemiology.infection import Immunity, ImmunityStore
+
+
+class TestImmunityDicts:
+    def test__entries_set_to_one_are_kept(self):
+        immunity = Immunity()
+        immunity.susceptibility_dict[1] = 1.0
+        immunity.susceptibility_dict[2] = 0.3
+        assert 1 in immunity.susceptibility_dict
+        assert 3 not in immunity.susceptibility_dict
+        assert len(immunity.susceptibility_dict) == 2
+        assert dict(immunity.susceptibility_dict) == {1: 1.0, 2: 0.3}
+        assert immunity.susceptibility_dict.get(3) is None
+        assert immunity.get_susceptibility(3) == 1.0
+        del immunity.susceptibility_dict[1]
+        assert dict(immunity.susceptibility_dict) == {2: 0.3}
+        assert immunity.serialize() == ([2], [0.3])
+
+    def test__values_are_stored_in_double_precision(self):
+        immunity = Immunity(
+            susceptibility_dict={1: 0.1}, effective_multiplier_dict={1: 1 / 3}
+        )
+        assert immunity.get_susceptibility(1) == 0.1
+        assert immunity.get_effective_multiplier(1) == 1 / 3
+        assert ImmunityStore.susceptibilities.dtype == np.float64
+
+
+class TestImmunityRows:
+    def test__rows_are_reused(self):
+        immunity = Immunity(susceptibility_dict={1: 0.5})
+        row = immunity.row
+        n_rows = ImmunityStore.n_rows
+        immunity.release()
+        assert immunity.row == -1
+        immunity.release()
+        immunity = Immunity()
+        assert immunity.row == row
+        assert ImmunityStore.n_rows == n_rows
+        assert 1 not in immunity.susceptibility_dict
+        assert immunity.get_susceptibility(1) == 1.0
+
+    def test__rows_are_not_freed_by_the_garbage_collector(self):
+        immunity = Immunity(susceptibility_dict={1: 0.5})
+        row = immunity.row
+        del immunity
+        gc.collect()
+        assert row not in ImmunityStore.free_rows
+        assert ImmunityStore.get("susceptibilities", row, 1) == 0.5
+
+    def test__copies_have_their_own_row(self):
+        immunity = Immunity(susceptibility_dict={1: 0.5})
+        immunity_copy = copy.deepcopy(immunity)
+        assert immunity_copy.row != immunity.row
+        immunity_copy.add_immunity([1])
+        assert immunity.get_susceptibility(1) == 0.5
+        assert immunity_copy.is_immune(1)
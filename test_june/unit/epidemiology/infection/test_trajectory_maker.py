@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from june.epidemiology.infection.trajectory_maker import (
+    BetaCompletionTime,
+    ExponentialCompletionTime,
+    ExponweibCompletionTime,
+    LognormalCompletionTime,
+    NormalCompletionTime,
+    Stage,
+    TrajectoryMaker,
+    TrajectoryMakers,
+)
+
+
+@pytest.mark.parametrize(
+    "completion_time",
+    [
+        LognormalCompletionTime(s=0.55, loc=0.0, scale=5.0),
+        ExponentialCompletionTime(loc=0.0, scale=3.0),
+        BetaCompletionTime(a=2.0, b=5.0, loc=1.0, scale=10.0),
+        NormalCompletionTime(loc=10.0, scale=2.0),
+        ExponweibCompletionTime(a=2.0, c=1.5, scale=3.0),
+    ],
+)
+def test__quantile_table_error_is_bounded(completion_time):
+    completion_time.use_quantile_table(16384)
+    uniforms = np.random.default_rng(0).random(20000)
+    # the ends of the table and beyond it
+    uniforms = np.concatenate([uniforms, [1e-7, 1e-5, 0.5, 1 - 1e-5, 1 - 1e-7]])
+    tabulated = np.array([completion_time.from_uniform(u) for u in uniforms])
+    exact = completion_time.distribution.ppf(uniforms)
+    np.testing.assert_allclose(tabulated, exact, rtol=1e-6, atol=1e-6)
+
+
+def test__quantile_tables_are_off_by_default():
+    completion_time = LognormalCompletionTime(s=0.55, scale=5.0)
+    trajectory = TrajectoryMaker(
+        Stage(symptoms_tag=0, completion_time=completion_time),
+        Stage(symptoms_tag=1, completion_time=completion_time),
+    )
+    trajectory_makers = TrajectoryMakers([trajectory])
+    assert completion_time.table_size == 0
+    np.random.seed(1)
+    expected = completion_time.distribution.rvs(random_state=None)
+    np.random.seed(1)
+    assert trajectory_makers[1][1][0] == expected
+    trajectory_makers.use_quantile_tables(1024)
+    assert completion_time.table_size == 1024
+
+
+class CountingDistribution:
+    """
+    Wraps a scipy distribution, counting the quantile function calls.
+    """
+
+    def __init__(self, distribution):
+        self.distribution = distribution
+        self.n_ppf_calls = 0
+
+    def ppf(self, *args, **kwargs):
+        self.n_ppf_calls += 1
+        return self.distribution.ppf(*args, **kwargs)
+
+
+def test__quantile_table_tails():
+    completion_time = LognormalCompletionTime(s=0.55, scale=5.0)
+    distribution = completion_time._distribution
+    completion_time._distribution = counter = CountingDistribution(distribution)
+    completion_time.use_quantile_table(16384)
+    # the table is only built when it is first needed
+    assert counter.n_ppf_calls == 0
+    completion_time.from_uniform(0.3)
+    assert counter.n_ppf_calls == 1
+    tails = np.array([0.0, 1e-12, 1e-9, 1e-6, 1 - 1e-6, 1 - 1e-9, 1 - 1e-12])
+    tail_times = [completion_time.from_uniform(u) for u in tails]
+    np.testing.assert_allclose(
+        tail_times, distribution.ppf(tails, s=0.55, scale=5.0), rtol=1e-12
+    )
+    assert counter.n_ppf_calls == 1 + len(tails)
+    # uniforms beyond the table, which need the exact quantile function, are rare
+    uniforms = np.random.default_rng(3).random(1_000_000)
+    n_calls = counter.n_ppf_calls
+    for u in uniforms:
+        completion_time.from_uniform(u)
+    n_tail_draws = counter.n_ppf_calls - n_calls
+    expected = len(uniforms) * 2 / (1 + np.exp(completion_time.table_max_logit))
+    assert n_tail_draws < expected + 5 * np.sqrt(expected)
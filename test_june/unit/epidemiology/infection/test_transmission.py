@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from june.epidemiology.infection.transmission import (
+    Transmission,
+    TransmissionConstant,
+    TransmissionGamma,
+    TransmissionProbabilities,
+)
+from june.epidemiology.infection.transmission_xnexp import TransmissionXNExp
+
+
+class TransmissionStep(Transmission):
+    """
+    A transmission without a vectorised kernel.
+    """
+
+    def update_infection_probability(self, time_from_infection):
+        self.probability = float(time_from_infection > 1.0)
+
+
+def make_transmission(rng, kind):
+    if kind == "gamma":
+        return TransmissionGamma(
+            max_infectiousness=rng.random() * 3,
+            shape=1.5 + rng.random(),
+            rate=0.5 + rng.random(),
+            shift=-3 * rng.random(),
+        )
+    if kind == "xnexp":
+        return TransmissionXNExp(
+            max_probability=rng.random(),
+            time_first_infectious=rng.random() * 3,
+            n=1 + rng.random(),
+            alpha=1 + 4 * rng.random(),
+        )
+    if kind == "constant":
+        return TransmissionConstant(probability=rng.random())
+    return TransmissionStep()
+
+
+def make_person(transmission, start_time):
+    return SimpleNamespace(
+        infection=SimpleNamespace(transmission=transmission, start_time=start_time)
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_probabilities():
+    TransmissionProbabilities.clear()
+    yield
+    TransmissionProbabilities.clear()
+
+
+def test__batched_probabilities_match_per_infection_updates():
+    rng = np.random.default_rng(0)
+    kinds = ["gamma", "xnexp", "constant", "step"] * 50
+    people = [
+        make_person(make_transmission(rng, kind), 5 * rng.random()) for kind in kinds
+    ]
+    # the same infections, updated one by one
+    rng = np.random.default_rng(0)
+    references = [
+        make_person(make_transmission(rng, kind), 5 * rng.random()) for kind in kinds
+    ]
+    for person in people:
+        TransmissionProbabilities.register(person)
+    for time in (0.5, 3.0, 7.25):
+        TransmissionProbabilities.update(time)
+        for reference in references:
+            reference.infection.transmission.update_infection_probability(
+                time - reference.infection.start_time
+            )
+        np.testing.assert_array_equal(
+            TransmissionProbabilities.get_probabilities(
+                [person.infection.transmission for person in people]
+            ),
+            [reference.infection.transmission.probability for reference in references],
+        )
+
+
+def test__rows_are_released_and_reused():
+    rng = np.random.default_rng(1)
+    person = make_person(make_transmission(rng, "gamma"), 0.0)
+    TransmissionProbabilities.register(person)
+    row = person.infection.transmission.row
+    TransmissionProbabilities.update(2.0)
+    probability = person.infection.transmission.probability
+    assert probability > 0
+    TransmissionProbabilities.discard(person)
+    assert person.infection.transmission.row is None
+    # released transmissions keep their last probability and are not updated
+    assert person.infection.transmission.probability == probability
+    other = make_person(make_transmission(rng, "xnexp"), 1.0)
+    TransmissionProbabilities.register(other)
+    assert other.infection.transmission.row == row
+    TransmissionProbabilities.update(4.0)
+    assert person.infection.transmission.probability == probability
+
+
+def test__probabilities_of_registered_and_released_transmissions():
+    rng = np.random.default_rng(2)
+    people = [make_person(make_transmission(rng, "gamma"), 0.0) for _ in range(4)]
+    for person in people:
+        TransmissionProbabilities.register(person)
+    TransmissionProbabilities.update(3.0)
+    TransmissionProbabilities.discard(people[1])
+    TransmissionProbabilities.update(6.0)
+    transmissions = [person.infection.transmission for person in people]
+    np.testing.assert_array_equal(
+        TransmissionProbabilities.get_probabilities(transmissions),
+        [transmission.probability for transmission in transmissions],
+    )
+    assert len(TransmissionProbabilities.get_probabilities([])) == 0
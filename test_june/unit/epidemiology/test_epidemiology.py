@@ -0,0 +1,239 @@
+import copy
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from june.demography import Person
+from june.demography.demography import Population
+from june.epidemiology.active_infections import ActiveInfections, TestAndTraceActive
+from june.epidemiology.epidemiology import Epidemiology
+from june.epidemiology.infection import TransmissionProbabilities
+from june.epidemiology import test_and_trace
+from june.groups import Household
+from june.groups.cemetery import Cemeteries
+from june.utils import RandomStreams
+
+
+def make_world(n_people, first_id):
+    """
+    People with fixed ids, so that their infections are drawn from the same
+    streams whatever ran before.
+    """
+    people = []
+    for i in range(n_people):
+        person = Person.from_attributes(
+            age=60 + i % 30, sex="m" if i % 2 else "f", id=first_id + i
+        )
+        Household(type="family").add(person, subgroup_type=2)
+        people.append(person)
+    return SimpleNamespace(people=Population(people), cemeteries=Cemeteries())
+
+
+def selected_infection_id(epidemiology):
+    return epidemiology.infection_selectors[0].infection_class.infection_id()
+
+
+def copy_infection(infection):
+    """
+    Copy of an infection that is not registered in TransmissionProbabilities, so
+    that its probability is updated by the infection itself.
+    """
+    probability = infection.transmission.probability
+    infection = copy.deepcopy(infection)
+    infection.transmission.row = None
+    infection.transmission._probability = probability
+    return infection
+
+
+def baseline_update_health_status(world, time, duration):
+    """
+    The loop over the whole population that ``update_health_status`` replaced.
+    """
+    for person in world.people:
+        if not person.infected:
+            continue
+        new_status = person.infection.update_health_status(time, duration)
+        if new_status == "recovered":
+            test_and_trace = person.test_and_trace
+            if (
+                test_and_trace is not None
+                and test_and_trace.isolation_end_time is not None
+                and time >= test_and_trace.isolation_end_time
+            ):
+                person.test_and_trace = None
+            Epidemiology.recover(person)
+        elif new_status == "dead":
+            Epidemiology.bury_the_dead(world, person)
+
+
+def assert_same_health(world, baseline_world):
+    for person, baseline_person in zip(world.people, baseline_world.people):
+        assert person.dead == baseline_person.dead
+        assert person.infected == baseline_person.infected
+        assert (person.test_and_trace is None) == (
+            baseline_person.test_and_trace is None
+        )
+        if person.infected:
+            assert person.infection.symptoms.stage == (
+                baseline_person.infection.symptoms.stage
+            )
+            assert person.infection.tag == baseline_person.infection.tag
+            assert person.infection.transmission.probability == pytest.approx(
+                baseline_person.infection.transmission.probability, rel=1e-9
+            )
+    infected_ids = [person.id for person in world.people if person.infected]
+    assert [person.id for person in ActiveInfections.people()] == infected_ids
+    assert all(
+        not person.dead and person.test_and_trace is not None
+        for person in TestAndTraceActive.people()
+    )
+
+
+@pytest.fixture(name="epidemiology")
+def make_epidemiology(infection_selectors):
+    RandomStreams.set_seed(11)
+    RandomStreams.set_time(0.0)
+    for registry in (ActiveInfections, TestAndTraceActive, TransmissionProbabilities):
+        registry.clear()
+    yield Epidemiology(infection_selectors=infection_selectors)
+    for registry in (ActiveInfections, TestAndTraceActive, TransmissionProbabilities):
+        registry.clear()
+
+
+class TestUpdateHealthStatus:
+    def infect(self, epidemiology, world, baseline_world, indices, time):
+        infection_id = selected_infection_id(epidemiology)
+        people = [world.people[index] for index in indices]
+        epidemiology.infect_people(
+            world=world,
+            time=time,
+            infected_ids=[person.id for person in people],
+            infection_ids=[infection_id] * len(people),
+            people_from_abroad_dict={},
+        )
+        for index in indices:
+            baseline_world.people[index].infection = copy_infection(
+                world.people[index].infection
+            )
+
+    def test__registries_match_the_whole_population(self, epidemiology):
+        world = make_world(120, first_id=6_000_000)
+        baseline_world = make_world(120, first_id=6_001_000)
+        # some people are traced and isolate until day 1
+        for index in range(0, 120, 7):
+            for person in (world.people[index], baseline_world.people[index]):
+                person.test_and_trace = test_and_trace.TestAndTrace()
+                person.test_and_trace.isolation_end_time = 1.0
+            TestAndTraceActive.add(world.people[index])
+        self.infect(epidemiology, world, baseline_world, range(80), time=0.0)
+        duration = 0.5
+        for step in range(80):
+            time = step * duration
+            RandomStreams.set_time(time)
+            if step == 10:
+                # infected days ago (e.g. restored from a checkpoint), so that some
+                # transitions are due in the first time step they are updated
+                self.infect(
+                    epidemiology, world, baseline_world, range(80, 100), time - 4.0
+                )
+            if step == 20:
+                # the symptoms of some people change without a scheduled transition,
+                # e.g. because of an event
+                for index in range(80, 100, 3):
+                    for person in (world.people[index], baseline_world.people[index]):
+                        symptoms = person.infection.symptoms
+                        if symptoms.stage + 2 < len(symptoms.trajectory):
+                            symptoms.stage += 1
+                            symptoms.tag = symptoms.trajectory[symptoms.stage][1]
+            if step == 30:
+                # reinfections replace infections that are still scheduled
+                infected = [
+                    index
+                    for index in range(100)
+                    if world.people[index].infected and index % 4 == 0
+                ]
+                self.infect(epidemiology, world, baseline_world, infected, time)
+            epidemiology.update_health_status(
+                world=world, time=time, duration=duration
+            )
+            baseline_update_health_status(baseline_world, time, duration)
+            assert_same_health(world, baseline_world)
+        assert any(person.dead for person in world.people)
+        assert any(
+            not person.infected and not person.dead for person in world.people[:100]
+        )
+        assert len(TestAndTraceActive.people()) < len(range(0, 120, 7))
+        assert ActiveInfections.n_people() < 100
+
+
+class TestInfectionsFromAbroad:
+    def people_from_abroad_dict(self, home_domains):
+        return {
+            "company": {
+                1: {
+                    0: {
+                        person_id: {"dom": domain, "inf_id": 0}
+                        for person_id, domain in home_domains.items()
+                    }
+                }
+            }
+        }
+
+    @pytest.mark.parametrize("with_map", [False, True])
+    def test__infections_are_routed_to_the_home_domain(
+        self, epidemiology, with_map
+    ):
+        world = make_world(3, first_id=6_002_000)
+        infection_id = selected_infection_id(epidemiology)
+        home_domains = {900: 2, 901: 1, 902: 2, 903: 3}
+        infected_ids = [902, world.people[0].id, 901, 900, 903, world.people[2].id]
+        infection_ids = [7, infection_id, 8, 9, 10, infection_id]
+        infect_in_domains = epidemiology.infect_people(
+            world=world,
+            time=0.0,
+            infected_ids=infected_ids,
+            infection_ids=infection_ids,
+            people_from_abroad_dict=self.people_from_abroad_dict(home_domains),
+            foreign_home_domains=home_domains if with_map else None,
+        )
+        expected = {}
+        for person_id, person_infection_id in zip(infected_ids, infection_ids):
+            if person_id in home_domains:
+                domain = expected.setdefault(
+                    home_domains[person_id], {"id": [], "inf_id": []}
+                )
+                domain["id"].append(person_id)
+                domain["inf_id"].append(person_infection_id)
+        assert infect_in_domains == expected
+        assert [person.infected for person in world.people] == [True, False, True]
+
+    def test__infections_are_applied_at_home(self, epidemiology, monkeypatch):
+        world = make_world(4, first_id=6_003_000)
+        infection_id = selected_infection_id(epidemiology)
+        sent = []
+
+        def move_info(infections):
+            # the domain sends the infections to itself
+            sent.append(infections)
+            return infections[0], 0, 0
+
+        monkeypatch.setattr("june.epidemiology.epidemiology.move_info", move_info)
+        ids = [world.people[3].id, world.people[1].id]
+        epidemiology.tell_domains_to_infect(
+            world=world,
+            timer=SimpleNamespace(date=datetime(2020, 3, 1), now=2.0),
+            infect_in_domains={0: {"id": ids, "inf_id": [infection_id] * 2}},
+        )
+        np.testing.assert_array_equal(
+            sent[0][0].reshape(-1, 2), [[ids[0], infection_id], [ids[1], infection_id]]
+        )
+        assert [person.infected for person in world.people] == [
+            False,
+            True,
+            False,
+            True,
+        ]
+        assert world.people[1].infection.start_time == 2.0
+        assert [person.id for person in ActiveInfections.people()] == sorted(ids)
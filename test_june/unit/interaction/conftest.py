@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from june.interaction.batched_interaction import InteractionBatch
+from june.utils import RandomStreams
+
+
+def make_interactive_group(rng, infection_ids, n_subgroups, n_sizes=None):
+    """
+    An interactive group built with nested dictionaries, with random infectors
+    and susceptibles in ``n_subgroups`` subgroups and the sizes of ``n_sizes``
+    subgroups (by default, as many as there are subgroups).
+    """
+    n_sizes = n_subgroups if n_sizes is None else n_sizes
+    group_id = int(rng.integers(1_000_000))
+    infectors = {}
+    for infection_id in infection_ids:
+        for subgroup_id in range(n_subgroups):
+            n_infectors = int(rng.integers(0, 3))
+            if n_infectors:
+                infectors.setdefault(infection_id, {})[subgroup_id] = {
+                    "ids": [group_id * 100 + 50 + i for i in range(n_infectors)],
+                    "trans_probs": rng.random(n_infectors).tolist(),
+                }
+    susceptibles = {}
+    for subgroup_id in range(n_subgroups):
+        for i in range(int(rng.integers(0, 6))):
+            susceptibles.setdefault(subgroup_id, {})[
+                group_id * 100 + 10 * subgroup_id + i
+            ] = {infection_id: float(rng.random()) for infection_id in infection_ids}
+    return SimpleNamespace(
+        group=SimpleNamespace(id=group_id),
+        arrays=None,
+        infectors_per_infection_per_subgroup=infectors,
+        susceptibles_per_subgroup=susceptibles,
+        subgroup_sizes={
+            subgroup_id: float(rng.integers(1, 10)) for subgroup_id in range(n_sizes)
+        },
+    )
+
+
+def make_contact_matrix(rng, n_subgroups):
+    return rng.random((n_subgroups, n_subgroups)) * 5
+
+
+@pytest.fixture(name="interactive_group_factory")
+def make_interactive_group_factory():
+    return make_interactive_group
+
+
+@pytest.fixture(name="contact_matrix_factory")
+def make_contact_matrix_factory():
+    return make_contact_matrix
+
+
+@pytest.fixture(name="random_batch")
+def make_random_batch():
+    """
+    Builds an InteractionBatch of random groups with a fixed seed.
+    """
+
+    def random_batch(n_groups=200, infection_ids=(101, 202), seed=0):
+        rng = np.random.default_rng(seed)
+        RandomStreams.set_seed(seed)
+        RandomStreams.set_time(1.5)
+        interactive_groups, contact_matrices = [], []
+        for _ in range(n_groups):
+            n_subgroups = int(rng.integers(1, 4))
+            interactive_groups.append(
+                make_interactive_group(rng, infection_ids, n_subgroups)
+            )
+            contact_matrices.append(make_contact_matrix(rng, n_subgroups))
+        betas = rng.random(n_groups) * 2
+        return (
+            interactive_groups,
+            contact_matrices,
+            betas,
+            InteractionBatch.from_interactive_groups(
+                interactive_groups, contact_matrices, betas
+            ),
+        )
+
+    return random_batch
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from june.exc import InteractionError
+from june.interaction.batched_interaction import InteractionBatch
+
+
+class TestPacking:
+    def test__subgroups_beyond_the_contact_matrix(
+        self, interactive_group_factory, contact_matrix_factory
+    ):
+        rng = np.random.default_rng(1)
+        # the first group has sizes for more subgroups than its contact matrix
+        first = interactive_group_factory(rng, [101], 2, n_sizes=4)
+        second = interactive_group_factory(rng, [101], 3)
+        batch = InteractionBatch.from_interactive_groups(
+            [first, second],
+            [contact_matrix_factory(rng, 2), contact_matrix_factory(rng, 3)],
+            [1.0, 1.0],
+        )
+        np.testing.assert_array_equal(batch.subgroup_offsets, [0, 2, 5])
+        np.testing.assert_array_equal(
+            batch.subgroup_sizes,
+            [first.subgroup_sizes[0], first.subgroup_sizes[1]]
+            + [second.subgroup_sizes[i] for i in range(3)],
+        )
+
+    def test__people_beyond_the_contact_matrix_are_rejected(
+        self, interactive_group_factory, contact_matrix_factory
+    ):
+        rng = np.random.default_rng(2)
+        group = interactive_group_factory(rng, [101], 3)
+        group.susceptibles_per_subgroup[2] = {1: {101: 1.0}}
+        with pytest.raises(InteractionError):
+            InteractionBatch.from_interactive_groups(
+                [group], [contact_matrix_factory(rng, 2)], [1.0]
+            )
@@ -0,0 +1,232 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from june.exc import InteractionError
+from june.interaction import Interaction
+from june.utils import RandomStreams
+
+
+def baseline_infector_tensor(
+    infectors_per_infection_per_subgroup, subgroup_sizes, contact_matrix, beta, delta_time
+):
+    ret = {}
+    for inf_id in infectors_per_infection_per_subgroup:
+        infector_matrix = np.zeros_like(contact_matrix, dtype=np.float64)
+        for subgroup_id in infectors_per_infection_per_subgroup[inf_id]:
+            subgroup_trans_prob = sum(
+                infectors_per_infection_per_subgroup[inf_id][subgroup_id]["trans_probs"]
+            )
+            for i in range(len(contact_matrix)):
+                subgroup_size = subgroup_sizes[subgroup_id]
+                if i == subgroup_id:
+                    subgroup_size = max(1, subgroup_size - 1)
+                infector_matrix[i, subgroup_id] = (
+                    contact_matrix[i, subgroup_id] * subgroup_trans_prob / subgroup_size
+                )
+        ret[inf_id] = infector_matrix * beta * delta_time
+    return ret
+
+
+def make_interaction():
+    interaction = Interaction.__new__(Interaction)
+    interaction._scratch_buffers = {}
+    return interaction
+
+
+def test__infector_tensor_matches_double_loop(
+    interactive_group_factory, contact_matrix_factory
+):
+    rng = np.random.default_rng(0)
+    interaction = make_interaction()
+    for n_subgroups in range(1, 5):
+        # sizes are also given for subgroups beyond the contact matrix
+        group = interactive_group_factory(
+            rng, [101, 202], n_subgroups, n_sizes=n_subgroups + 2
+        )
+        contact_matrix = contact_matrix_factory(rng, n_subgroups)
+        tensor = interaction.create_infector_tensor(
+            group.infectors_per_infection_per_subgroup,
+            group.subgroup_sizes,
+            contact_matrix,
+            1.3,
+            0.25,
+        )
+        expected = baseline_infector_tensor(
+            group.infectors_per_infection_per_subgroup,
+            group.subgroup_sizes,
+            contact_matrix,
+            1.3,
+            0.25,
+        )
+        assert tensor.keys() == expected.keys()
+        for infection_id in expected:
+            np.testing.assert_allclose(
+                tensor[infection_id], expected[infection_id], rtol=1e-12
+            )
+
+
+def per_group_time_step(interaction, interactive_group, contact_matrix, beta):
+    """
+    Runs the dictionary based path of ``Interaction.time_step_for_group`` on an
+    interactive group, with beta already multiplied by the time step duration.
+    """
+    if not interactive_group.infectors_per_infection_per_subgroup:
+        return []
+    infector_tensor = interaction.create_infector_tensor(
+        interactive_group.infectors_per_infection_per_subgroup,
+        interactive_group.subgroup_sizes,
+        contact_matrix,
+        beta,
+        1.0,
+    )
+    infected_ids, infection_ids, to_blame_subgroups = [], [], []
+    for subgroup_id, subgroup_susceptibles in (
+        interactive_group.susceptibles_per_subgroup.items()
+    ):
+        if interaction.single_infection_id in infector_tensor:
+            (
+                new_infected_ids,
+                new_infection_ids,
+                new_to_blame_subgroups,
+            ) = interaction._time_step_for_subgroup_single_infection(
+                exposures=infector_tensor[interaction.single_infection_id][subgroup_id],
+                infection_id=interaction.single_infection_id,
+                subgroup_susceptibles=subgroup_susceptibles,
+            )
+        else:
+            (
+                new_infected_ids,
+                new_infection_ids,
+                new_to_blame_subgroups,
+            ) = interaction._time_step_for_subgroup(
+                infector_tensor=infector_tensor,
+                susceptible_subgroup_id=subgroup_id,
+                subgroup_susceptibles=subgroup_susceptibles,
+            )
+        infected_ids += new_infected_ids
+        infection_ids += new_infection_ids
+        to_blame_subgroups += new_to_blame_subgroups
+    to_blame_ids = interaction._blame_individuals(
+        infected_ids,
+        to_blame_subgroups,
+        infection_ids,
+        interactive_group.infectors_per_infection_per_subgroup,
+    )
+    return sorted(zip(infected_ids, infection_ids, to_blame_ids))
+
+
+class TestBatchAgainstPerGroupPath:
+    def test__batch_matches_per_group_path(self, random_batch):
+        interactive_groups, contact_matrices, betas, batch = random_batch()
+        interaction = make_interaction()
+        interaction.single_infection_id = None
+        n_infected = 0
+        for interactive_group, contact_matrix, beta, result in zip(
+            interactive_groups, contact_matrices, betas, batch.run()
+        ):
+            expected = per_group_time_step(
+                interaction, interactive_group, contact_matrix, beta
+            )
+            assert sorted(zip(*result)) == expected
+            n_infected += len(expected)
+        assert n_infected > 0
+
+    def test__single_infection_fast_path(self, random_batch):
+        interactive_groups, contact_matrices, betas, batch = random_batch(
+            infection_ids=(101,), seed=3
+        )
+        interaction = make_interaction()
+        n_infected = 0
+        for interactive_group, contact_matrix, beta, result in zip(
+            interactive_groups, contact_matrices, betas, batch.run()
+        ):
+            interaction.single_infection_id = None
+            expected = per_group_time_step(
+                interaction, interactive_group, contact_matrix, beta
+            )
+            interaction.single_infection_id = 101
+            assert (
+                per_group_time_step(
+                    interaction, interactive_group, contact_matrix, beta
+                )
+                == expected
+            )
+            assert sorted(zip(*result)) == expected
+            n_infected += len(expected)
+        assert n_infected > 0
+
+
+def test__infection_rate_matches_exposure(interactive_group_factory):
+    """
+    Over many time steps, susceptibles get infected with probability
+    1 - exp(-susceptibility * exposure).
+    """
+    interaction = make_interaction()
+    interaction.single_infection_id = None
+    group = interactive_group_factory(np.random.default_rng(4), [101], 1)
+    group.infectors_per_infection_per_subgroup = {
+        101: {0: {"ids": [1, 2], "trans_probs": [0.2, 0.3]}}
+    }
+    group.subgroup_sizes = {0: 10.0}
+    group.susceptibles_per_subgroup = {
+        0: {person_id: {101: 0.5} for person_id in range(100, 300)}
+    }
+    contact_matrix = np.array([[2.0]])
+    RandomStreams.set_seed(7)
+    n_steps, n_infected, blamed = 100, 0, []
+    for step in range(n_steps):
+        RandomStreams.set_time(step / 24)
+        result = per_group_time_step(interaction, group, contact_matrix, 0.4)
+        n_infected += len(result)
+        blamed += [to_blame_id for _, _, to_blame_id in result]
+    n_trials = n_steps * 200
+    probability = 1 - np.exp(-0.5 * 0.4 * 2.0 * 0.5 / 9)
+    assert abs(n_infected - n_trials * probability) < 4 * np.sqrt(
+        n_trials * probability * (1 - probability)
+    )
+    # infectors are blamed in proportion to their transmission probabilities
+    assert abs(blamed.count(2) - 0.6 * len(blamed)) < 4 * np.sqrt(
+        0.24 * len(blamed)
+    )
+
+
+class TestSubgroupsBeyondTheContactMatrix:
+    def time_step(self, interactive_group, contact_matrix):
+        interaction = Interaction.from_file()
+        interaction._get_interactive_group_beta = lambda interactive_group: 1.0
+        interaction._get_interactive_group_contact_matrix = (
+            lambda interactive_group: contact_matrix
+        )
+        interactive_group.must_timestep = True
+        interactive_group.size = 1
+        group = SimpleNamespace(
+            id=interactive_group.group.id,
+            spec="company",
+            get_interactive_group=lambda people_from_abroad: interactive_group,
+        )
+        return interaction.time_step_for_group(group, delta_time=0.1)
+
+    def test__sizes_beyond_the_contact_matrix_are_ignored(
+        self, disease_config, interactive_group_factory, contact_matrix_factory
+    ):
+        rng = np.random.default_rng(1)
+        group = interactive_group_factory(rng, [101], 2, n_sizes=4)
+        self.time_step(group, contact_matrix_factory(rng, 2))
+
+    def test__people_beyond_the_contact_matrix_are_rejected(
+        self, disease_config, interactive_group_factory, contact_matrix_factory
+    ):
+        rng = np.random.default_rng(2)
+        group = interactive_group_factory(rng, [101], 3)
+        group.susceptibles_per_subgroup[2] = {1: {101: 1.0}}
+        with pytest.raises(InteractionError):
+            self.time_step(group, contact_matrix_factory(rng, 2))
+        group = interactive_group_factory(rng, [101], 2)
+        group.infectors_per_infection_per_subgroup.setdefault(101, {})[2] = {
+            "ids": [1],
+            "trans_probs": [0.5],
+        }
+        with pytest.raises(InteractionError):
+            self.time_step(group, contact_matrix_factory(rng, 2))
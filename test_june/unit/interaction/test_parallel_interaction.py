@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from june.interaction.batched_interaction import run_group_range
+from june.interaction.parallel_interaction import InteractionPool
+
+
+def test__group_ranges_reproduce_the_whole_batch(random_batch):
+    *_, batch = random_batch()
+    chunks = batch.group_chunks(37)
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and chunks[-1][1] == batch.n_groups
+    uniforms = batch.draw_uniforms()
+    chunk_results = [
+        run_group_range(
+            len(batch.infection_ids), batch.kernel_arrays, uniforms, start, end
+        )
+        for start, end in chunks
+    ]
+    chunked = [np.concatenate([result[i] for result in chunk_results]) for i in range(3)]
+    whole = run_group_range(
+        len(batch.infection_ids), batch.kernel_arrays, uniforms, 0, batch.n_groups
+    )
+    assert len(whole[0]) > 0
+    for chunked_array, whole_array in zip(chunked, whole):
+        np.testing.assert_array_equal(chunked_array, whole_array)
+
+
+@pytest.mark.parametrize("start_method", ["fork", "forkserver"])
+@pytest.mark.parametrize(
+    "chunk_susceptibles", [None, 50], ids=["one_chunk_per_batch", "chunked"]
+)
+def test__pool_matches_serial_run(random_batch, start_method, chunk_susceptibles):
+    batches = [
+        random_batch(seed=0)[-1],
+        # run in the main process, below min_susceptibles
+        random_batch(n_groups=3, seed=1)[-1],
+        random_batch(n_groups=120, infection_ids=(101,), seed=2)[-1],
+    ]
+    pool = InteractionPool(
+        n_workers=2,
+        min_susceptibles=20,
+        chunk_susceptibles=chunk_susceptibles,
+        start_method=start_method,
+    )
+    assert len(batches[1].susceptible_ids) < pool.min_susceptibles
+    try:
+        results = pool.run_batches(batches)
+    finally:
+        pool.close()
+    # both runs draw the uniforms with the seed of the last fixture call
+    assert results == [batch.run() for batch in batches]
+    assert any(infected for result in results for infected, _, _ in result)
+
+
+def test__pool_does_not_fork_mpi_ranks(monkeypatch):
+    from june.exc import InteractionError
+    from june.interaction import parallel_interaction
+
+    monkeypatch.setattr(parallel_interaction, "mpi_size", 2)
+    with pytest.raises(InteractionError):
+        InteractionPool(start_method="fork")
+    InteractionPool(start_method="forkserver")
@@ -0,0 +1,264 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from june import mpi_wrapper
+from june.demography import Person
+from june.epidemiology.infection import Immunity
+from june.mpi_wrapper import CrossDomainRoutes, DomainGraph, MovablePeople
+
+
+@pytest.fixture(autouse=True)
+def mpi_mode(monkeypatch):
+    # people are only packed and received in MPI mode
+    monkeypatch.setattr(mpi_wrapper, "mpi_available", True)
+    yield
+    for person_id in list(Person._persons):
+        if person_id >= 1000:
+            del Person._persons[person_id]
+
+
+def make_subgroup(domain_id, spec, group_id, subgroup_type):
+    return SimpleNamespace(
+        domain_id=domain_id, spec=spec, group_id=group_id, subgroup_type=subgroup_type
+    )
+
+
+def make_person(person_id, probability=None, infection_id=0, immunity=None):
+    if probability is None:
+        infection = None
+    else:
+        infection = SimpleNamespace(
+            transmission=SimpleNamespace(probability=probability),
+            infection_id=lambda: infection_id,
+        )
+    return SimpleNamespace(
+        id=person_id,
+        infected=infection is not None,
+        infection=infection,
+        immunity=Immunity(susceptibility_dict=immunity),
+        subgroups=SimpleNamespace(primary_activity=None),
+    )
+
+
+class TestBinaryPeople:
+    def test__pack_and_unpack_round_trip(self):
+        people = [
+            # infected
+            (make_person(1001, probability=0.3, infection_id=77), ("company", 5, 0)),
+            # susceptible with immunity
+            (make_person(1002, immunity={77: 0.25, 88: 0.0}), ("company", 5, 1)),
+            # susceptible without immunity
+            (make_person(1003), ("school", 2, 3)),
+            # patients go to the hospital subgroups
+            (make_person(1004, probability=0.7, infection_id=88), ("hospital", 9, 1)),
+            (make_person(1005, immunity={77: 0.5}), ("hospital", 9, 2)),
+        ]
+        movable_people = MovablePeople()
+        for person, (spec, group_id, subgroup_type) in people:
+            movable_people.add_person(
+                person, make_subgroup(1, spec, group_id, subgroup_type)
+            )
+        packed = movable_people.pack(1)
+        buffer = MovablePeople.to_bytes(*packed)
+        assert buffer.dtype == np.uint8
+        assert len(buffer) == MovablePeople.n_bytes(len(packed[0]), len(packed[1]))
+        records, immunity_ids, immunity_suscs = MovablePeople.from_bytes(
+            buffer.copy(), len(packed[0]), len(packed[1])
+        )
+        unpacked = {
+            person_id: (group_spec, group_id, subgroup_type, data)
+            for group_spec, group_id, subgroup_type, person_id, data in (
+                MovablePeople.unpack_record(record, immunity_ids, immunity_suscs)
+                for record in records.tolist()
+            )
+        }
+        assert sorted(unpacked) == [person.id for person, _ in people]
+        for person, destination in people:
+            group_spec, group_id, subgroup_type, data = unpacked[person.id]
+            assert (group_spec, group_id, subgroup_type) == destination
+            assert data["dom"] == mpi_wrapper.mpi_rank
+            assert data["active"]
+            if person.infected:
+                assert not data["susc"]
+                assert data["inf_prob"] == person.infection.transmission.probability
+                assert data["inf_id"] == person.infection.infection_id()
+                assert len(data["immunity_inf_ids"]) == 0
+            else:
+                assert data["susc"]
+                assert data["inf_prob"] == 0.0
+                assert data["inf_id"] == 0
+                assert dict(
+                    zip(data["immunity_inf_ids"].tolist(), data["immunity_suscs"].tolist())
+                ) == dict(person.immunity.susceptibility_dict)
+
+
+def received_people(movable_people):
+    return {
+        (group_spec, group_id, subgroup_type, person_id): data["inf_prob"]
+        for group_spec, groups in movable_people.skinny_in.items()
+        for group_id, subgroups in groups.items()
+        for subgroup_type, people in subgroups.items()
+        for person_id, data in people.items()
+    }
+
+
+def routing_tables(sender, receiver):
+    """
+    Route -> (destination subgroup, person id) on both sides.
+    """
+    sender_routes = {
+        route: (key[0][1:], key[1])
+        for route, key in enumerate(sender._out_keys[1])
+        if key is not None
+    }
+    receiver_routes = {
+        route: (tuple(entry[:3]), entry[3])
+        for route, entry in enumerate(receiver._in_routes[0])
+        if entry is not None
+    }
+    return sender_routes, receiver_routes
+
+
+class TestCrossDomainRoutes:
+    def exchange(self, sender, receiver, placements, probabilities):
+        """
+        Sends the given placements (person id -> destination subgroup) from rank 0
+        to rank 1, and returns what rank 1 received.
+        """
+        movable_people = MovablePeople()
+        for person_id, (spec, group_id, subgroup_type, routable) in placements.items():
+            person = make_person(person_id, probability=probabilities.get(person_id))
+            subgroup = make_subgroup(1, spec, group_id, subgroup_type)
+            if routable:
+                person.subgroups.primary_activity = subgroup
+            movable_people.add_person(person, subgroup)
+        buffer, sizes = sender.pack(movable_people, 1)
+        incoming = MovablePeople()
+        n_received = receiver.unpack(incoming, 0, buffer, np.array(sizes))
+        received = received_people(incoming)
+        assert n_received == len(received)
+        return received
+
+    def test__both_sides_keep_the_same_routes(self):
+        sender = CrossDomainRoutes(max_idle_exchanges=3)
+        receiver = CrossDomainRoutes(max_idle_exchanges=3)
+        work = {
+            1001: ("company", 1, 0, True),
+            1002: ("company", 1, 0, True),
+            1003: ("company", 2, 1, True),
+            1004: ("company", 2, 1, True),
+        }
+        commuter = {1005: ("city_transport", 7, 0, False)}
+        steps = [
+            # first use of every route
+            ({**work, **commuter}, {1001: 0.1}),
+            # unchanged people are only sent as presence bits
+            (work, {1001: 0.1}),
+            # a change of data is resent
+            (work, {1001: 0.2, 1003: 0.4}),
+            # 1004 stops going, and 1003 changes job
+            (
+                {k: v for k, v in work.items() if k != 1004}
+                | {1003: ("company", 3, 0, True)},
+                {},
+            ),
+            ({1001: work[1001], 1002: work[1002]}, {}),
+            ({1001: work[1001]}, {}),
+            # after three idle exchanges the routes of 1004 and 1003 were dropped,
+            # and new routes reuse their slots
+            ({1001: work[1001], 1006: ("school", 4, 2, True)}, {}),
+            # 1004 comes back on a new route, next to an unrouted commuter
+            ({1004: work[1004], 1006: ("school", 4, 2, True), **commuter}, {1004: 0.5}),
+            ({}, {}),
+            ({1002: work[1002], 1004: work[1004]}, {}),
+        ]
+        n_max_routes = 0
+        for placements, probabilities in steps:
+            received = self.exchange(sender, receiver, placements, probabilities)
+            assert received == {
+                (spec, group_id, subgroup_type, person_id): probabilities.get(
+                    person_id, 0.0
+                )
+                for person_id, (spec, group_id, subgroup_type, _) in placements.items()
+            }
+            sender_routes, receiver_routes = routing_tables(sender, receiver)
+            assert sender_routes == receiver_routes
+            assert len(sender._out_keys[1]) == len(receiver._in_routes[0])
+            n_max_routes = max(n_max_routes, len(sender._out_keys[1]))
+        # slots of dropped routes were reused instead of growing the tables
+        assert n_max_routes <= 5
+        # 1001 has been idle for three exchanges
+        assert sorted(routing_tables(sender, receiver)[0].values()) == [
+            (("company", 1, 0), 1002),
+            (("company", 2, 1), 1004),
+            (("school", 4, 2), 1006),
+        ]
+
+
+class FakeNeighbourComm:
+    """
+    Neighbour communicator of a rank whose only neighbour sends it ``incoming``.
+    Checks that buffers hold as many bytes as the counts and datatypes say.
+    """
+
+    itemsizes = {"UINT32_T": 4, "BYTE": 1}
+
+    def __init__(self, incoming):
+        self.incoming = incoming
+
+    def Ineighbor_alltoallv(self, send, recv):
+        for buffer, (counts, _), datatype in (send, recv):
+            assert buffer.nbytes == counts.sum() * self.itemsizes[datatype]
+        recv_buffer, _, datatype = recv
+        recv_buffer.view(np.uint8)[:] = self.incoming.view(np.uint8)
+        return SimpleNamespace(Wait=lambda: None)
+
+    def Free(self):
+        pass
+
+
+class TestNeighbourExchange:
+    @pytest.fixture(autouse=True)
+    def two_ranks(self, monkeypatch):
+        fake_mpi = SimpleNamespace(
+            UINT32_T="UINT32_T",
+            REQUEST_NULL=None,
+            _typedict={"I": "UINT32_T", "B": "BYTE"},
+        )
+        monkeypatch.setattr(mpi_wrapper, "MPI", fake_mpi)
+        monkeypatch.setattr(mpi_wrapper, "mpi_size", 2)
+        monkeypatch.setattr(mpi_wrapper, "mpi_rank", 0)
+        monkeypatch.setattr(DomainGraph, "neighbours", [1])
+        monkeypatch.setattr(DomainGraph, "_neighbour_set", {1})
+        monkeypatch.setattr(DomainGraph, "_requests", [])
+        yield
+
+    def test__receive_without_sending(self, monkeypatch):
+        incoming = np.array([7, 70000, 2**32 - 1], dtype=np.uint32)
+        monkeypatch.setattr(DomainGraph, "comm", FakeNeighbourComm(incoming))
+        request, send_buffer, recv_buffer, displacements = DomainGraph.ialltoallv(
+            {}, np.array([3]), dtype=np.uint32
+        )
+        request.Wait()
+        assert send_buffer.dtype == recv_buffer.dtype == np.uint32
+        assert len(send_buffer) == 0
+        np.testing.assert_array_equal(recv_buffer, incoming)
+        np.testing.assert_array_equal(displacements, [0])
+
+    def test__move_info_keeps_ids_as_uint32(self, monkeypatch):
+        incoming = np.array([5, 3], dtype=np.uint32)
+        monkeypatch.setattr(DomainGraph, "comm", FakeNeighbourComm(incoming))
+        monkeypatch.setattr(
+            DomainGraph,
+            "alltoall_sizes",
+            classmethod(lambda cls, send_sizes, n_sizes: np.array([[2]])),
+        )
+        # nothing to send to the other rank, but infections to receive from it
+        ids, n_sending, n_receiving = mpi_wrapper.move_info(
+            [np.array([11, 12], dtype=np.uint32), np.array([], dtype=np.uint32)]
+        )
+        assert ids.dtype == np.uint32
+        np.testing.assert_array_equal(ids, [11, 12, 5, 3])
+        assert (n_sending, n_receiving) == (0, 2)
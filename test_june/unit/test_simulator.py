@@ -0,0 +1,265 @@
+from types import SimpleNamespace
+
+import pytest
+
+from june.demography import Person
+from june.epidemiology.infection.transmission import TransmissionProbabilities
+from june.groups import Household, Households, Company, Companies, Placements
+from june.groups.group.infectious_venues import InfectiousVenues
+from june.groups.leisure import Leisure, Pub, Pubs
+from june.interaction import Interaction
+from june.simulator import Simulator
+from june.utils import RandomStreams
+
+
+@pytest.fixture(name="world")
+def make_world(disease_config):
+    people = [Person.from_attributes(age=20 + 5 * i, sex="f") for i in range(8)]
+    household = Household(type="family")
+    company = Company()
+    pub = Pub()
+    for person in people:
+        household.add(person, subgroup_type=2)
+    world = SimpleNamespace(
+        households=Households([household]),
+        companies=Companies([company]),
+        pubs=Pubs([pub], make_tree=False),
+        people=SimpleNamespace(members=people),
+    )
+    yield world
+    Placements.tracking = False
+    Placements.clear()
+
+
+@pytest.fixture(name="simulator")
+def make_simulator(world):
+    simulator = Simulator.__new__(Simulator)
+    simulator.world = world
+    simulator.activity_manager = SimpleNamespace(
+        all_super_groups=["households", "companies", "pubs"]
+    )
+    simulator._cleared_specs = None
+    return simulator
+
+
+@pytest.fixture(name="leisure")
+def make_leisure(world):
+    """
+    Leisure that sends everyone to the pub, without appending them to it.
+    """
+    pub_subgroup = world.pubs.members[0].subgroups[0]
+    leisure = Leisure.__new__(Leisure)
+    leisure.leisure_distributors = {
+        "pub": SimpleNamespace(
+            get_leisure_subgroup=lambda person, to_send_abroad: pub_subgroup
+        )
+    }
+    leisure._get_activity_probabilities_for_person = lambda person: {
+        "does_activity": 1.0,
+        "activities": {"pub": 1.0},
+    }
+    return leisure
+
+
+def place_people(world, leisure, step):
+    """
+    Places everyone as the activity phase would, rotating each person through
+    working, leisure, leisure abroad and staying at home with the time step.
+    """
+    company = world.companies.members[0]
+    household = world.households.members[0]
+    for i, person in enumerate(world.people.members):
+        choice = (i + step) % 4
+        if choice == 0:
+            company.subgroups[0].append(person)
+        elif choice == 1:
+            subgroup = leisure.get_subgroup_for_person_and_housemates(person)
+            subgroup.append(person)
+        elif choice == 2:
+            # the leisure venue is in another domain, so the person is only
+            # flagged busy and never appended locally
+            leisure.get_subgroup_for_person_and_housemates(person)
+            person.busy = True
+            Placements.add_person(person)
+        else:
+            household.subgroups[2].append(person)
+
+
+def world_state(world):
+    people = tuple(
+        (person.busy, id(person.subgroups.leisure)) for person in world.people.members
+    )
+    groups = tuple(
+        tuple(len(subgroup.people) for subgroup in group.subgroups)
+        for supergroup in (world.households, world.companies, world.pubs)
+        for group in supergroup.members
+    )
+    return people, groups
+
+
+class TestClearWorld:
+    def test__incremental_clear_matches_whole_clear(self, world, simulator, leisure):
+        simulator.clear_world()
+        assert Placements.tracking
+        cleared = world_state(world)
+        for step in range(4):
+            place_people(world, leisure, step)
+            assert world_state(world) != cleared
+            simulator.clear_world()
+            assert world_state(world) == cleared
+            simulator._clear_whole_world()
+            assert world_state(world) == cleared
+
+    def test__leisure_abroad_is_reset(self, world, simulator, leisure):
+        simulator.clear_world()
+        person = world.people.members[0]
+        leisure.get_subgroup_for_person_and_housemates(person)
+        assert person.subgroups.leisure is not None
+        simulator.clear_world()
+        assert person.subgroups.leisure is None
+
+
+@pytest.fixture(name="infectious_world")
+def make_infectious_world(infection_selector):
+    """
+    Companies with local susceptibles, some of them with local infectors.
+    """
+    RandomStreams.set_seed(3)
+    RandomStreams.set_time(5.0)
+    TransmissionProbabilities.clear()
+    Placements.tracking = False
+    InfectiousVenues.clear()
+    companies = [Company() for _ in range(6)]
+    for i, company in enumerate(companies):
+        for j in range(20):
+            # fixed ids, so that the infections and the interaction are drawn
+            # from the same streams whatever ran before
+            person = Person.from_attributes(
+                age=30 + j, sex="m", id=5_000_000 + 100 * i + j
+            )
+            if i % 3 == 0 and j < 4:
+                with RandomStreams.seeded("infection", person.id):
+                    infection_selector.infect_person_at_time(person, 0.0)
+            company.subgroups[0].append(person)
+    TransmissionProbabilities.update(5.0)
+    yield Companies(companies)
+    InfectiousVenues.clear()
+    TransmissionProbabilities.clear()
+
+
+def people_from_abroad_for(companies, infection_id, indices=(1, 4)):
+    """
+    Infected and susceptible people from other domains going to the companies
+    in ``indices``, by default those without local infectors.
+    """
+    people_from_abroad_dict = {}
+    person_id = 10_000_000
+    for i, company in enumerate(companies.members):
+        if i not in indices:
+            continue
+        people = {}
+        for j in range(3):
+            people[person_id] = {
+                "susc": j > 0,
+                "inf_id": infection_id if j == 0 else 0,
+                "inf_prob": 0.8 if j == 0 else 0.0,
+                "immunity_inf_ids": [],
+                "immunity_suscs": [],
+            }
+            person_id += 1
+        people_from_abroad_dict.setdefault("company", {})[company.id] = {0: people}
+    return people_from_abroad_dict
+
+
+def make_interacting_simulator(batched):
+    simulator = Simulator.__new__(Simulator)
+    simulator.interaction = Interaction.from_file()
+    simulator.batched_interaction_enabled = batched
+    simulator.interaction_pool = None
+    simulator.timer = SimpleNamespace(duration=1.0)
+    simulator.record = None
+    return simulator
+
+
+def interact_every_group(interaction, companies, people_from_abroad_dict):
+    infected = []
+    for company in companies.members:
+        new_infected, new_infections, _ = interaction.time_step_for_group(
+            group=company,
+            people_from_abroad=people_from_abroad_dict.get("company", {}).get(
+                company.id
+            ),
+            delta_time=1.0,
+        )
+        infected += zip(new_infected, new_infections)
+    return sorted(infected)
+
+
+@pytest.mark.parametrize("batched", [False, True])
+class TestInteractInfectiousGroups:
+    def interact(self, simulator, companies, people_from_abroad_dict):
+        InfectiousVenues.add_people_from_abroad(people_from_abroad_dict)
+        return sorted(
+            zip(
+                *simulator._interact_infectious_groups(
+                    [companies], lambda group: True, people_from_abroad_dict
+                )
+            )
+        )
+
+    def test__local_infectors(self, infectious_world, batched):
+        simulator = make_interacting_simulator(batched)
+        infected = self.interact(simulator, infectious_world, {})
+        assert infected
+        assert infected == interact_every_group(
+            simulator.interaction, infectious_world, {}
+        )
+
+    def test__infectors_from_abroad(
+        self, infectious_world, infection_selector, batched
+    ):
+        # only the people from abroad infect
+        for company in infectious_world.members:
+            for person in company.people:
+                person.infection = None
+        InfectiousVenues.clear()
+        people_from_abroad_dict = people_from_abroad_for(
+            infectious_world, infection_selector.infection_class.infection_id()
+        )
+        simulator = make_interacting_simulator(batched)
+        infected = self.interact(simulator, infectious_world, people_from_abroad_dict)
+        assert infected
+        assert infected == interact_every_group(
+            simulator.interaction, infectious_world, people_from_abroad_dict
+        )
+
+    def test__two_passes_match_a_single_pass(
+        self, infectious_world, infection_selector, batched
+    ):
+        people_from_abroad_dict = people_from_abroad_for(
+            infectious_world,
+            infection_selector.infection_class.infection_id(),
+            indices=(0, 1, 4),
+        )
+        foreign_groups = {"company": set(people_from_abroad_dict["company"])}
+        simulator = make_interacting_simulator(batched)
+        # as in Simulator.do_timestep, the groups without people from abroad are
+        # interacted before the people from abroad are known
+        infected, infections = simulator._interact_infectious_groups(
+            [infectious_world],
+            lambda group: group.id not in foreign_groups.get(group.spec, ()),
+            people_from_abroad_dict={},
+        )
+        InfectiousVenues.add_people_from_abroad(people_from_abroad_dict)
+        new_infected, new_infections = simulator._interact_infectious_groups(
+            [infectious_world],
+            lambda group: group.id in foreign_groups.get(group.spec, ()),
+            people_from_abroad_dict=people_from_abroad_dict,
+        )
+        two_passes = sorted(
+            zip(infected + new_infected, infections + new_infections)
+        )
+        assert len(infected) and len(new_infected)
+        assert two_passes == self.interact(
+            simulator, infectious_world, people_from_abroad_dict
+        )
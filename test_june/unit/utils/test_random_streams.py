@@ -0,0 +1,96 @@
+import random
+
+import numpy as np
+import pytest
+
+from june.utils import RandomStreams
+from june.utils.random_streams import _philox4x32
+
+
+@pytest.fixture(autouse=True)
+def reset_streams():
+    RandomStreams.set_seed(11)
+    RandomStreams.set_time(0.5)
+    yield
+    RandomStreams.set_seed(0)
+    RandomStreams.set_time(0)
+
+
+@pytest.mark.parametrize(
+    "counter, key, expected",
+    [
+        # known answers of Philox4x32-10 from the Random123 distribution
+        ((0, 0, 0, 0), (0, 0), (0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8)),
+        (
+            (0xFFFFFFFF,) * 4,
+            (0xFFFFFFFF,) * 2,
+            (0x408F276D, 0x41C83B0E, 0xA20BC7C6, 0x6D5451FD),
+        ),
+        (
+            (0x243F6A88, 0x85A308D3, 0x13198A2E, 0x03707344),
+            (0xA4093822, 0x299F31D0),
+            (0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1),
+        ),
+    ],
+)
+def test__philox_known_answers(counter, key, expected):
+    words = _philox4x32(*[np.uint64(c) for c in counter], *[np.uint64(k) for k in key])
+    assert tuple(int(word) for word in words) == expected
+
+
+class TestStreams:
+    def test__uniforms_are_in_unit_interval(self):
+        uniforms = RandomStreams.uniforms("interaction", np.arange(10_000), 5)
+        assert uniforms.shape == (10_000, 5)
+        assert uniforms.min() >= 0.0
+        assert uniforms.max() < 1.0
+        assert abs(uniforms.mean() - 0.5) < 0.01
+        # draws of an entity and draws of neighbouring entities are uncorrelated
+        assert abs(np.corrcoef(uniforms[:, 0], uniforms[:, 1])[0, 1]) < 0.05
+        assert abs(np.corrcoef(uniforms[:-1, 0], uniforms[1:, 0])[0, 1]) < 0.05
+
+    def test__draws_do_not_depend_on_visiting_order(self):
+        ids = np.array([5, 17, 3, 1000, 42])
+        uniforms = RandomStreams.uniforms("interaction", ids, 4)
+        order = np.argsort(ids)
+        np.testing.assert_array_equal(
+            RandomStreams.uniforms("interaction", ids[order], 4), uniforms[order]
+        )
+        for i, entity_id in enumerate(ids):
+            np.testing.assert_array_equal(
+                RandomStreams.uniforms("interaction", [entity_id], 4)[0], uniforms[i]
+            )
+            assert RandomStreams.uniform("interaction", entity_id, 2) == uniforms[i, 2]
+        # taking fewer draws gives the first draws of the stream
+        np.testing.assert_array_equal(
+            RandomStreams.uniforms("interaction", ids, 3), uniforms[:, :3]
+        )
+
+    def test__streams_depend_on_seed_time_and_name(self):
+        ids = np.arange(100)
+        uniforms = RandomStreams.uniforms("interaction", ids, 2)
+        assert not np.any(RandomStreams.uniforms("leisure", ids, 2) == uniforms)
+        RandomStreams.set_time(0.75)
+        assert not np.any(RandomStreams.uniforms("interaction", ids, 2) == uniforms)
+        RandomStreams.set_time(0.5)
+        RandomStreams.set_seed(12)
+        assert not np.any(RandomStreams.uniforms("interaction", ids, 2) == uniforms)
+        RandomStreams.set_seed(11)
+        np.testing.assert_array_equal(
+            RandomStreams.uniforms("interaction", ids, 2), uniforms
+        )
+
+    def test__seeded_restores_global_generators(self):
+        np.random.seed(3)
+        random.seed(3)
+        expected = (np.random.random(), random.random())
+        np.random.seed(3)
+        random.seed(3)
+        with RandomStreams.seeded("infection", 7):
+            first = (np.random.random(), random.random())
+        assert (np.random.random(), random.random()) == expected
+        with RandomStreams.seeded("infection", 7):
+            assert (np.random.random(), random.random()) == first
+        with RandomStreams.seeded("infection", 8):
+            assert np.random.random() != first[0]
+        assert first[0] != first[1]